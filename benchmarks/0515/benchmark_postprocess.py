@@ -0,0 +1,142 @@
+"""
+후처리: 개별 호출(태그 + 마크다운 병렬, 저장 후 Judge) vs 통합 JSON 호출 1회 비교
+
+개별: extract_tags / convert_to_markdown을 병렬로, check_consistency는 저장 후 작업 큐에서 —
+      세 호출이 같은 답변을 각자 입력 토큰으로 다시 보낸다.
+통합: 태그 + 마크다운 + 모순 판정을 response_format=json_object 1회로 (POSTPROCESS_COMBINED).
+통합(local): MARKDOWN_MODE='local' — 마크다운은 로컬 포맷터, LLM은 태그 + 판정만.
+
+지연은 SSE 5단계 기준 (개별 경로의 Judge는 응답 후 백그라운드라 지연에서 제외, 토큰에는 포함).
+프롬프트는 서비스 코드와 동일하게 LearnlogService 헬퍼에서 가져온다.
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+from dotenv import load_dotenv
+from groq import Groq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from search.services import LearnlogService  # noqa: E402
+
+load_dotenv()
+
+groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+LIGHT_MODEL = LearnlogService.LIGHT_MODEL
+
+# 테스트용 데이터 (benchmark_parallel.py와 동일)
+QUERY = "Docker 컨테이너와 가상머신의 차이점은 무엇인가요?"
+AI_ANSWER = """Docker는 OS 커널을 공유하는 컨테이너 기술이고, VM은 하이퍼바이저 위에 전체 OS를 실행합니다.
+Docker 컨테이너는 가볍고 빠르게 시작되며, 호스트 OS의 커널을 직접 사용합니다.
+반면 VM은 각각 독립된 OS를 가지므로 더 많은 리소스를 소비하지만 완전한 격리를 제공합니다.
+컨테이너는 마이크로서비스 아키텍처에 적합하고, VM은 서로 다른 OS가 필요한 환경에 적합합니다."""
+SEARCH_RESULTS = {
+    "results": [
+        {"title": "Docker docs", "url": "https://docs.docker.com", "content": "Docker는 컨테이너 기술..." * 10},
+        {"title": "VM 비교", "url": "https://example.com", "content": "가상머신은 하이퍼바이저..." * 10},
+    ]
+}
+VERIFY_CONTEXT = (None, 500, SEARCH_RESULTS)
+
+
+def call(prompt, max_tokens, temperature=0.0, json_mode=False):
+    """Groq 1회 호출 → (응답, 입력 토큰, 출력 토큰)"""
+    kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    response = groq_client.chat.completions.create(
+        model=LIGHT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **kwargs,
+    )
+    usage = response.usage
+    return response.choices[0].message.content, usage.prompt_tokens, usage.completion_tokens
+
+
+def judge_prompt():
+    # check_consistency와 같은 프롬프트·컨텍스트
+    context = LearnlogService._consistency_context(*VERIFY_CONTEXT)
+    return LearnlogService._consistency_prompt(AI_ANSWER, context)
+
+
+def run_separate():
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        tags_future = executor.submit(
+            call, LearnlogService._tags_prompt(QUERY, AI_ANSWER), 50, 0.2,
+        )
+        md_future = executor.submit(
+            call, LearnlogService._markdown_prompt(QUERY, AI_ANSWER, SEARCH_RESULTS), 2000, 0.5,
+        )
+        tags, tags_in, tags_out = tags_future.result()
+        _, md_in, md_out = md_future.result()
+    elapsed = time.time() - start
+    # Judge는 응답 후 작업 큐에서 — 지연 제외, 토큰만 합산
+    _, judge_in, judge_out = call(judge_prompt(), 200, json_mode=True)
+    return elapsed, tags_in + md_in + judge_in, tags_out + md_out + judge_out, tags.strip()
+
+
+def run_combined(markdown_mode):
+    settings.MARKDOWN_MODE = markdown_mode
+    prompt, max_tokens, _ = LearnlogService._postprocess_request(QUERY, AI_ANSWER, SEARCH_RESULTS, VERIFY_CONTEXT)
+    start = time.time()
+    content, tokens_in, tokens_out = call(prompt, max_tokens, json_mode=True)
+    elapsed = time.time() - start
+    result = json.loads(content)
+    return elapsed, tokens_in, tokens_out, result.get("tags")
+
+
+def main():
+    ROUNDS = 3
+    variants = {
+        "개별": run_separate,
+        "통합": lambda: run_combined("llm"),
+        "통합(local)": lambda: run_combined("local"),
+    }
+
+    print("=" * 60)
+    print("후처리: 개별 호출 vs 통합 JSON 호출")
+    print("=" * 60)
+
+    stats = {name: {"time": [], "in": [], "out": []} for name in variants}
+
+    for i in range(ROUNDS):
+        print(f"\n--- Round {i + 1}/{ROUNDS} ---")
+        for name, run in variants.items():
+            elapsed, tokens_in, tokens_out, tags = run()
+            stats[name]["time"].append(elapsed)
+            stats[name]["in"].append(tokens_in)
+            stats[name]["out"].append(tokens_out)
+            print(f"  {name}: {elapsed:.2f}s | 입력 {tokens_in} / 출력 {tokens_out} 토큰 | 태그: {tags}")
+
+    # 요약
+    avg = {
+        name: {key: sum(values) / ROUNDS for key, values in s.items()}
+        for name, s in stats.items()
+    }
+    base = avg["개별"]
+
+    print(f"\n{'=' * 60}")
+    print("요약 (평균)")
+    print(f"{'=' * 60}")
+    for name, a in avg.items():
+        line = f"  {name}: {a['time']:.2f}s | 입력 {a['in']:.0f} / 출력 {a['out']:.0f} 토큰"
+        if name != "개별":
+            saved = base["time"] - a["time"]
+            line += (
+                f" | 지연 절감 {saved:.2f}s ({saved / base['time'] * 100:.0f}%)"
+                f" | 입력 토큰 절감 {(1 - a['in'] / base['in']) * 100:.0f}%"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+get_domains_for_query / is_official_doc: 호출마다 키 순회 vs import 시 컴파일한 DomainMatcher 비교
+
+기존: ASCII 키마다 re.search 패턴을 새로 만들고 (re 내부 캐시 512개를 넘으면 매번 재컴파일),
+      한글 키마다 맵 전체를 훑어 더 긴 키를 찾는다 (O(n²)). is_official_doc은 URL마다 도메인 집합 재생성.
+컴파일: 긴 키 우선 alternation 정규식 1개(ASCII) + 1개(한글) + 역순 라벨 호스트 트라이 (search/domains.py).
+
+맵 크기에 따른 호출당 비용을 보기 위해 TECH_DOCS_MAP을 ×1/×5/×10으로 합성 확장한다
+(확장 키는 실제 키 뒤에 접미사를 붙여 질문에는 매칭되지 않게 — 매칭 수가 아니라 맵 크기만 키운다).
+API 호출 없음.
+"""
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from search.domains import SOURCE_TYPE_HOSTS, TECH_DOCS_MAP, DomainMatcher, SourceClassifier  # noqa: E402
+
+QUERIES = [
+    "Django 모델 설계 방법",
+    "자바스크립트 비동기 처리와 자바 스레드 비교",
+    "도커를 쓸 때 주의점",
+    "go언어 채널 사용법",
+    "Spring Boot에서 PostgreSQL 커넥션 풀 설정",
+    "gRPC란 무엇인가",
+]
+URLS = [
+    "https://docs.djangoproject.com/en/5.2/topics/db/",
+    "https://developer.mozilla.org/ko/docs/Web/JavaScript",
+    "https://velog.io/@someone/docker-network",
+    "https://github.com/someone/repo",
+]
+ROUNDS = 200
+
+
+# ── 기존 구현 (search/domains.py 컴파일 매처 도입 전) ────────────────────
+
+def legacy_tech_in_query(tech_map, tech, query_lower):
+    if tech.isascii():
+        pattern = rf"(?<![a-z0-9]){re.escape(tech)}(?![a-z0-9])"
+        return re.search(pattern, query_lower) is not None
+    longer_keys = [k for k in tech_map if tech in k and k != tech]
+    cleaned = query_lower
+    for k in longer_keys:
+        cleaned = cleaned.replace(k, ' ')
+    return tech in cleaned
+
+
+def legacy_get_domains(tech_map, query):
+    query_lower = query.lower()
+    domains = []
+    for tech, urls in tech_map.items():
+        if legacy_tech_in_query(tech_map, tech, query_lower):
+            domains.extend(urls)
+    domains = list(dict.fromkeys(domains))
+    return domains if domains else None
+
+
+def legacy_is_official(tech_map, url):
+    url_lower = url.lower()
+    official_domains = {d for domains in tech_map.values() for d in domains}
+    return any(domain in url_lower for domain in official_domains)
+
+
+# ── 측정 ─────────────────────────────────────────────────────────────
+
+def scaled_map(factor):
+    tech_map = dict(TECH_DOCS_MAP)
+    for i in range(1, factor):
+        for tech, domains in TECH_DOCS_MAP.items():
+            tech_map[f"{tech}{'x' if tech.isascii() else '엑'}{i}"] = [f"{d}-{i}" for d in domains]
+    return tech_map
+
+
+def per_call_us(fn, inputs):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for item in inputs:
+            fn(item)
+    return (time.perf_counter() - start) / (ROUNDS * len(inputs)) * 1e6
+
+
+def main():
+    print(f"{'map':>6} {'keys':>6} | {'domains 기존':>12} {'컴파일':>8} {'배수':>6} | "
+          f"{'official 기존':>13} {'컴파일':>8} {'배수':>6} | {'빌드(ms)':>8}")
+    for factor in (1, 5, 10):
+        tech_map = scaled_map(factor)
+        build_start = time.perf_counter()
+        matcher = DomainMatcher(tech_map)
+        classifier = SourceClassifier(tech_map, SOURCE_TYPE_HOSTS)
+        build_ms = (time.perf_counter() - build_start) * 1e3
+
+        for query in QUERIES:  # 결과 동일성 확인
+            assert (matcher.domains_for(query) or None) == legacy_get_domains(tech_map, query), query
+
+        old_q = per_call_us(lambda q: legacy_get_domains(tech_map, q), QUERIES)
+        new_q = per_call_us(matcher.domains_for, QUERIES)
+        old_u = per_call_us(lambda u: legacy_is_official(tech_map, u), URLS)
+        new_u = per_call_us(lambda u: classifier.classify(u) == 'official', URLS)
+        print(f"{'x' + str(factor):>6} {len(tech_map):>6} | {old_q:>10.1f}us {new_q:>6.1f}us {old_q / new_q:>5.1f}x | "
+              f"{old_u:>11.1f}us {new_u:>6.1f}us {old_u / new_u:>5.1f}x | {build_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
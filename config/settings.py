@@ -1,4 +1,5 @@
 # config/settings.py
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -114,6 +115,100 @@ GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY')
 TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')
 
+# LLM/검색 SDK 공용 HTTP 커넥션 풀 (provider별 1개, search/services/clients.py)
+# HTTP/2는 h2 패키지 필요 (pip install 'httpx[http2]')
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv('HTTP_CLIENT_MAX_CONNECTIONS', '20'))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv('HTTP_CLIENT_MAX_KEEPALIVE', '10'))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_CLIENT_KEEPALIVE_EXPIRY', '60'))
+HTTP_CLIENT_HTTP2 = os.getenv('HTTP_CLIENT_HTTP2', 'False') == 'True'
+
+# pgvector HNSW 검색 후보 수 (ef_search↑ = recall↑, 지연↑). 검색 트랜잭션마다 SET LOCAL로 적용.
+# 값을 바꾸기 전에 `manage.py vector_recall --ef-search 20 40 100`으로 recall@10을 확인할 것
+PGVECTOR_HNSW_EF_SEARCH = int(os.getenv('PGVECTOR_HNSW_EF_SEARCH', '40'))
+
+# 검색 에이전트: 웹검색을 라우터 판단과 병렬로 미리 시작 (웹 생략 경로에서도 Groq·Tavily 호출 발생)
+SEARCH_AGENT_SPECULATIVE_WEB = os.getenv('SEARCH_AGENT_SPECULATIVE_WEB', 'False') == 'True'
+
+# /api/query/stream/을 async SSE 뷰로 서빙 — ASGI 서버(uvicorn, render.asgi.yaml)로 띄울 때만 켤 것.
+# WSGI(gunicorn sync 워커)에서는 async 스트림을 한 번에 소비해 버려 토큰 스트리밍이 깨진다
+ASYNC_STREAMING = os.getenv('ASYNC_STREAMING', 'False') == 'True'
+
+# 백그라운드 작업 큐 (search/services/jobs.py, manage.py run_worker)
+# 재시도 대기 = BASE * 2^(n-1)초 (상한 MAX), LOCK_TIMEOUT 넘게 running이면 죽은 워커로 보고 재예약
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '2'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_SEC = int(os.getenv('JOB_RETRY_BASE_SEC', '10'))
+JOB_RETRY_MAX_SEC = int(os.getenv('JOB_RETRY_MAX_SEC', '600'))
+JOB_LOCK_TIMEOUT_SEC = int(os.getenv('JOB_LOCK_TIMEOUT_SEC', '600'))
+# 끝난(done/failed) 작업 보존 기간 — 워커가 유휴 시간에 주기적으로 삭제 (실패 원인 확인용으로 며칠 남긴다)
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+
+# 임베딩 캐시: 프로세스 내 LRU 크기 + (선택) DB 테이블 단계의 TTL·최대 행 수
+EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', '512'))
+EMBEDDING_CACHE_DB = os.getenv('EMBEDDING_CACHE_DB', 'False') == 'True'
+EMBEDDING_CACHE_TTL_DAYS = int(os.getenv('EMBEDDING_CACHE_TTL_DAYS', '30'))
+EMBEDDING_CACHE_DB_MAX_ROWS = int(os.getenv('EMBEDDING_CACHE_DB_MAX_ROWS', '5000'))
+
+# Groq 경량 모델 응답 캐시: 프로세스 내 LRU 크기 + (선택) DB 테이블 단계의 TTL·최대 행 수
+LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', '1024'))
+LLM_CACHE_DB = os.getenv('LLM_CACHE_DB', 'False') == 'True'
+LLM_CACHE_TTL_DAYS = int(os.getenv('LLM_CACHE_TTL_DAYS', '30'))
+LLM_CACHE_DB_MAX_ROWS = int(os.getenv('LLM_CACHE_DB_MAX_ROWS', '20000'))
+
+# Tavily 검색 결과 캐시 (search/services/search_cache.py): 정규화 검색어 + include_domains 키, 프로세스 LRU + DB 테이블
+# TTL은 결과 출처 유형별(시간, 결과 중 최솟값). 만료 후 STALE_HOURS 안이면 저장된 결과를 쓰고 작업 큐(refresh_search)로 갱신
+SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', 'False') == 'True'
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '256'))
+SEARCH_CACHE_DB_MAX_ROWS = int(os.getenv('SEARCH_CACHE_DB_MAX_ROWS', '2000'))
+SEARCH_CACHE_TTL_HOURS = {
+    'official': 168, 'github': 72, 'stackoverflow': 72, 'blog': 24, 'other': 24,
+    **json.loads(os.getenv('SEARCH_CACHE_TTL_HOURS', '{}')),  # 예: {"official": 336}
+}
+SEARCH_CACHE_STALE_HOURS = int(os.getenv('SEARCH_CACHE_STALE_HOURS', '24'))
+
+# 레퍼런스 본문 저장소 (search/services/reference_store.py): Tavily 본문(raw_content 요청)을 URL당 1회 압축 저장 + 청크 임베딩.
+# LOCAL_DOCS_ENABLED면 web_search가 저장된 청크를 먼저 검색해 코사인 거리 MAX_DISTANCE 이내 청크가
+# MIN_CHUNKS개 이상이면 Tavily를 생략한다 (청크 임베딩은 작업 큐가 채우므로 run_worker 필요)
+REFERENCE_STORE_ENABLED = os.getenv('REFERENCE_STORE_ENABLED', 'False') == 'True'
+REFERENCE_STORE_MAX_CHARS = int(os.getenv('REFERENCE_STORE_MAX_CHARS', '20000'))
+LOCAL_DOCS_ENABLED = os.getenv('LOCAL_DOCS_ENABLED', 'False') == 'True'
+LOCAL_DOCS_MAX_DISTANCE = float(os.getenv('LOCAL_DOCS_MAX_DISTANCE', '0.25'))
+LOCAL_DOCS_MIN_CHUNKS = int(os.getenv('LOCAL_DOCS_MIN_CHUNKS', '2'))
+
+# 마크다운 변환: 'local' = 답변 마크다운을 로컬에서 정리 (API 호출 없음), 'llm' = Groq 재작성 (SSE 5단계에서 대기)
+# MARKDOWN_POLISH를 켜면 local로 먼저 저장하고 Groq 재작성은 작업 큐(polish_markdown)에서 덮어쓴다
+MARKDOWN_MODE = os.getenv('MARKDOWN_MODE', 'local')
+MARKDOWN_POLISH = os.getenv('MARKDOWN_POLISH', 'False') == 'True'
+
+# 답변 컨텍스트 토큰 예산 패커: 고정 글자 절삭(기록 500/1500자, 웹 200자, 이전 답변 500자) 대신
+# BUDGET 토큰을 과거 기록·웹 결과·이전 대화에 관련도 비례로 배분하고 출처 간 중복 문장을 제거
+CONTEXT_PACKING = os.getenv('CONTEXT_PACKING', 'False') == 'True'
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))
+
+# 프롬프트 템플릿 활성 버전 (services/prompts.py) — 예: {"answer": "v2"}. 없으면 마지막 등록 버전
+PROMPT_VERSIONS = json.loads(os.getenv('PROMPT_VERSIONS', '{}'))
+
+# 통합 후처리: 태그(+ llm 모드면 마크다운) + 모순 판정을 JSON 모드 Groq 1회로 — 실패하면 개별 호출.
+# 판정을 받으면 바로 기록하고 verify_log 작업은 생략 (benchmarks/0515/benchmark_postprocess.py)
+POSTPROCESS_COMBINED = os.getenv('POSTPROCESS_COMBINED', 'False') == 'True'
+
+# 로그 저장 시 임베딩을 작업 큐(embed_log)로 미룬다 — 저장 단계에서 mistral-embed 왕복 제거.
+# 워커(run_worker)를 함께 띄우는 환경에서만 True로 (그 전까지 로그는 질의 임베딩 임시값 + FTS로 검색된다)
+EMBEDDING_DEFERRED = os.getenv('EMBEDDING_DEFERRED', 'False') == 'True'
+# LearningLog.query_embedding(질문만의 임베딩)도 저장 — 검색 단계 임베딩 재사용이라 추가 API 호출 없음
+STORE_QUERY_EMBEDDING = os.getenv('STORE_QUERY_EMBEDDING', 'False') == 'True'
+
+# 로그 청크 (search/services/log_chunks.py): 답변을 섹션 단위 청크로 나눠 청크마다 임베딩·tsvector 저장
+# (임베딩은 embed_log 작업이 함께 채움). LOG_CHUNK_RETRIEVAL이면 검색이 로그 단위 순위와 청크 순위(로그별 최고 청크)를
+# RRF로 합치고, RAG 컨텍스트에 답변 앞부분 대신 질문과 맞는 청크를 넣는다. 기존 로그는 manage.py chunk_logs로 백필
+LOG_CHUNKS_ENABLED = os.getenv('LOG_CHUNKS_ENABLED', 'False') == 'True'
+LOG_CHUNK_RETRIEVAL = os.getenv('LOG_CHUNK_RETRIEVAL', 'False') == 'True'
+
+# 의미 캐시: 저장된 질문과 코사인 유사도가 THRESHOLD 이상이면 저장된 답변을 바로 반환
+# (query_embedding 기반 — STORE_QUERY_EMBEDDING이 꺼져 있으면 조회하지 않는다, 기존 로그는 embed_logs --query로 백필)
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'False') == 'True'
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+
 # Internationalization
 LANGUAGE_CODE = 'ko-kr'
 TIME_ZONE = 'Asia/Seoul'
@@ -1,10 +1,17 @@
 from django.contrib import admin
-from .models import LearningLog, Tag, Reference, Exercise, ExerciseAttempt, Streak, DailyJournal
+from .models import LearningLog, LearningLogChunk, Tag, Reference, ReferenceContent, ReferenceChunk, Exercise, ExerciseAttempt, Streak, DailyJournal, CachedEmbedding, CachedCompletion, CachedSearch, Job
 
 admin.site.register(LearningLog)
+admin.site.register(LearningLogChunk)
 admin.site.register(Tag)
 admin.site.register(Reference)
+admin.site.register(ReferenceContent)
+admin.site.register(ReferenceChunk)
 admin.site.register(Exercise)
 admin.site.register(ExerciseAttempt)
 admin.site.register(Streak)
-admin.site.register(DailyJournal)
\ No newline at end of file
+admin.site.register(DailyJournal)
+admin.site.register(CachedEmbedding)
+admin.site.register(CachedCompletion)
+admin.site.register(CachedSearch)
+admin.site.register(Job)
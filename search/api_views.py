@@ -1,6 +1,6 @@
 import json
-import threading
-from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
 from django.views import View
 from django.http import StreamingHttpResponse, HttpResponse, JsonResponse
@@ -11,9 +11,17 @@ from django.core.paginator import Paginator
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 
 from .models import LearningLog, Exercise, ExerciseAttempt, DailyJournal
-from .services import LearnlogService, ExerciseService, JournalService, build_search_agent
+from .services import LearnlogService, ExerciseService, JournalService, get_search_agent
+from .services.clients import clients
+from .services.embedding_cache import embedding_cache
+from .services.jobs import enqueue_verification
+from .services.llm_cache import llm_cache
+from .services.search_cache import search_cache
+from .services.semantic_cache import semantic_cache
+from .services.stream_postprocess import StreamingPostprocessor
 from .serializers import LearningLogDetailSerializer, LearningLogUpdateSerializer, QueryInputSerializer
 
 EXERCISE_TYPES = Exercise.EXERCISE_TYPE_CHOICES
@@ -34,7 +42,7 @@ class QueryHTMXView(View):
             })
 
         try:
-            service = LearnlogService()
+            service = LearnlogService.shared()
             log = service.process_query(query)
             return render(request, 'search/partials/result.html', {
                 'log': log,
@@ -66,66 +74,59 @@ class QuerySSEView(View):
         if parent_pk:
             parent = LearningLog.objects.filter(pk=parent_pk).first()
 
+        # "새로 생성": 의미 캐시 hit 화면에서 같은 질문을 다시 보낼 때
+        regenerate = request.POST.get('regenerate') == '1'
+
         return StreamingHttpResponse(
-            self._process_stream(query, custom_instructions, parent),
+            self._process_stream(query, custom_instructions, parent, regenerate),
             content_type='text/event-stream'
         )
 
     TOTAL_STEPS = 6  # 에이전트 노드 4 + 태그/마크다운 + 저장
 
-    def _process_stream(self, query, custom_instructions=None, parent=None):
+    def _process_stream(self, query, custom_instructions=None, parent=None, regenerate=False):
         try:
-            service = LearnlogService()
-            agent = build_search_agent(service)
+            service = LearnlogService.shared()
+            agent = get_search_agent(speculative_web=settings.SEARCH_AGENT_SPECULATIVE_WEB)
             total = self.TOTAL_STEPS
 
             yield self._sse_event('progress', {'step': 1, 'total': total, 'message': '내 학습 기록 검색 중...'})
 
             # updates: 노드 완료 시점의 상태 변화 / custom: generate 노드의 토큰
+            # 토큰을 중계하면서 마크다운·태그 후처리를 미리 진행 (5단계 단축)
+            post = StreamingPostprocessor(service, query)
             state = {}
             stream = agent.stream(
-                {'query': query, 'custom_instructions': custom_instructions, 'parent': parent},
+                {'query': query, 'custom_instructions': custom_instructions, 'parent': parent, 'regenerate': regenerate},
                 stream_mode=['updates', 'custom'],
             )
             for mode, chunk in stream:
                 if mode == 'custom':
                     if 'token' in chunk:
+                        if not chunk.get('cached'):
+                            post.feed(chunk['token'])
                         yield self._sse_event('stream_token', {'token': chunk['token']})
                     continue
 
                 for node, delta in chunk.items():
                     state.update(delta or {})
-                    if node == 'retrieve_logs':
-                        yield self._sse_event('progress', {'step': 2, 'total': total, 'message': '검색 경로 판단 중...'})
-                    elif node == 'router':
-                        if state.get('need_web', True):
-                            yield self._sse_event('progress', {'step': 3, 'total': total, 'message': '공식 문서 검색 중...'})
-                        else:
-                            yield self._sse_event('progress', {'step': 4, 'total': total, 'message': 'AI 답변 생성 중... (기존 기록으로 충분)'})
-                    elif node == 'web_search':
-                        yield self._sse_event('progress', {'step': 4, 'total': total, 'message': 'AI 답변 생성 중...'})
+                    event = self._node_progress(node, state)
+                    if event:
+                        yield event
+
+            # 의미 캐시 hit: 저장된 로그를 그대로 보여주고 저장·검증은 생략
+            if state.get('cached_log') is not None:
+                yield self._cached_event(self._render_result(state['cached_log'], cached=True))
+                return
 
             ai_answer = state.get('answer', '')
             search_results = state.get('search_results') or {'results': []}
-
-            # 라우터 판단 결과 → 답변 출처 (배지 표시 + 비동기 검증 대상 판단)
-            used_logs = state.get('use_logs', True) and bool(state.get('retrieved_logs'))
-            used_web = state.get('need_web', True)
-            if used_logs and used_web:
-                answer_source = 'both'
-            elif used_logs:
-                answer_source = 'logs'
-            elif used_web:
-                answer_source = 'web'
-            else:
-                answer_source = 'none'
+            answer_source = self._answer_source(state)
 
             yield self._sse_event('progress', {'step': 5, 'total': total, 'message': '태그 추출 + 마크다운 변환 중...'})
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                tags_future = executor.submit(service.extract_tags, query, ai_answer)
-                md_future = executor.submit(service.convert_to_markdown, query, ai_answer, search_results)
-                tag_names = tags_future.result()
-                markdown = md_future.result()
+            tag_names, markdown, verdict = post.finish(
+                ai_answer, search_results, self._verification_context(state, answer_source, search_results),
+            )
 
             yield self._sse_event('progress', {'step': 6, 'total': total, 'message': '저장 중...'})
 
@@ -133,45 +134,75 @@ class QuerySSEView(View):
                 query, ai_answer, markdown, search_results, tag_names, parent=parent,
                 answer_source=answer_source,
                 is_truncated=state.get('truncated', False),
+                embeddings=state.get('embeddings'),
+                verdict=verdict,
             )
-
-            # 모순 검증은 비동기 — 환각의 피해는 읽는 순간이 아니라 저장된 기록이 복습으로
-            # 암기되는 것이라, 응답을 막지 않고 저장 후 검사해서 배지로만 표시한다
-            if answer_source != 'none':
-                threading.Thread(
-                    target=self._verify_in_background,
-                    args=(
-                        log.pk,
-                        state.get('retrieved_logs') if used_logs else None,
-                        500 if used_web else 1500,  # 생성에 쓴 절삭 길이 그대로
-                        search_results if used_web else None,
-                    ),
-                    daemon=True,
-                ).start()
-
-            result_html = render_to_string('search/partials/result.html', {
-                'log': log,
-                'exercise_types': EXERCISE_TYPES,
-            })
-            yield self._sse_event('complete', {'html': result_html})
+            self._start_verification(log, state, answer_source, search_results)
+            yield self._sse_event('complete', {'html': self._render_result(log)})
 
         except Exception as e:
             error_html = render_to_string('search/partials/error.html', {'error_message': str(e)})
             yield self._sse_event('error', {'html': error_html})
 
+    def _node_progress(self, node, state):
+        """노드 완료 시점 → 다음 단계 진행 이벤트 (없으면 None)"""
+        total = self.TOTAL_STEPS
+        if node == 'retrieve_logs':
+            return self._sse_event('progress', {'step': 2, 'total': total, 'message': '검색 경로 판단 중...'})
+        if node == 'router':
+            if state.get('need_web', True):
+                return self._sse_event('progress', {'step': 3, 'total': total, 'message': '공식 문서 검색 중...'})
+            return self._sse_event('progress', {'step': 4, 'total': total, 'message': 'AI 답변 생성 중... (기존 기록으로 충분)'})
+        if node == 'web_search':
+            return self._sse_event('progress', {'step': 4, 'total': total, 'message': 'AI 답변 생성 중...'})
+        return None
+
     @staticmethod
-    def _verify_in_background(log_pk, retrieved_logs, retrieved_limit, search_results):
-        """저장 후 비동기 모순 검증 — 스레드별 DB 커넥션을 마지막에 정리한다"""
-        from django.db import connection
-        try:
-            log = LearningLog.objects.filter(pk=log_pk).first()
-            if log is None:
-                return
-            LearnlogService().verify_log(log, retrieved_logs, retrieved_limit, search_results)
-        except Exception as e:
-            print(f"비동기 검증 스레드 오류: {e}")
-        finally:
-            connection.close()
+    def _answer_source(state):
+        """라우터 판단 결과 → 답변 출처 (배지 표시 + 비동기 검증 대상 판단)"""
+        used_logs = state.get('use_logs', True) and bool(state.get('retrieved_logs'))
+        used_web = state.get('need_web', True)
+        if used_logs and used_web:
+            return 'both'
+        if used_logs:
+            return 'logs'
+        if used_web:
+            return 'web'
+        return 'none'
+
+    @staticmethod
+    def _verification_context(state, answer_source, search_results):
+        """Judge가 볼 생성 컨텍스트 (retrieved_logs, retrieved_limit, search_results) — 없으면 None"""
+        if answer_source == 'none':
+            return None
+        used_web = state.get('need_web', True)
+        return (
+            state.get('retrieved_logs') if answer_source in ('both', 'logs') else None,
+            500 if used_web else 1500,  # 생성에 쓴 절삭 길이 그대로
+            search_results if used_web else None,
+        )
+
+    @classmethod
+    def _start_verification(cls, log, state, answer_source, search_results):
+        # 모순 검증은 비동기 — 환각의 피해는 읽는 순간이 아니라 저장된 기록이 복습으로
+        # 암기되는 것이라, 응답을 막지 않고 저장 후 검사해서 배지로만 표시한다.
+        # 실행은 작업 큐 워커(run_worker)가 맡는다 — 재시작에도 남고 동시 실행 수가 고정된다.
+        # 통합 후처리에서 이미 판정을 받았으면(pending 아님) 건너뛴다
+        context = cls._verification_context(state, answer_source, search_results)
+        if context is None or log.verification != 'pending':
+            return
+        enqueue_verification(log, *context)
+
+    @staticmethod
+    def _render_result(log, cached=False):
+        return render_to_string('search/partials/result.html', {
+            'log': log,
+            'exercise_types': EXERCISE_TYPES,
+            'cached': cached,
+        })
+
+    def _cached_event(self, result_html):
+        return self._sse_event('complete', {'html': result_html, 'answer_source': 'cached'})
 
     def _error_stream(self, message):
         error_html = render_to_string('search/partials/error.html', {'error_message': message})
@@ -181,6 +212,100 @@ class QuerySSEView(View):
         return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class QueryAsyncSSEView(QuerySSEView):
+    """
+    QuerySSEView의 ASGI 버전 (settings.ASYNC_STREAMING=True일 때 /api/query/stream/).
+    LLM·검색 API를 기다리는 동안 이벤트 루프를 양보하므로 워커 하나가 스트림 여러 개를 동시에 든다.
+    ORM 접근(부모 조회·저장·결과 렌더링)만 sync_to_async로 넘긴다.
+    """
+    async def post(self, request):
+        query = request.POST.get('query', '').strip()
+
+        if len(query) < 5:
+            return StreamingHttpResponse(
+                self._aerror_stream("질문은 최소 5자 이상이어야 합니다."),
+                content_type='text/event-stream'
+            )
+
+        custom_instructions = request.POST.get('custom_instructions', '').strip() or None
+
+        parent = None
+        parent_pk = request.POST.get('parent_pk', '').strip()
+        if parent_pk:
+            parent = await LearningLog.objects.filter(pk=parent_pk).afirst()
+
+        regenerate = request.POST.get('regenerate') == '1'
+
+        return StreamingHttpResponse(
+            self._aprocess_stream(query, custom_instructions, parent, regenerate),
+            content_type='text/event-stream'
+        )
+
+    async def _aprocess_stream(self, query, custom_instructions=None, parent=None, regenerate=False):
+        try:
+            service = LearnlogService.shared()
+            agent = get_search_agent(speculative_web=settings.SEARCH_AGENT_SPECULATIVE_WEB, use_async=True)
+            total = self.TOTAL_STEPS
+
+            yield self._sse_event('progress', {'step': 1, 'total': total, 'message': '내 학습 기록 검색 중...'})
+
+            post = StreamingPostprocessor(service, query, use_async=True)
+            state = {}
+            stream = agent.astream(
+                {'query': query, 'custom_instructions': custom_instructions, 'parent': parent, 'regenerate': regenerate},
+                stream_mode=['updates', 'custom'],
+            )
+            async for mode, chunk in stream:
+                if mode == 'custom':
+                    if 'token' in chunk:
+                        if not chunk.get('cached'):
+                            post.feed(chunk['token'])
+                        yield self._sse_event('stream_token', {'token': chunk['token']})
+                    continue
+
+                for node, delta in chunk.items():
+                    state.update(delta or {})
+                    event = self._node_progress(node, state)
+                    if event:
+                        yield event
+
+            if state.get('cached_log') is not None:
+                result_html = await sync_to_async(self._render_result)(state['cached_log'], cached=True)
+                yield self._cached_event(result_html)
+                return
+
+            ai_answer = state.get('answer', '')
+            search_results = state.get('search_results') or {'results': []}
+            answer_source = self._answer_source(state)
+
+            yield self._sse_event('progress', {'step': 5, 'total': total, 'message': '태그 추출 + 마크다운 변환 중...'})
+            tag_names, markdown, verdict = await post.afinish(
+                ai_answer, search_results, self._verification_context(state, answer_source, search_results),
+            )
+
+            yield self._sse_event('progress', {'step': 6, 'total': total, 'message': '저장 중...'})
+
+            log = await sync_to_async(service.save_learning_log)(
+                query, ai_answer, markdown, search_results, tag_names, parent=parent,
+                answer_source=answer_source,
+                is_truncated=state.get('truncated', False),
+                embeddings=state.get('embeddings'),
+                verdict=verdict,
+            )
+            await sync_to_async(self._start_verification)(log, state, answer_source, search_results)
+            result_html = await sync_to_async(self._render_result)(log)
+            yield self._sse_event('complete', {'html': result_html})
+
+        except Exception as e:
+            error_html = render_to_string('search/partials/error.html', {'error_message': str(e)})
+            yield self._sse_event('error', {'html': error_html})
+
+    async def _aerror_stream(self, message):
+        for event in self._error_stream(message):
+            yield event
+
+
 class QueryAPIView(APIView):
     """REST API용 질문 처리 - JSON 반환"""
     def post(self, request):
@@ -192,7 +317,7 @@ class QueryAPIView(APIView):
         query = serializer.validated_data['query']
 
         try:
-            service = LearnlogService()
+            service = LearnlogService.shared()
             log = service.process_query(query)
             result_serializer = LearningLogDetailSerializer(log)
 
@@ -407,3 +532,24 @@ class JournalDismissAPIView(View):
         journal.is_dismissed = True
         journal.save(update_fields=['is_dismissed'])
         return HttpResponse('')  # 모달 영역을 빈 내용으로 교체 → 닫힘
+
+
+# ============================================
+# 운영 지표 API
+# ============================================
+
+class MetricsAPIView(APIView):
+    """
+    프로세스 내 지표 JSON — 외부 API 커넥션 재사용률, 임베딩·LLM 응답·검색·의미 캐시 적중률.
+    운영 내부 정보라 관리자(is_staff) 세션만 조회 가능
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'http_clients': clients.metrics(),
+            'embedding_cache': embedding_cache.stats(),
+            'llm_cache': llm_cache.stats(),
+            'search_cache': search_cache.stats(),
+            'semantic_cache': semantic_cache.stats(),
+        })
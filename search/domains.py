@@ -6,6 +6,8 @@
   Tavily가 옛 버전·릴리스 노트를 결과에 포함하지 않도록 함
 """
 import re
+from functools import lru_cache
+from urllib.parse import urlsplit
 
 TECH_DOCS_MAP = {
     # 컨테이너 / 인프라
@@ -123,23 +125,132 @@ TECH_DOCS_MAP = {
 }
 
 
-def _tech_in_query(tech: str, query_lower: str) -> bool:
+class DomainMatcher:
     """
-    substring 오매칭을 막는 키워드 매칭 ("django"의 'go', "javascript"의 'java' 등).
+    TECH_DOCS_MAP을 import 시점에 한 번 컴파일한 매처. 호출마다 키 전체를 순회하며 정규식을
+    만들던 것을 정규식 2개 + 사전 계산 테이블로 바꿔, 맵이 커져도 호출 비용이 거의 늘지 않는다.
+
+    substring 오매칭을 막는 규칙은 그대로 ("django"의 'go', "javascript"의 'java' 등):
     - ASCII 키: 영숫자 경계 검사. 표준 \\b는 한글을 단어문자로 취급해
       "go언어"처럼 한글이 붙는 표기가 매칭 실패하므로, 경계를 [a-z0-9] 부재로 정의.
-    - 한글 키: 조사가 붙어("도커를") 경계 검사가 불가. 대신 맵에 등록된 더 긴 키
-      ("자바스크립트")의 등장 부분을 지운 뒤 짧은 키("자바")를 검사한다.
+      긴 키 우선 alternation 하나로 위치마다 가장 긴 키를 찾고, 같은 위치에서 경계까지
+      함께 맞는 짧은 키("spring boot"의 'spring' 같은 접두 키)는 implied 테이블로 더한다.
+    - 한글 키: 조사가 붙어("도커를") 경계 검사가 불가. 위치마다 가장 긴 한글 키를 찾고,
+      앞서 찾은 더 긴 키("자바스크립트") 안에 들어간 등장("자바")은 버린다.
+    """
+
+    def __init__(self, tech_map):
+        self.tech_map = tech_map
+        self.order = {tech: i for i, tech in enumerate(tech_map)}  # 반환 도메인 순서 = 맵 순서
+        ascii_keys = sorted((k for k in tech_map if k.isascii()), key=len, reverse=True)
+        hangul_keys = sorted((k for k in tech_map if not k.isascii()), key=len, reverse=True)
+
+        self.ascii_re = self._alternation(ascii_keys, r"(?<![a-z0-9])(?=({})(?![a-z0-9]))")
+        self.hangul_re = self._alternation(hangul_keys, r"(?=({}))")
+        self.implied = {
+            key: [k for k in ascii_keys if len(k) < len(key) and key.startswith(k) and not key[len(k)].isalnum()]
+            for key in ascii_keys
+        }
+
+    @staticmethod
+    def _alternation(keys, template):
+        if not keys:
+            return None
+        return re.compile(template.format('|'.join(re.escape(k) for k in keys)))
+
+    def techs_in(self, query):
+        """질문에 등장하는 TECH_DOCS_MAP 키 집합"""
+        query_lower = query.lower()
+        found = set()
+        if self.ascii_re is not None:
+            for match in self.ascii_re.finditer(query_lower):
+                key = match.group(1)
+                found.add(key)
+                found.update(self.implied[key])
+        if self.hangul_re is not None and not query_lower.isascii():
+            covered_until = 0
+            for match in self.hangul_re.finditer(query_lower):
+                end = match.start() + len(match.group(1))
+                if end > covered_until:
+                    found.add(match.group(1))
+                    covered_until = end
+        return found
+
+    def domains_for(self, query):
+        domains = []
+        for tech in sorted(self.techs_in(query), key=self.order.__getitem__):
+            domains.extend(self.tech_map[tech])
+        return list(dict.fromkeys(domains))
+
+
+class SourceClassifier:
     """
-    if tech.isascii():
-        pattern = rf"(?<![a-z0-9]){re.escape(tech)}(?![a-z0-9])"
-        return re.search(pattern, query_lower) is not None
+    Reference.source_type 판별기. URL을 한 번 파싱해 호스트를 역순 라벨 트라이
+    (com → djangoproject → docs)로 내려가며 규칙을 모으고, 경로 접두사로 확정한다.
+    경로 접두사는 구간 단위 — docs.python.org/3은 /3, /3/...만 (/30, /3-foo는 아님)
+    - 규칙: TECH_DOCS_MAP의 도메인(경로 포함) → 'official', SOURCE_TYPE_HOSTS → 해당 유형
+    - 호스트 자신과 서브도메인에 적용되고, 더 구체적인 호스트 규칙이 우선
+      (docs.github.com은 github.com 규칙보다 먼저 'official')
+    - 도메인 문자열이 경로·쿼리에 들어 있는 URL은 매칭하지 않는다
+    - 호스트별 규칙 조회는 LRU 캐시 — 같은 사이트 결과가 반복되므로 트라이 탐색은 호스트당 1회
+    """
+
+    BLOG_HINT = 'blog'  # 규칙에 없는 호스트: 호스트명이나 첫 경로 구간에 있으면 'blog'
+
+    def __init__(self, tech_map, source_hosts, cache_size=4096):
+        self.trie = {}
+        for domains in tech_map.values():
+            for domain in domains:
+                host, _, path = domain.partition('/')
+                self._add(host, f"/{path.rstrip('/')}" if path else '', 'official')
+        for host, source_type in source_hosts.items():
+            self._add(host, '', source_type)
+        self.rules_for_host = lru_cache(maxsize=cache_size)(self._walk)
 
-    longer_keys = [k for k in TECH_DOCS_MAP if tech in k and k != tech]
-    cleaned = query_lower
-    for k in longer_keys:
-        cleaned = cleaned.replace(k, ' ')
-    return tech in cleaned
+    def _add(self, host, path_prefix, source_type):
+        node = self.trie
+        for label in reversed(host.split('.')):
+            node = node.setdefault(label, {})
+        node.setdefault(None, set()).add((path_prefix, source_type))
+
+    def _walk(self, host):
+        """호스트에 걸리는 (경로 접두사, 유형) 규칙 — 구체적인 호스트·긴 접두사 순"""
+        node = self.trie
+        found = []
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            if None in node:
+                found.append(sorted(node[None], key=lambda rule: len(rule[0]), reverse=True))
+        return tuple(rule for rules in reversed(found) for rule in rules)
+
+    @staticmethod
+    def _under(path, prefix):
+        return not prefix or path == prefix or path.startswith(prefix + '/')
+
+    def classify(self, url):
+        parsed = urlsplit(url.lower() if '//' in url else f"//{url.lower()}")
+        host = parsed.hostname or ''
+        for path_prefix, source_type in self.rules_for_host(host):
+            if self._under(parsed.path, path_prefix):
+                return source_type
+        first_segment = parsed.path.lstrip('/').split('/', 1)[0]
+        if self.BLOG_HINT in host or self.BLOG_HINT in first_segment:
+            return 'blog'
+        return 'other'
+
+
+# TECH_DOCS_MAP 밖에서 출처 유형이 정해진 호스트 (서브도메인 포함)
+SOURCE_TYPE_HOSTS = {
+    'stackoverflow.com': 'stackoverflow',
+    'github.com': 'github',
+    'medium.com': 'blog',
+    'dev.to': 'blog',
+}
+
+_matcher = DomainMatcher(TECH_DOCS_MAP)
+_classifier = SourceClassifier(TECH_DOCS_MAP, SOURCE_TYPE_HOSTS)
 
 
 def get_domains_for_query(query: str) -> list[str] | None:
@@ -148,25 +259,18 @@ def get_domains_for_query(query: str) -> list[str] | None:
     매칭되는 기술이 없으면 None을 반환해 도메인 제한 없이 전체 웹을 검색하게 한다.
     (github.com을 무조건 포함하면 한국어 질문이 임의 개인 레포로 오염되므로 제외)
     """
-    query_lower = query.lower()
-    domains = []
-
-    for tech, urls in TECH_DOCS_MAP.items():
-        if _tech_in_query(tech, query_lower):
-            domains.extend(urls)
-
-    # 중복 제거
-    domains = list(dict.fromkeys(domains))
-
-    return domains if domains else None
+    return _matcher.domains_for(query) or None
 
 
 def is_official_doc(url: str) -> bool:
     """
-    URL이 공식 문서인지 판단
+    URL이 공식 문서인지 판단 — 호스트가 등록 도메인(또는 그 서브도메인)이고 경로가 등록 경로 아래 (구간 단위)
     """
-    url_lower = url.lower()
-    official_domains = {d for domains in TECH_DOCS_MAP.values() for d in domains}
+    return _classifier.classify(url) == 'official'
 
-    return any(domain in url_lower for domain in official_domains)
 
+def classify_source(url: str) -> str:
+    """
+    URL의 출처 유형 (Reference.source_type 값): official / stackoverflow / github / blog / other
+    """
+    return _classifier.classify(url)
@@ -0,0 +1,73 @@
+"""
+학습 로그 답변을 청크로 나눠 저장·임베딩한다 (LearningLogChunk 백필 / 청크 크기 변경 후 재생성).
+
+LOG_CHUNKS_ENABLED 이전에 저장된 로그는 청크가 없어 청크 검색(LOG_CHUNK_RETRIEVAL)에서
+로그 단위 순위로만 잡힌다. 페이지마다 청크 저장 → 배치 임베딩(토큰 버킷) 순으로 커밋하므로
+중단돼도 완료분은 남는다.
+- 기본: 청크 없는 로그 + 임베딩 못 채운 청크가 있는 로그 → 그냥 다시 실행하면 남은 것부터 이어서 진행
+- --all: 전체 재생성 (기존 청크 삭제 후 다시 분할). 중단되면 마지막 출력의 체크포인트를 --after로 넘겨 재개
+
+사용법:
+  docker compose exec web python manage.py chunk_logs
+  docker compose exec web python manage.py chunk_logs --all
+  docker compose exec web python manage.py chunk_logs --all --after 120
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from search.models import LearningLog, LearningLogChunk
+from search.services import LearnlogService
+from search.services.log_chunks import build_chunks, embed_chunks
+from search.services.rate_limit import TokenBucket
+
+PAGE_SIZE = 50  # 로그 단위 (청크는 로그당 여러 개라 embed_logs보다 작게)
+
+
+class Command(BaseCommand):
+    help = "학습 로그 답변을 청크로 나눠 저장·임베딩합니다 (기본: 청크 없는 로그만)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='기존 청크를 지우고 전부 다시 분할')
+        parser.add_argument('--after', type=int, default=0, help='이 pk 다음부터 진행 (재개용)')
+        parser.add_argument('--rps', type=float, default=1.0, help='초당 임베딩 요청 수 (mistral 무료 티어 1)')
+
+    def handle(self, *args, **options):
+        service = LearnlogService()
+        limiter = TokenBucket(rate=options['rps'])
+
+        logs = LearningLog.objects.filter(pk__gt=options['after']).order_by('pk')
+        if not options['all']:
+            chunks = LearningLogChunk.objects.filter(log=OuterRef('pk'))
+            logs = logs.filter(~Exists(chunks) | Exists(chunks.filter(embedding__isnull=True)))
+        logs = logs.only('pk', 'query', 'ai_response')
+
+        created = failed = 0
+        last_pk = options['after']
+        while True:
+            page = list(logs.filter(pk__gt=last_pk)[:PAGE_SIZE])
+            if not page:
+                break
+
+            pks = [log.pk for log in page]
+            with transaction.atomic():
+                existing = LearningLogChunk.objects.filter(log_id__in=pks)
+                if options['all']:
+                    existing.delete()
+                    chunked = set()
+                else:
+                    chunked = set(existing.values_list('log_id', flat=True))
+                new_chunks = [chunk for log in page if log.pk not in chunked for chunk in build_chunks(log)]
+                LearningLogChunk.objects.bulk_create(new_chunks)
+            page_failed = embed_chunks(service, pks, rate_limiter=limiter)
+
+            created += len(new_chunks)
+            failed += page_failed
+            last_pk = page[-1].pk
+            if page_failed:
+                self.stdout.write(self.style.WARNING(f"  ✗ ~#{last_pk}: 청크 임베딩 실패 {page_failed}건"))
+            self.stdout.write(f"  ✓ ~#{last_pk}: 로그 {len(page)}건, 새 청크 {len(new_chunks)}개 (체크포인트 --after {last_pk})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: 청크 {created}개 생성, 임베딩 실패 {failed}건"
+        ))
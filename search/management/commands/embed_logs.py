@@ -1,38 +1,80 @@
 """
-임베딩이 없는 기존 LearningLog를 일괄 임베딩한다 (pgvector 백필).
-mistral-embed 호출이 발생하므로 필요할 때 1회만 실행.
+LearningLog를 일괄 임베딩한다 (pgvector 백필 / 모델 교체 후 재임베딩).
 
-사용법: docker compose exec web python manage.py embed_logs
-"""
-import time
+배치 요청(_embed_many, 토큰 예산 단위)을 --concurrency개까지 동시에 보내고, 요청 간격은 고정 sleep 대신
+토큰 버킷으로 맞춘다 (동시 요청은 응답 대기만 겹친다). 페이지마다 bulk_update로 커밋하므로 중단돼도 완료분은 남는다.
+- 기본: 임베딩 없는 로그 + 질의 임베딩 임시값이 남은 로그(embed_log 작업 실패)만
+  → 그냥 다시 실행하면 남은 것부터 이어서 진행
+- --all: 전체 재임베딩. 중단되면 마지막 출력의 체크포인트를 --after로 넘겨 재개
+- --query: 질문만의 임베딩(query_embedding, 의미 캐시용) 컬럼을 대상으로
 
+사용법:
+  docker compose exec web python manage.py embed_logs
+  docker compose exec web python manage.py embed_logs --all
+  docker compose exec web python manage.py embed_logs --all --after 120
+  docker compose exec web python manage.py embed_logs --query
+"""
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 
 from search.models import LearningLog
 from search.services import LearnlogService
+from search.services.rate_limit import TokenBucket
+
+PAGE_SIZE = 100  # bulk_update 단위 (= 재개 체크포인트 간격)
 
 
 class Command(BaseCommand):
-    help = "임베딩 없는 학습 로그를 일괄 임베딩합니다"
+    help = "학습 로그를 배치로 임베딩합니다 (기본: 임베딩 없는 로그만)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='이미 임베딩된 로그까지 전부 재임베딩')
+        parser.add_argument('--after', type=int, default=0, help='이 pk 다음부터 진행 (재개용)')
+        parser.add_argument('--query', action='store_true', help='query_embedding(질문만) 컬럼을 채움')
+        parser.add_argument('--rps', type=float, default=1.0, help='초당 임베딩 요청 수 (mistral 무료 티어 1)')
+        parser.add_argument('--concurrency', type=int, default=4, help='동시 배치 요청 수 (간격은 --rps가 제한)')
 
     def handle(self, *args, **options):
         service = LearnlogService()
-        logs = LearningLog.objects.filter(embedding__isnull=True).order_by('pk')
+        limiter = TokenBucket(rate=options['rps'])
+
+        field = 'query_embedding' if options['query'] else 'embedding'
+        update_fields = [field] if options['query'] else [field, 'embedding_provisional']
+        logs = LearningLog.objects.filter(pk__gt=options['after']).order_by('pk')
+        if not options['all']:
+            pending = Q(**{f'{field}__isnull': True})
+            if not options['query']:
+                pending |= Q(embedding_provisional=True)
+            logs = logs.filter(pending)
+        logs = logs.only('pk', 'query', 'ai_response')
+
         done = failed = 0
+        last_pk = options['after']
+        while True:
+            page = list(logs.filter(pk__gt=last_pk)[:PAGE_SIZE])
+            if not page:
+                break
+
+            texts = [
+                log.query if options['query'] else service._embedding_input(log.query, log.ai_response)
+                for log in page
+            ]
+            embeddings = service._embed_many(texts, rate_limiter=limiter, concurrency=options['concurrency'])
+
+            updated = []
+            for log, embedding in zip(page, embeddings):
+                if embedding is None:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"  ✗ #{log.pk}: 임베딩 실패"))
+                    continue
+                setattr(log, field, embedding)
+                log.embedding_provisional = False  # --query면 저장하지 않는 값
+                updated.append(log)
+            LearningLog.objects.bulk_update(updated, update_fields)
 
-        for log in logs:
-            time.sleep(1)  # mistral 무료 티어 레이트리밋(1 req/s) 회피
-            embedding = service._embed(
-                service._embedding_input(log.query, log.ai_response)
-            )
-            if embedding is None:
-                failed += 1
-                self.stdout.write(self.style.WARNING(f"  ✗ #{log.pk}: 임베딩 실패"))
-                continue
-            log.embedding = embedding
-            log.save(update_fields=['embedding'])
-            done += 1
-            self.stdout.write(f"  ✓ #{log.pk}: {log.query[:40]}")
+            done += len(updated)
+            last_pk = page[-1].pk
+            self.stdout.write(f"  ✓ ~#{last_pk}: {len(updated)}/{len(page)}건 (체크포인트 --after {last_pk})")
 
         self.stdout.write(self.style.SUCCESS(
             f"완료: 임베딩 {done}건, 실패 {failed}건"
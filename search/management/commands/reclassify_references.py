@@ -0,0 +1,51 @@
+"""
+저장된 Reference의 source_type을 현재 판별 규칙(search/domains.py classify_source)으로 다시 매긴다.
+TECH_DOCS_MAP·SOURCE_TYPE_HOSTS를 고친 뒤나, 예전 substring 판별로 저장된 행을 바로잡을 때.
+
+유형이 바뀌는 행만 모아 bulk_update 1회로 저장한다 (url·source_type 두 컬럼만 읽음).
+--dry-run이면 바뀔 건수와 예시만 출력.
+
+사용법:
+  docker compose exec web python manage.py reclassify_references --dry-run
+  docker compose exec web python manage.py reclassify_references
+"""
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from search.domains import classify_source
+from search.models import Reference
+
+EXAMPLES = 10  # 출력할 변경 예시 수
+
+
+class Command(BaseCommand):
+    help = "레퍼런스 출처 유형을 현재 규칙으로 일괄 재분류합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 바뀔 건수만 출력')
+        parser.add_argument('--batch-size', type=int, default=500, help='bulk_update 쿼리당 행 수')
+
+    def handle(self, *args, **options):
+        changed = []
+        transitions = Counter()
+        references = Reference.objects.only('pk', 'url', 'source_type').order_by('pk')
+        for reference in references.iterator(chunk_size=2000):
+            source_type = classify_source(reference.url)
+            if source_type == reference.source_type:
+                continue
+            transitions[(reference.source_type, source_type)] += 1
+            if len(changed) < EXAMPLES:
+                self.stdout.write(f"  #{reference.pk} {reference.source_type} → {source_type}: {reference.url}")
+            reference.source_type = source_type
+            changed.append(reference)
+
+        for (before, after), count in transitions.most_common():
+            self.stdout.write(f"  {before} → {after}: {count}건")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"dry-run: {len(changed)}건 변경 예정 (저장 안 함)"))
+            return
+
+        Reference.objects.bulk_update(changed, ['source_type'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"완료: {len(changed)}건 재분류"))
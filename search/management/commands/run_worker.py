@@ -0,0 +1,115 @@
+"""
+백그라운드 작업 큐(Job 테이블) 워커.
+
+--concurrency개의 스레드가 각자 SKIP LOCKED로 작업을 하나씩 가져가 실행한다 —
+여러 프로세스로 띄워도 같은 작업을 중복 실행하지 않는다.
+큐가 비면 점유 만료 작업을 회수하고 --poll초 쉰 뒤 다시 확인. SIGTERM/Ctrl+C면 진행 중인 작업만 마치고 종료.
+보존 기간이 지난 done/failed 작업은 유휴 시간에 PRUNE_INTERVAL_SEC마다 삭제한다.
+
+사용법:
+  docker compose exec web python manage.py run_worker
+  docker compose exec web python manage.py run_worker --concurrency 4
+  docker compose exec web python manage.py run_worker --once   # 지금 실행 가능한 작업만 처리하고 종료
+"""
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from search.services import jobs
+
+
+PRUNE_INTERVAL_SEC = 3600  # 끝난 작업 정리 주기 (스레드 간 공유)
+
+
+class Command(BaseCommand):
+    help = "백그라운드 작업 큐 워커를 실행합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='동시 실행 작업 수 (기본: settings.JOB_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument('--poll', type=float, default=2.0, help='큐가 비었을 때 재확인 간격(초)')
+        parser.add_argument('--once', action='store_true', help='실행 가능한 작업을 모두 처리하면 종료')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency'] or settings.JOB_WORKER_CONCURRENCY
+        self.stop = threading.Event()
+        self._prune_lock = threading.Lock()
+        self._pruned_at = None
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop.set())
+
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"점유 만료 작업 {requeued}건 재예약"))
+        self._prune()
+        self.stdout.write(f"워커 시작: 동시 {concurrency}개")
+
+        workers = [
+            threading.Thread(target=self._work, args=(options['poll'], options['once']), name=f'job-worker-{i}')
+            for i in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS("워커 종료"))
+
+    def _work(self, poll, once):
+        """
+        스레드마다 DB 커넥션 1개 — 종료 시 정리.
+        큐 조회·상태 저장 자체가 실패해도(DB 재시작 등) 스레드가 조용히 죽지 않도록
+        반복마다 예외를 잡아 기록하고, 커넥션을 닫아 다음 claim에서 다시 연결한다.
+        """
+        try:
+            while not self.stop.is_set():
+                try:
+                    if not self._work_once(poll, once):
+                        return
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f"워커 오류 ({threading.current_thread().name}): {e}"))
+                    connection.close()
+                    self.stop.wait(poll)
+        finally:
+            connection.close()
+
+    def _work_once(self, poll, once):
+        """작업 하나를 실행하거나 큐가 비었으면 쉰다. --once에서 큐가 비면 False"""
+        job = jobs.claim()
+        if job is None:
+            if once:
+                return False
+            jobs.requeue_stale()  # 다른 프로세스에서 죽은 워커의 작업도 회수
+            self._prune()
+            self.stop.wait(poll)
+            return True
+        ok = jobs.run_job(job)
+        mark = '✓' if ok else ('✗' if job.status == 'failed' else '↻')
+        self.stdout.write(f"  {mark} {job.kind}#{job.pk} (시도 {job.attempts}/{job.max_attempts})")
+        return True
+
+    def _prune(self):
+        """PRUNE_INTERVAL_SEC마다 한 스레드만 정리 — 나머지는 바로 돌아간다"""
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if self._pruned_at is not None and now - self._pruned_at < PRUNE_INTERVAL_SEC:
+                return
+            self._pruned_at = now
+            deleted = jobs.prune_finished()
+            if deleted:
+                self.stdout.write(f"보존 기간 지난 작업 {deleted}건 삭제")
+        finally:
+            self._prune_lock.release()
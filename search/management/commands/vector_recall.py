@@ -0,0 +1,85 @@
+"""
+HNSW 인덱스 검색의 recall@k를 정확 검색(seq scan)과 비교 측정한다.
+저장된 로그의 임베딩을 질의로 재사용하므로 mistral-embed 호출은 없다.
+
+ef_search를 여러 값으로 주면 값별 recall·지연을 나란히 출력한다 —
+settings.PGVECTOR_HNSW_EF_SEARCH를 정할 때 정확도/지연 trade-off 근거로 사용.
+
+사용법:
+  docker compose exec web python manage.py vector_recall
+  docker compose exec web python manage.py vector_recall --ef-search 10 40 100 --sample 50
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from pgvector.django import CosineDistance
+
+from search.models import LearningLog
+from search.services import LearnlogService
+
+
+class Command(BaseCommand):
+    help = "HNSW 벡터 검색의 recall@k를 정확 검색과 비교 측정합니다"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k', type=int, default=10, help='recall@k의 k')
+        parser.add_argument('--sample', type=int, default=30, help='질의로 쓸 로그 수')
+        parser.add_argument(
+            '--ef-search', type=int, nargs='+', default=None,
+            help='비교할 ef_search 값들 (기본: settings.PGVECTOR_HNSW_EF_SEARCH)',
+        )
+
+    def handle(self, *args, **options):
+        k = options['k']
+        ef_values = options['ef_search'] or [settings.PGVECTOR_HNSW_EF_SEARCH]
+        queries = list(
+            LearningLog.objects.exclude(embedding=None)
+            .order_by('?')
+            .values_list('pk', 'embedding')[:options['sample']]
+        )
+        if not queries:
+            self.stdout.write(self.style.WARNING("임베딩이 있는 로그가 없습니다 (embed_logs 먼저 실행)"))
+            return
+
+        exact = {}
+        exact_ms = []
+        for pk, embedding in queries:
+            start = time.perf_counter()
+            exact[pk] = self._exact_top_k(pk, embedding, k)
+            exact_ms.append((time.perf_counter() - start) * 1000)
+
+        self.stdout.write(f"질의 {len(queries)}건, k={k}")
+        self.stdout.write(f"  exact(seq scan)   recall 1.000 / 평균 {sum(exact_ms) / len(exact_ms):.1f}ms")
+
+        for ef_search in ef_values:
+            recalls = []
+            ann_ms = []
+            for pk, embedding in queries:
+                start = time.perf_counter()
+                with LearnlogService._ann_session(ef_search):
+                    approx = self._top_k(pk, embedding, k)
+                ann_ms.append((time.perf_counter() - start) * 1000)
+                if exact[pk]:
+                    recalls.append(len(set(approx) & set(exact[pk])) / len(exact[pk]))
+
+            recall = sum(recalls) / len(recalls) if recalls else 1.0
+            self.stdout.write(
+                f"  hnsw ef_search={ef_search:<4} recall {recall:.3f} / 평균 {sum(ann_ms) / len(ann_ms):.1f}ms"
+            )
+
+    @staticmethod
+    def _top_k(pk, embedding, k):
+        return list(
+            LearningLog.objects.exclude(embedding=None)
+            .exclude(pk=pk)  # 질의 자신은 항상 1위라 recall을 부풀린다
+            .order_by(CosineDistance('embedding', embedding))
+            .values_list('pk', flat=True)[:k]
+        )
+
+    def _exact_top_k(self, pk, embedding, k):
+        """인덱스 스캔을 끈 트랜잭션에서 조회 — 플래너가 seq scan + 정렬로 정확한 top-k를 낸다"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            return self._top_k(pk, embedding, k)
@@ -4,7 +4,9 @@
 남아있지 않으므로, 같은 시점에 수집된 reference 발췌를 컨텍스트로 사용한다.
 
 기본은 dry-run(리포트만 출력, 저장 안 함). --apply를 주면 verification 필드에
-저장돼 배지·연습문제 경고에 반영된다. 로그당 Groq 호출 1회.
+저장돼 배지·연습문제 경고에 반영된다. 로그당 Groq 호출 1회 —
+같은 로그를 다시 검사하면 LLM 응답 캐시에서 꺼내므로 호출도 대기도 없다
+(실행 간 재사용은 DB 단계가 있어야 함 — LLM_CACHE_DB=True).
 
 사용법:
   docker compose exec web python manage.py verify_logs --limit 10   # 맛보기
@@ -49,13 +51,16 @@ class Command(BaseCommand):
                 continue
             search_results = {'results': [{'url': r.url, 'content': r.excerpt} for r in refs]}
 
-            time.sleep(CALL_GAP_SEC)
+            misses = service.llm_cache.misses
             try:
                 verdict = service.check_consistency(log.ai_response, search_results=search_results)
             except Exception as e:
+                time.sleep(CALL_GAP_SEC)
                 failed += 1
                 self.stdout.write(self.style.WARNING(f"  ? #{log.pk}: 판정 실패 ({e})"))
                 continue
+            if service.llm_cache.misses > misses:
+                time.sleep(CALL_GAP_SEC)  # 실제 API를 호출한 경우에만 간격 유지 (캐시 hit은 한도 무관)
             if verdict is None:
                 skipped += 1
                 continue
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0009_learninglog_answer_source_learninglog_is_truncated_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninglog',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('query', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('ai_response', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='검색 벡터'),
+        ),
+        migrations.AddIndex(
+            model_name='learninglog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='learninglog_search_gin'),
+        ),
+    ]
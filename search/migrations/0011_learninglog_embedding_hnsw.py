@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:42
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0010_learninglog_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='learninglog',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='learninglog_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
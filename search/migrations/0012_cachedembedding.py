@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:44
+
+import django.utils.timezone
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0011_learninglog_embedding_hnsw'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('model', models.CharField(max_length=50, verbose_name='임베딩 모델')),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=1024, verbose_name='임베딩')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일')),
+                ('last_used_at', models.DateTimeField(auto_now=True, verbose_name='최근 사용일')),
+            ],
+            options={
+                'verbose_name': '임베딩 캐시',
+                'verbose_name_plural': '임베딩 캐시',
+                'indexes': [models.Index(fields=['last_used_at'], name='search_cach_last_us_4aeaa4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0012_cachedembedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='작업 종류')),
+                ('payload', models.JSONField(default=dict, verbose_name='인자')),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '실행 중'), ('done', '완료'), ('failed', '실패')], default='queued', max_length=10, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='최대 시도 횟수')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='실행 예정 시각')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='점유 시각')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='종료일')),
+            ],
+            options={
+                'verbose_name': '백그라운드 작업',
+                'verbose_name_plural': '백그라운드 작업',
+                'indexes': [models.Index(fields=['status', 'run_at'], name='search_job_status_0ccca7_idx')],
+            },
+        ),
+    ]
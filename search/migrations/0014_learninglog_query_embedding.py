@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:59
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0013_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninglog',
+            name='query_embedding',
+            field=pgvector.django.vector.VectorField(blank=True, dimensions=1024, null=True, verbose_name='질문 임베딩'),
+        ),
+        migrations.AddIndex(
+            model_name='learninglog',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['query_embedding'], m=16, name='learninglog_query_emb_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0014_learninglog_query_embedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('model', models.CharField(max_length=100, verbose_name='모델')),
+                ('content', models.TextField(verbose_name='응답')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일')),
+                ('last_used_at', models.DateTimeField(auto_now=True, verbose_name='최근 사용일')),
+            ],
+            options={
+                'verbose_name': 'LLM 응답 캐시',
+                'verbose_name_plural': 'LLM 응답 캐시',
+                'indexes': [models.Index(fields=['last_used_at'], name='search_cach_last_us_50ff9f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0015_cachedcompletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exercise',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='프롬프트 버전'),
+        ),
+        migrations.AddField(
+            model_name='learninglog',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='프롬프트 버전'),
+        ),
+    ]
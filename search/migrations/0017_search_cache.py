@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0016_prompt_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('query', models.CharField(max_length=300, verbose_name='정규화 검색어')),
+                ('response', models.JSONField(verbose_name='검색 응답')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일')),
+                ('expires_at', models.DateTimeField(verbose_name='만료일')),
+                ('last_used_at', models.DateTimeField(auto_now=True, verbose_name='최근 사용일')),
+                ('refresh_requested_at', models.DateTimeField(blank=True, null=True, verbose_name='갱신 요청일')),
+            ],
+            options={
+                'verbose_name': '검색 결과 캐시',
+                'verbose_name_plural': '검색 결과 캐시',
+                'indexes': [models.Index(fields=['last_used_at'], name='search_cach_last_us_70ef93_idx'), models.Index(fields=['expires_at'], name='search_cach_expires_df4300_idx')],
+            },
+        ),
+    ]
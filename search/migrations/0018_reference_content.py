@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0017_search_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField(verbose_name='압축 본문')),
+                ('length', models.PositiveIntegerField(verbose_name='본문 글자 수')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='본문 해시')),
+                ('fetched_at', models.DateTimeField(auto_now_add=True, verbose_name='수집일')),
+                ('reference', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='content', to='search.reference', verbose_name='레퍼런스')),
+            ],
+            options={
+                'verbose_name': '레퍼런스 본문',
+                'verbose_name_plural': '레퍼런스 본문',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReferenceChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='순서')),
+                ('text', models.TextField(verbose_name='청크 내용')),
+                ('embedding', pgvector.django.vector.VectorField(blank=True, dimensions=1024, null=True, verbose_name='임베딩')),
+                ('search_vector', models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('text', config='simple'), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='검색 벡터')),
+                ('reference', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='search.reference', verbose_name='레퍼런스')),
+            ],
+            options={
+                'verbose_name': '레퍼런스 청크',
+                'verbose_name_plural': '레퍼런스 청크',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='referencechunk_search_gin'), pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='referencechunk_embedding_hnsw', opclasses=['vector_cosine_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('reference', 'position'), name='referencechunk_unique_position')],
+            },
+        ),
+    ]
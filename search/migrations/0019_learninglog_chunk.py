@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:36
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0018_reference_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearningLogChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='순서')),
+                ('text', models.TextField(verbose_name='청크 내용')),
+                ('embedding', pgvector.django.vector.VectorField(blank=True, dimensions=1024, null=True, verbose_name='임베딩')),
+                ('search_vector', models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('text', config='simple'), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='검색 벡터')),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='search.learninglog', verbose_name='학습 로그')),
+            ],
+            options={
+                'verbose_name': '학습 로그 청크',
+                'verbose_name_plural': '학습 로그 청크',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='learninglogchunk_search_gin'), pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='learninglogchunk_embedding_hnsw', opclasses=['vector_cosine_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('log', 'position'), name='learninglogchunk_unique_position')],
+            },
+        ),
+    ]
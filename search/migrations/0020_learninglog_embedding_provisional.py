@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0019_learninglog_chunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninglog',
+            name='embedding_provisional',
+            field=models.BooleanField(default=False, verbose_name='임시 임베딩(질의만)'),
+        ),
+    ]
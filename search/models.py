@@ -1,7 +1,11 @@
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+import hashlib
+import zlib
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField, SearchQuery, SearchRank
 from django.db import models
 from django.utils import timezone
-from pgvector.django import VectorField
+from pgvector.django import HnswIndex, VectorField
 
 
 class Tag(models.Model):
@@ -54,6 +58,90 @@ class Reference(models.Model):
         return self.title
 
 
+class ReferenceContent(models.Model):
+    """
+    레퍼런스 본문 전체 (excerpt는 앞 500자뿐) — zlib 압축 저장, URL당 1회 (services/reference_store.py).
+    검색은 이 본문을 나눈 ReferenceChunk가 맡고, 여기서는 원문 확인·청크 재생성용으로 보관한다.
+    """
+    reference = models.OneToOneField(
+        Reference,
+        on_delete=models.CASCADE,
+        related_name='content',
+        verbose_name="레퍼런스"
+    )
+    data = models.BinaryField(verbose_name="압축 본문")
+    length = models.PositiveIntegerField(verbose_name="본문 글자 수")
+    content_hash = models.CharField(max_length=64, verbose_name="본문 해시")
+    fetched_at = models.DateTimeField(auto_now_add=True, verbose_name="수집일")
+
+    class Meta:
+        verbose_name = "레퍼런스 본문"
+        verbose_name_plural = "레퍼런스 본문"
+
+    @classmethod
+    def from_text(cls, reference, text):
+        return cls(
+            reference=reference,
+            data=zlib.compress(text.encode(), 6),
+            length=len(text),
+            content_hash=hashlib.sha256(text.encode()).hexdigest(),
+        )
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.data)).decode()
+
+    def __str__(self):
+        return f"{self.reference_id}: {self.length}자"
+
+
+class ReferenceChunk(models.Model):
+    """
+    레퍼런스 본문 청크 — 로컬 문서 코퍼스 (LearningLog와 같은 FTS + 벡터 하이브리드 검색).
+    embedding은 작업 큐(embed_reference_chunks)가 채운다. 그 전까지는 FTS로만 검색된다.
+    """
+    reference = models.ForeignKey(
+        Reference,
+        on_delete=models.CASCADE,
+        related_name='chunks',
+        verbose_name="레퍼런스"
+    )
+    position = models.PositiveIntegerField(verbose_name="순서")
+    text = models.TextField(verbose_name="청크 내용")
+    embedding = VectorField(
+        dimensions=1024,  # mistral-embed 차원
+        null=True,
+        blank=True,
+        verbose_name="임베딩"
+    )
+    search_vector = models.GeneratedField(
+        expression=SearchVector('text', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="검색 벡터"
+    )
+
+    class Meta:
+        verbose_name = "레퍼런스 청크"
+        verbose_name_plural = "레퍼런스 청크"
+        constraints = [
+            models.UniqueConstraint(fields=['reference', 'position'], name='referencechunk_unique_position'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='referencechunk_search_gin'),
+            HnswIndex(
+                fields=['embedding'],
+                name='referencechunk_embedding_hnsw',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reference_id}#{self.position}"
+
+
 class LearningLog(models.Model):
     query = models.CharField(
         max_length=500, 
@@ -95,6 +183,20 @@ class LearningLog(models.Model):
         blank=True,
         verbose_name="임베딩"
     )
+    # EMBEDDING_DEFERRED 저장 시 embedding에 임시로 넣은 질의 임베딩 — embed_log가 질의+답변 임베딩으로
+    # 교체하면 False. 작업이 끝내 실패해 남은 행은 embed_logs 백필이 이 플래그로 찾는다
+    embedding_provisional = models.BooleanField(
+        default=False,
+        verbose_name="임시 임베딩(질의만)"
+    )
+    # 질문만의 임베딩 (settings.STORE_QUERY_EMBEDDING) — 질문↔질문 유사도를 API 호출 없이 비교.
+    # 검색 단계에서 이미 계산한 질의 임베딩을 저장 시 그대로 넣는다
+    query_embedding = VectorField(
+        dimensions=1024,
+        null=True,
+        blank=True,
+        verbose_name="질문 임베딩"
+    )
 
     ANSWER_SOURCE_CHOICES = [
         ('both', '내 기록 + 웹 문서'),
@@ -129,6 +231,22 @@ class LearningLog(models.Model):
         blank=True,
         verbose_name="검증 메모"
     )
+    prompt_version = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',  # 'answer@v1' — 생성에 쓴 프롬프트 템플릿 (services/prompts.py), 도입 전 로그는 빈 값
+        verbose_name="프롬프트 버전"
+    )
+    # FTS용 tsvector를 DB가 저장 시점에 계산 — 조회마다 전체 답변을 to_tsvector하지 않는다
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('query', weight='A', config='simple') +
+            SearchVector('ai_response', weight='B', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="검색 벡터"
+    )
     view_count = models.PositiveIntegerField(
         default=0,
         verbose_name="조회수"
@@ -144,6 +262,22 @@ class LearningLog(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['query']),
             models.Index(fields=['is_bookmarked']),
+            GinIndex(fields=['search_vector'], name='learninglog_search_gin'),
+            # 코사인 거리 ANN 인덱스 — 검색 시 recall/지연은 settings.PGVECTOR_HNSW_EF_SEARCH로 조절
+            HnswIndex(
+                fields=['embedding'],
+                name='learninglog_embedding_hnsw',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            HnswIndex(
+                fields=['query_embedding'],
+                name='learninglog_query_emb_hnsw',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
         ]
     
     def __str__(self):
@@ -178,12 +312,11 @@ class LearningLog(models.Model):
             base = base.filter(tags__slug__in=tags).distinct()
 
         if q:
-            vector = (
-                SearchVector('query', weight='A', config='simple') +
-                SearchVector('ai_response', weight='B', config='simple')
-            )
             query = SearchQuery(q, config='simple')
-            base = base.annotate(rank=SearchRank(vector, query)).filter(rank__gt=0)
+            base = (
+                base.filter(search_vector=query)  # GIN 인덱스로 후보를 먼저 좁힌다
+                .annotate(rank=SearchRank('search_vector', query))
+            )
 
         if sort == 'relevance' and q:
             return base.order_by('-rank')
@@ -194,6 +327,157 @@ class LearningLog(models.Model):
         return base.order_by('-created_at')
 
 
+class LearningLogChunk(models.Model):
+    """
+    답변(ai_response)의 섹션 단위 청크 — 2000자 뒤의 내용과 답변 안의 여러 하위 주제도 검색되게 한다.
+    청크마다 임베딩·tsvector를 두고, 검색은 로그별 최고 청크로 모아 로그 단위 순위와 RRF로 합친다
+    (services/log_chunks.py, settings.LOG_CHUNK_RETRIEVAL).
+    """
+    log = models.ForeignKey(
+        LearningLog,
+        on_delete=models.CASCADE,
+        related_name='chunks',
+        verbose_name="학습 로그"
+    )
+    position = models.PositiveIntegerField(verbose_name="순서")
+    text = models.TextField(verbose_name="청크 내용")
+    embedding = VectorField(
+        dimensions=1024,  # mistral-embed 차원
+        null=True,
+        blank=True,
+        verbose_name="임베딩"
+    )
+    search_vector = models.GeneratedField(
+        expression=SearchVector('text', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="검색 벡터"
+    )
+
+    class Meta:
+        verbose_name = "학습 로그 청크"
+        verbose_name_plural = "학습 로그 청크"
+        constraints = [
+            models.UniqueConstraint(fields=['log', 'position'], name='learninglogchunk_unique_position'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='learninglogchunk_search_gin'),
+            HnswIndex(
+                fields=['embedding'],
+                name='learninglogchunk_embedding_hnsw',
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.log_id}#{self.position}"
+
+
+class CachedEmbedding(models.Model):
+    """
+    임베딩 캐시의 DB 단계 (services/embedding_cache.py).
+    key = sha256(모델명 + 정규화 텍스트) — 원문은 저장하지 않는다.
+    """
+    key = models.CharField(max_length=64, unique=True, verbose_name="캐시 키")
+    model = models.CharField(max_length=50, verbose_name="임베딩 모델")
+    embedding = VectorField(dimensions=1024, verbose_name="임베딩")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="생성일")
+    last_used_at = models.DateTimeField(auto_now=True, verbose_name="최근 사용일")
+
+    class Meta:
+        verbose_name = "임베딩 캐시"
+        verbose_name_plural = "임베딩 캐시"
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.key[:12]}"
+
+
+class CachedCompletion(models.Model):
+    """
+    Groq 응답 캐시의 DB 단계 (services/llm_cache.py).
+    key = sha256(모델 + 메시지 + 디코딩 파라미터) — 프롬프트 원문은 저장하지 않는다.
+    """
+    key = models.CharField(max_length=64, unique=True, verbose_name="캐시 키")
+    model = models.CharField(max_length=100, verbose_name="모델")
+    content = models.TextField(verbose_name="응답")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="생성일")
+    last_used_at = models.DateTimeField(auto_now=True, verbose_name="최근 사용일")
+
+    class Meta:
+        verbose_name = "LLM 응답 캐시"
+        verbose_name_plural = "LLM 응답 캐시"
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.key[:12]}"
+
+
+class CachedSearch(models.Model):
+    """
+    Tavily 검색 결과 캐시의 DB 단계 (services/search_cache.py).
+    key = sha256(정규화 검색어 + include_domains + 검색 옵션)
+    """
+    key = models.CharField(max_length=64, unique=True, verbose_name="캐시 키")
+    query = models.CharField(max_length=300, verbose_name="정규화 검색어")
+    response = models.JSONField(verbose_name="검색 응답")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="생성일")
+    expires_at = models.DateTimeField(verbose_name="만료일")
+    last_used_at = models.DateTimeField(auto_now=True, verbose_name="최근 사용일")
+    refresh_requested_at = models.DateTimeField(null=True, blank=True, verbose_name="갱신 요청일")
+
+    class Meta:
+        verbose_name = "검색 결과 캐시"
+        verbose_name_plural = "검색 결과 캐시"
+        indexes = [
+            models.Index(fields=['last_used_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.query[:40]}:{self.key[:12]}"
+
+
+class Job(models.Model):
+    """
+    DB 기반 백그라운드 작업 큐 (services/jobs.py, manage.py run_worker).
+    워커는 SELECT ... FOR UPDATE SKIP LOCKED로 queued 작업을 하나씩 가져가므로
+    여러 워커가 같은 작업을 중복 실행하지 않는다. 실패하면 run_at을 미뤄 재시도.
+    """
+    STATUS_CHOICES = [
+        ('queued', '대기'),
+        ('running', '실행 중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    ]
+    kind = models.CharField(max_length=50, verbose_name="작업 종류")
+    payload = models.JSONField(default=dict, verbose_name="인자")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name="상태")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="최대 시도 횟수")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="실행 예정 시각")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="점유 시각")
+    last_error = models.TextField(blank=True, verbose_name="마지막 오류")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="종료일")
+
+    class Meta:
+        verbose_name = "백그라운드 작업"
+        verbose_name_plural = "백그라운드 작업"
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.pk} ({self.status})"
+
+
 REVIEW_INTERVALS = [1, 3, 7, 14, 30]
 
 
@@ -215,6 +499,7 @@ class Exercise(models.Model):
         verbose_name="유형"
     )
     content = models.JSONField(verbose_name="문제 내용")
+    prompt_version = models.CharField(max_length=50, blank=True, default='', verbose_name="프롬프트 버전")
     review_interval = models.PositiveIntegerField(default=1, verbose_name="복습 주기(일)")
     next_review_at = models.DateTimeField(null=True, blank=True, verbose_name="다음 복습일")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
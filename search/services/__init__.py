@@ -1,4 +1,4 @@
 from .learnlog_service import LearnlogService
 from .exercise_service import ExerciseService
 from .journal_service import JournalService
-from .search_agent import build_search_agent
+from .search_agent import build_search_agent, get_search_agent
@@ -0,0 +1,89 @@
+"""
+검색용 청크 분할 (레퍼런스 본문 · 긴 답변).
+
+마크다운 제목(#~######)으로 섹션을 나누고, 섹션 안에서는 문단(빈 줄) 단위로 max_chars까지 채운다.
+청크마다 섹션 제목을 앞에 붙여 단독으로 임베딩해도 주제가 남게 한다.
+코드 펜스 안의 빈 줄·'#' 주석은 경계로 보지 않는다. 한 문단이 max_chars를 넘으면
+문장 경계(없으면 공백, 그것도 없으면 글자 수)에서 자른다.
+"""
+import re
+
+CHUNK_CHARS = 1000     # 청크 최대 글자 수 (제목 포함)
+MIN_CHUNK_CHARS = 80   # 이보다 짧은 섹션 꼬리는 앞 청크에 붙인다 (최대 글자 수를 이만큼 넘길 수 있음)
+
+_HEADING = re.compile(r"^#{1,6}\s+\S")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n")
+
+
+def sections(text):
+    """(제목 줄 또는 '', 본문 문단 목록) — 제목 앞 본문은 제목 ''인 첫 섹션"""
+    heading, paragraphs, current = '', [], []
+    in_fence = False
+    result = []
+
+    def flush_paragraph():
+        if current and ''.join(current).strip():
+            paragraphs.append('\n'.join(current).strip('\n'))
+        current.clear()
+
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _HEADING.match(line):
+            flush_paragraph()
+            if heading or paragraphs:
+                result.append((heading, paragraphs))
+            heading, paragraphs = line.strip(), []
+            continue
+        elif not in_fence and not line.strip():
+            flush_paragraph()
+            continue
+        current.append(line)
+    flush_paragraph()
+    if heading or paragraphs:
+        result.append((heading, paragraphs))
+    return result
+
+
+def _split_long(paragraph, limit):
+    """limit을 넘는 문단을 문장 → 공백 → 글자 수 순으로 잘라 limit 이하 조각으로"""
+    pieces = []
+    rest = paragraph
+    while len(rest) > limit:
+        window = rest[:limit]
+        cut = max((m.end() for m in _SENTENCE_END.finditer(window) if m.end() < limit), default=0)
+        if cut < limit // 2:
+            cut = window.rfind(' ') + 1
+        if cut < limit // 2:
+            cut = limit
+        pieces.append(rest[:cut].strip())
+        rest = rest[cut:].lstrip()
+    if rest.strip():
+        pieces.append(rest.strip())
+    return pieces
+
+
+def chunk_text(text, max_chars=CHUNK_CHARS):
+    """섹션 인지 청크 목록 (빈 텍스트면 [])"""
+    chunks = []
+    for heading, paragraphs in sections(text or ''):
+        prefix = f"{heading}\n" if heading else ''
+        limit = max(max_chars - len(prefix), max_chars // 2)
+        parts = [piece for paragraph in paragraphs for piece in _split_long(paragraph, limit)]
+        if not parts:
+            continue  # 제목만 있는 섹션 (바로 하위 제목이 이어지는 경우)
+
+        packed, current = [], ''
+        for part in parts:
+            if current and len(current) + 2 + len(part) > limit:
+                packed.append(current)
+                current = part
+            else:
+                current = f"{current}\n\n{part}" if current else part
+        if packed and len(current) < MIN_CHUNK_CHARS and len(packed[-1]) + 2 + len(current) <= limit + MIN_CHUNK_CHARS:
+            packed[-1] = f"{packed[-1]}\n\n{current}"
+        else:
+            packed.append(current)
+        chunks.extend(prefix + body for body in packed)
+    return chunks
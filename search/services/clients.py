@@ -0,0 +1,217 @@
+"""
+외부 LLM/검색 SDK 클라이언트 레지스트리.
+
+서비스(Learnlog/Exercise/Journal)가 각자 Mistral·Groq·Tavily 클라이언트를 만들면
+요청마다 커넥션 풀이 새로 생겨 TLS 핸드셰이크를 반복한다. 여기서 provider별로
+keep-alive 풀을 하나씩 소유하고, 모든 서비스가 같은 클라이언트를 받아 쓴다.
+
+    mistral, groq → httpx.Client (CountingTransport: 풀 크기·keepalive·HTTP/2 설정)
+    tavily        → requests.Session (SDK가 requests 기반 — CountingAdapter: 풀 크기 설정 + 같은 지표)
+    *_async       → httpx.AsyncClient (ASGI 스트리밍 경로용, 같은 풀 설정 — 지표는 '<provider>_async')
+
+metrics()는 provider별 요청 수 / 새 커넥션 수 / TLS 핸드셰이크 수 / 재사용률을 반환한다
+(/api/metrics/에서 확인, 관리자 전용 — 부하 중 handshakes가 요청 수만큼 늘지 않으면 재사용 중).
+"""
+import threading
+
+import httpx
+import requests
+from django.conf import settings
+from groq import AsyncGroq, Groq
+from mistralai.client import Mistral
+from requests.adapters import HTTPAdapter
+from tavily import AsyncTavilyClient, TavilyClient
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class ConnectionStats:
+    """httpcore trace 이벤트로 집계하는 커넥션 재사용 지표 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = self.connections = self.tls_handshakes = 0
+
+    def trace(self, event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.connections += 1
+        elif event_name == 'connection.start_tls.complete':
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self):
+        with self._lock:
+            return _summary(self.requests, self.connections, self.tls_handshakes)
+
+
+def _summary(requests_count, connections, tls_handshakes):
+    return {
+        'requests': requests_count,
+        'connections': connections,
+        'tls_handshakes': tls_handshakes,
+        'reuse_rate': 1 - connections / requests_count if requests_count else 0.0,
+    }
+
+
+class CountingTransport(httpx.HTTPTransport):
+    """요청마다 trace 확장을 붙여 새 커넥션·TLS 핸드셰이크를 센다"""
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request):
+        self.stats.record_request()
+        outer = request.extensions.get('trace')
+
+        def trace(event_name, info):
+            self.stats.trace(event_name, info)
+            if outer is not None:
+                outer(event_name, info)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        return super().handle_request(request)
+
+
+class AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    """CountingTransport의 async 버전 — httpcore는 async 경로에서 코루틴 trace 콜백을 요구한다"""
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request):
+        self.stats.record_request()
+        outer = request.extensions.get('trace')
+
+        async def trace(event_name, info):
+            self.stats.trace(event_name, info)
+            if outer is not None:
+                await outer(event_name, info)
+
+        request.extensions = {**request.extensions, 'trace': trace}
+        return await super().handle_async_request(request)
+
+
+def _counting_pool(pool_class, stats, tls):
+    """새 커넥션을 만들 때마다 stats에 trace 이벤트를 넘기는 urllib3 풀 클래스 (ConnectionCls 교체)"""
+    class CountingConnection(pool_class.ConnectionCls):
+        def connect(self):
+            super().connect()
+            stats.trace('connection.connect_tcp.complete', None)
+            if tls:
+                stats.trace('connection.start_tls.complete', None)
+
+    return type(f'Counting{pool_class.__name__}', (pool_class,), {'ConnectionCls': CountingConnection})
+
+
+class CountingAdapter(HTTPAdapter):
+    """requests 세션용 CountingTransport — 요청 수는 send에서, 새 커넥션·TLS는 커넥션 클래스 훅에서 센다"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats  # HTTPAdapter.__init__이 init_poolmanager를 부르므로 먼저
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats, tls=False),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats, tls=True),
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+class ClientRegistry:
+    """provider별 SDK 클라이언트를 첫 사용 시 한 번 만들어 프로세스 전체가 공유"""
+
+    def __init__(self):
+        self._clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def mistral(self):
+        """Mistral SDK는 한 클라이언트가 sync/async 메서드를 모두 가져 풀도 둘 다 넘긴다"""
+        return self._get('mistral', lambda: Mistral(
+            api_key=settings.MISTRAL_API_KEY,
+            client=self._httpx_client('mistral'),
+            async_client=self._httpx_client('mistral_async', async_=True),
+            timeout_ms=120_000,
+        ))
+
+    def groq(self):
+        return self._get('groq', lambda: Groq(
+            api_key=settings.GROQ_API_KEY,
+            http_client=self._httpx_client('groq'),
+        ))
+
+    def groq_async(self):
+        return self._get('groq_async', lambda: AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            http_client=self._httpx_client('groq_async', async_=True),
+        ))
+
+    def tavily(self):
+        return self._get('tavily', lambda: TavilyClient(
+            api_key=settings.TAVILY_API_KEY,
+            session=self._requests_session('tavily'),
+        ))
+
+    def tavily_async(self):
+        return self._get('tavily_async', lambda: AsyncTavilyClient(
+            api_key=settings.TAVILY_API_KEY,
+            client=self._httpx_client('tavily_async', async_=True),
+        ))
+
+    def metrics(self):
+        return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def reset(self):
+        """클라이언트·지표 폐기 (테스트용) — 다음 호출 때 새로 만든다"""
+        with self._lock:
+            self._clients.clear()
+            self._stats.clear()
+
+    def _get(self, name, factory):
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = factory()
+                    self._clients[name] = client
+        return client
+
+    def _httpx_client(self, name, async_=False):
+        stats = self._stats[name] = ConnectionStats()
+        transport_class, client_class = (
+            (AsyncCountingTransport, httpx.AsyncClient) if async_ else (CountingTransport, httpx.Client)
+        )
+        transport = transport_class(
+            stats,
+            http2=settings.HTTP_CLIENT_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            ),
+        )
+        # SDK가 요청별 timeout을 넘기지 않는 경우의 기본값 — httpx 기본 5초는 스트리밍 답변에 너무 짧다
+        return client_class(transport=transport, timeout=httpx.Timeout(120.0, connect=10.0))
+
+    def _requests_session(self, name):
+        stats = self._stats[name] = ConnectionStats()
+        session = requests.Session()
+        adapter = CountingAdapter(stats, pool_maxsize=settings.HTTP_CLIENT_MAX_KEEPALIVE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+
+clients = ClientRegistry()
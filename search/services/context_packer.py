@@ -0,0 +1,151 @@
+"""
+토큰 예산 기반 답변 컨텍스트 패커 (CONTEXT_PACKING).
+
+고정 글자 수 절삭(과거 기록 500/1500자, 웹 발췌 200자, 이전 답변 500자) 대신
+CONTEXT_TOKEN_BUDGET 토큰을 출처별 관련도 가중치로 나눈다.
+
+    1. 출처(과거 기록·웹 결과·이전 대화)를 문장 단위로 쪼개고, 가중치가 높은 출처부터
+       이미 나온 문장은 버린다 (출처 간 중복 제거)
+    2. 예산을 가중치 비례로 나누되, 예산보다 짧은 출처는 전문을 주고 남는 몫을 나머지에 재분배
+       몫이 MIN_SOURCE_TOKENS 미만이면 그 출처는 빼고 다시 나눈다 (몇 토큰짜리 조각은 잡음)
+    3. 출처마다 자기 몫까지 문장 단위로 자른다
+
+토큰 수는 로컬 토크나이저(tiktoken cl100k_base — Mistral 토크나이저와 같지는 않지만 예산용 근사로 충분)로
+센다. 인코딩 파일을 못 받는 환경이면 한글 1자 = 1토큰 기준의 보수적 추정으로 대신한다.
+"""
+import math
+import re
+import threading
+
+_HANGUL = re.compile(r'[가-힣]')
+_SENTENCE_END = re.compile(r'((?<=[.!?])\s+|\n+)')
+
+MIN_SOURCE_TOKENS = 40
+MIN_DEDUP_CHARS = 20  # 이보다 짧은 문장(코드 한 줄의 `}` 등)은 중복이어도 남긴다
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    """tiktoken 인코딩 (첫 호출에 한 번 로드, 실패하면 None을 기억해 다시 시도하지 않는다)"""
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                print(f"토크나이저 로드 실패 (글자 수 추정으로 대체): {e}")
+                _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    hangul = len(_HANGUL.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 3)
+
+
+def truncate_tokens(text, max_tokens):
+    """앞에서부터 max_tokens 토큰까지"""
+    if max_tokens <= 0:
+        return ''
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    used = 0
+    for i, char in enumerate(text):
+        used += 1 if _HANGUL.match(char) else 1 / 3
+        if used > max_tokens:
+            return text[:i]
+    return text
+
+
+def _sentences(text):
+    """[(문장, 뒤따르는 구분자)] — 구분자를 보존해 다시 이어 붙였을 때 원문 형태를 유지"""
+    parts = _SENTENCE_END.split(text.strip())
+    return [(parts[i], parts[i + 1] if i + 1 < len(parts) else '') for i in range(0, len(parts), 2)]
+
+
+def _normalize(sentence):
+    return ' '.join(sentence.lower().split())
+
+
+def _allocate(costs, weights, budget):
+    """가중치 비례 배분 + 다 못 쓰는 몫 재분배 (water-filling). 반환: 출처별 몫"""
+    alloc = [0.0] * len(costs)
+    active = [i for i, cost in enumerate(costs) if cost > 0 and weights[i] > 0]
+    remaining = float(budget)
+    while active and remaining > 0:
+        total_weight = sum(weights[i] for i in active)
+        shares = {i: remaining * weights[i] / total_weight for i in active}
+        satisfied = [i for i in active if costs[i] <= shares[i]]
+        if not satisfied:
+            for i in active:
+                alloc[i] = shares[i]
+            break
+        for i in satisfied:
+            alloc[i] = costs[i]
+            remaining -= costs[i]
+        active = [i for i in active if i not in satisfied]
+    return alloc
+
+
+def pack(sources, budget):
+    """
+    sources: [(key, text, weight)] — weight는 관련도 (클수록 먼저·많이)
+    반환: {key: 예산 안으로 줄인 text} (완전히 빠진 출처는 빈 문자열)
+    """
+    order = sorted(range(len(sources)), key=lambda i: -sources[i][2])
+
+    # 1. 가중치 높은 출처부터 문장 중복 제거
+    seen = set()
+    kept = {}
+    for i in order:
+        sentences = []
+        for sentence, sep in _sentences(sources[i][1]):
+            norm = _normalize(sentence)
+            if len(norm) >= MIN_DEDUP_CHARS:
+                if norm in seen:
+                    continue
+                seen.add(norm)
+            if sentence.strip():
+                sentences.append((sentence, sep))
+        kept[i] = sentences
+
+    # 2. 예산 배분 — 너무 작은 몫을 받은 출처는 빼고 다시 나눈다
+    costs = [sum(count_tokens(s + sep) for s, sep in kept[i]) for i in range(len(sources))]
+    weights = [max(source[2], 0.0) for source in sources]
+    while True:
+        alloc = _allocate(costs, weights, budget)
+        starved = [
+            i for i in range(len(sources))
+            if weights[i] > 0 and 0 < alloc[i] < min(MIN_SOURCE_TOKENS, costs[i])
+        ]
+        if not starved:
+            break
+        for i in starved:
+            weights[i] = 0.0
+
+    # 3. 몫까지 문장 단위로 자르기 (첫 문장부터 넘치면 토큰 단위로 자른다)
+    packed = {}
+    for i, (key, _, _) in enumerate(sources):
+        limit = int(alloc[i])
+        out, used = [], 0
+        for sentence, sep in kept[i]:
+            cost = count_tokens(sentence + sep)
+            if used + cost > limit:
+                if not out:
+                    out.append(truncate_tokens(sentence, limit))
+                break
+            out.append(sentence + sep)
+            used += cost
+        packed[key] = ''.join(out).strip()
+    return packed
@@ -0,0 +1,64 @@
+"""
+질의 임베딩 캐시 (mistral-embed 호출 절감).
+
+같은 질문·꼬리질문 재검색·벤치마크 재실행이 매번 임베딩 API를 다시 부르던 것을
+모델명 + 정규화 텍스트 해시를 키로 캐시한다.
+
+    1단계: 프로세스 내 LRU / 2단계: CachedEmbedding 테이블 (선택, TTL + 최대 행 수) — tiered_cache.TieredCache
+
+LearnlogService.embedding_cache에 다른 인스턴스를 꽂으면 교체된다 (테스트·벤치마크용).
+
+EmbeddingContext는 요청 하나 범위의 임베딩 모음이다 (SearchState['embeddings']).
+프로세스 캐시가 꺼져 있거나 축출돼도 같은 요청 안에서는 한 번 계산한 임베딩을 다시 쓴다.
+"""
+import hashlib
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+
+from .tiered_cache import TieredCache
+
+
+def cache_key(model, text):
+    """모델명 + 정규화 텍스트(NFC, 공백 축약)의 sha256"""
+    normalized = " ".join(unicodedata.normalize('NFC', text).split())
+    return hashlib.sha256(f"{model}\n{normalized}".encode()).hexdigest()
+
+
+class EmbeddingCache(TieredCache):
+    model_name = 'CachedEmbedding'
+    label = '임베딩 캐시'
+
+    def __init__(self, max_size=None, use_db=None, ttl_days=None, db_max_rows=None):
+        super().__init__(
+            max_size=max_size if max_size is not None else settings.EMBEDDING_CACHE_SIZE,
+            use_db=use_db if use_db is not None else settings.EMBEDDING_CACHE_DB,
+            db_max_rows=db_max_rows if db_max_rows is not None else settings.EMBEDDING_CACHE_DB_MAX_ROWS,
+            ttl=timedelta(days=ttl_days if ttl_days is not None else settings.EMBEDDING_CACHE_TTL_DAYS),
+        )
+
+    def get(self, model, text):
+        return self._get(cache_key(model, text))
+
+    def set(self, model, text, embedding):
+        self._set(cache_key(model, text), list(embedding), {'model': model, 'embedding': embedding})
+
+    def _from_row(self, row):
+        return list(row.embedding)
+
+
+class EmbeddingContext:
+    """요청 범위 임베딩 모음 — 파이프라인 앞 단계가 계산한 임베딩을 뒷 단계(저장 등)가 재사용"""
+
+    def __init__(self):
+        self._vectors = {}
+
+    def get(self, model, text):
+        return self._vectors.get(cache_key(model, text))
+
+    def set(self, model, text, embedding):
+        self._vectors[cache_key(model, text)] = list(embedding)
+
+
+embedding_cache = EmbeddingCache()
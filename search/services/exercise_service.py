@@ -1,12 +1,11 @@
 import json
-import textwrap
 
-from mistralai.client import Mistral
-from django.conf import settings
 from django.db.models import Q
 from django.utils import timezone
 
 from ..models import Exercise, ExerciseAttempt
+from . import prompts
+from .clients import clients
 
 
 class ExerciseService:
@@ -19,10 +18,7 @@ class ExerciseService:
     MODEL = "mistral-small-latest"
 
     def __init__(self):
-        self.mistral_client = Mistral(
-            api_key=settings.MISTRAL_API_KEY,
-            timeout_ms=120_000,
-        )
+        self.mistral_client = clients.mistral()
 
     # ── 생성 ──────────────────────────────────────────────────────────
 
@@ -32,6 +28,7 @@ class ExerciseService:
             learning_log=learning_log,
             exercise_type=exercise_type,
             content=content,
+            prompt_version=prompts.get(f'exercise_{exercise_type}').tag,
         )
 
     def _generate_content(self, learning_log, exercise_type):
@@ -59,25 +56,10 @@ class ExerciseService:
         )
 
     def _gen_generation_compare(self, log):
-        prompt = textwrap.dedent(f"""
-            아래 학습 내용으로 "생성→비교" 연습문제를 만들어주세요.
-            학습자가 먼저 답변을 쓰고, 모범 답안과 핵심 포인트를 보며 스스로 비교/채점합니다.
-
-            {self._parent_context(log)}질문: {log.query}
-            답변: {log.ai_response[:500]}
-
-            JSON으로만 응답 (```없이):
-            {{
-              "question": "핵심 개념을 설명하게 유도하는 질문",
-              "model_answer": "핵심 포인트를 포함한 모범 답안 (3~5문장)",
-              "key_points": ["채점 기준 1", "기준 2", "기준 3", "기준 4"]
-            }}
-
-            ⚠️ key_points 규칙:
-            - model_answer에서 빠지면 안 되는 핵심 명사구를 짧게 (각 30자 이내)
-            - 학습자가 본인 답에 포함됐는지 yes/no로 판단할 수 있는 단위
-            - 3~5개
-        """).strip()
+        prompt = prompts.render(
+            'exercise_generation_compare',
+            parent_context=self._parent_context(log), query=log.query, answer=log.ai_response[:500],
+        )
         return self._call_mistral_json(prompt)
 
     PATH_TRACE_MIN_STEPS = 3   # 최소 통과 step 수 (미달 시 재생성 시도)
@@ -87,26 +69,10 @@ class ExerciseService:
         출제 후 결정적 검증(choices[correct_index] == correct_answer)으로 잘못된 step을 걸러낸다.
         통과 step이 부족하면 1회 재생성한다. 프롬프트 규칙만으로 잡지 못하는 환각을 런타임에서 차단.
         """
-        prompt = textwrap.dedent(f"""
-            아래 학습 내용으로 "경로추적" 연습문제를 만들어주세요.
-            실행 흐름을 단계별로 추적하며 객관식으로 답하는 유형입니다. steps는 3~5개.
-
-            {self._parent_context(log)}질문: {log.query}
-            답변: {log.ai_response[:500]}
-
-            JSON으로만 응답 (```없이):
-            {{"scenario": "시나리오 설명", "steps": [{{"question": "질문", "choices": ["A","B","C","D"], "correct_index": 0, "correct_answer": "A", "explanation": "설명"}}]}}
-
-            ⚠️ correct_index 규칙 (반드시 준수):
-            - choices 배열의 0-based 인덱스 (첫 요소 = 0)
-            - choices[correct_index]가 정답 값과 정확히 같아야 함
-            - 예: choices=["1","2","3","4"], 정답="2" → correct_index=1 (choices[1]="2")
-            - correct_index를 정한 뒤 choices[correct_index]로 검증하세요.
-
-            ⚠️ correct_answer 규칙:
-            - 정답의 실제 값(value). choices 배열 중 한 요소와 글자까지 정확히 같아야 함.
-            - 항상 choices[correct_index]와 동일한 문자열을 넣으세요. (코드 레벨 검증용 ground truth)
-        """).strip()
+        prompt = prompts.render(
+            'exercise_path_trace',
+            parent_context=self._parent_context(log), query=log.query, answer=log.ai_response[:500],
+        )
 
         content, raw_count = self._gen_and_validate(prompt)
         # 환각 1개라도 발생(통과 < raw) 또는 통과 step 부족이면 1회 재생성, 더 많은 쪽 채택
@@ -216,19 +182,15 @@ class ExerciseService:
         covered_idx = set(i for i in ua.get('covered_indices', []) if 0 <= i < len(key_points))
         covered_str = ', '.join(p for i, p in enumerate(key_points) if i in covered_idx) or '(없음)'
         missed_str = ', '.join(p for i, p in enumerate(key_points) if i not in covered_idx) or '(없음)'
-        prompt = textwrap.dedent(f"""
-            학습자의 자가 학습을 1~2문장으로 짧게 코멘트 해주세요.
-            평가/채점이 아니라 격려·보완 한마디입니다. 한국어로.
-
-            질문: {exercise.content.get('question', '')}
-            모범 답안: {exercise.content.get('model_answer', '') or '(없음)'}
-            학습자 답: {ua.get('text', '')}
-            본인이 체크한 포인트: {covered_str}
-            빠뜨린 포인트: {missed_str}
-            본인 회고: {ua.get('reflection', '') or '(없음)'}
-
-            ⚠️ 1~2문장, 부드럽고 구체적으로. JSON 아닌 평문으로만 응답.
-        """).strip()
+        prompt = prompts.render(
+            'exercise_coach',
+            question=exercise.content.get('question', ''),
+            model_answer=exercise.content.get('model_answer', '') or '(없음)',
+            user_answer=ua.get('text', ''),
+            covered=covered_str,
+            missed=missed_str,
+            reflection=ua.get('reflection', '') or '(없음)',
+        )
         try:
             response = self.mistral_client.chat.complete(
                 model=self.MODEL,
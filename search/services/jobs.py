@@ -0,0 +1,267 @@
+"""
+DB 기반 백그라운드 작업 큐.
+
+요청 처리 경로는 enqueue()로 Job 행만 남기고, 실행은 `manage.py run_worker`가 맡는다.
+데몬 스레드와 달리 워커 재시작에도 작업이 남고, 동시 실행 수는 워커 풀 크기로 고정된다.
+
+    enqueue(kind, payload) → Job(queued)
+    claim()                → SELECT ... FOR UPDATE SKIP LOCKED로 1건 점유 (running)
+    run_job(job)           → 핸들러 실행 → done / 실패 시 지수 백오프로 queued 재예약 / 한도 초과 시 failed
+    requeue_stale()        → 점유한 채 죽은 워커의 running 작업을 queued로 되돌림 (시도 한도면 failed)
+    prune_finished()       → 보존 기간(JOB_RETENTION_DAYS)이 지난 done/failed 작업 삭제
+
+핸들러는 @job_handler('종류')로 등록하고 (payload, last_attempt)를 받는다.
+last_attempt=True면 더 이상 재시도가 없으니 실패를 흡수하고 최종 상태를 남겨야 한다.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job, LearningLog
+
+HANDLERS = {}
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload, max_attempts=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"등록되지 않은 작업 종류: {kind}")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """n번째 실패 후 대기 시간 (초): base * 2^(n-1), 상한 JOB_RETRY_MAX_SEC"""
+    return min(settings.JOB_RETRY_BASE_SEC * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SEC)
+
+
+def claim():
+    """실행할 작업 1건을 점유해 반환 (없으면 None). 다른 워커가 잠근 행은 건너뛴다"""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_at__lte=timezone.now())
+            .order_by('run_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.locked_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_at', 'attempts'])
+        return job
+
+
+def run_job(job):
+    handler = HANDLERS.get(job.kind)
+    last_attempt = job.attempts >= job.max_attempts
+    try:
+        if handler is None:
+            raise ValueError(f"등록되지 않은 작업 종류: {job.kind}")
+        handler(job.payload, last_attempt)
+    except Exception as e:
+        print(f"작업 실패 {job}: {e}")
+        job.last_error = str(e)
+        job.locked_at = None
+        if last_attempt or handler is None:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        else:
+            job.status = 'queued'
+            job.run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+        job.save(update_fields=['status', 'last_error', 'locked_at', 'run_at', 'finished_at'])
+        return False
+
+    job.status = 'done'
+    job.locked_at = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'locked_at', 'finished_at'])
+    return True
+
+
+def requeue_stale():
+    """
+    JOB_LOCK_TIMEOUT_SEC 넘게 running인 작업 → queued (점유 워커가 죽은 것으로 간주). 재예약 수 반환.
+    claim이 점유 시점에 시도 횟수를 올리므로 죽은 실행도 1회로 세고, 한도에 닿은 작업은 failed —
+    실행 중 워커를 죽이는 작업(OOM 등)이 무한히 다시 점유되지 않는다.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SEC))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_at=None, finished_at=now, last_error='점유 만료 (워커 종료) — 시도 한도 도달',
+    )
+    if failed:
+        print(f"점유 만료 작업 {failed}건 실패 처리 (시도 한도)")
+    return stale.update(status='queued', locked_at=None, run_at=now)
+
+
+def prune_finished():
+    """종료 후 JOB_RETENTION_DAYS가 지난 done/failed 작업 삭제. 삭제 수 반환"""
+    cutoff = timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(status__in=('done', 'failed'), finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# ── 작업 종류 ─────────────────────────────────────────────
+
+@job_handler('verify_log')
+def verify_log(payload, last_attempt):
+    """
+    저장 후 모순 검증. payload: log_pk, retrieved_pks(생성에 쓴 순서), retrieved_limit, search_results,
+    retrieved_chunks(청크 검색이면 retrieved_pks와 같은 순서의 matched_chunks — 생성 때와 같은 컨텍스트로 검증).
+    Judge 호출 실패는 재시도하고, 마지막 시도에서도 실패하면 미검증('')으로 남긴다.
+    """
+    from .learnlog_service import LearnlogService  # learnlog_service가 이 모듈을 import (순환 방지)
+
+    log = LearningLog.objects.filter(pk=payload['log_pk']).first()
+    if log is None:
+        return
+    retrieved_logs = None
+    if payload.get('retrieved_pks'):
+        by_pk = LearningLog.objects.in_bulk(payload['retrieved_pks'])
+        chunks = payload.get('retrieved_chunks') or [None] * len(payload['retrieved_pks'])
+        retrieved_logs = []
+        for pk, matched in zip(payload['retrieved_pks'], chunks):
+            if pk not in by_pk:
+                continue
+            if matched:
+                by_pk[pk].matched_chunks = matched
+            retrieved_logs.append(by_pk[pk])
+    LearnlogService.shared().verify_log(
+        log,
+        retrieved_logs,
+        payload.get('retrieved_limit', 500),
+        payload.get('search_results'),
+        raise_errors=not last_attempt,
+    )
+
+
+@job_handler('embed_log')
+def embed_log(payload, last_attempt):
+    """
+    저장 후 임베딩 (EMBEDDING_DEFERRED). 질의 임베딩으로 임시 저장된 행(embedding_provisional)도
+    질의+답변 임베딩으로 교체하고, STORE_QUERY_EMBEDDING이면 비어 있는 질문 임베딩도 채우고,
+    LOG_CHUNKS_ENABLED면 답변 청크도 임베딩한다.
+    성공한 컬럼은 먼저 저장하고 나머지만 재시도 — 끝내 실패하면 기존 값(임시 임베딩 또는 NULL)을 두고
+    embed_logs 백필에 맡긴다 (임시 임베딩 행도 플래그로 다시 잡힌다).
+    """
+    from .learnlog_service import LearnlogService
+    from .log_chunks import embed_chunks
+
+    log = (
+        LearningLog.objects.filter(pk=payload['log_pk'])
+        .only('pk', 'query', 'ai_response', 'embedding', 'embedding_provisional', 'query_embedding')
+        .first()
+    )
+    if log is None:
+        return
+    service = LearnlogService.shared()
+    fields, failed = {}, []
+    if log.embedding is None or log.embedding_provisional:  # 재시도면 이미 교체한 임베딩은 건너뜀
+        embedding = service._embed(service._embedding_input(log.query, log.ai_response))
+        if embedding is None:
+            failed.append('embedding')
+        else:
+            fields.update(embedding=embedding, embedding_provisional=False)
+    if settings.STORE_QUERY_EMBEDDING and log.query_embedding is None:
+        query_embedding = service._embed(log.query)
+        if query_embedding is None:
+            failed.append('query_embedding')
+        else:
+            fields['query_embedding'] = query_embedding
+    if fields:
+        # 검증 작업 등이 같은 행을 갱신할 수 있어 임베딩 컬럼만 UPDATE
+        LearningLog.objects.filter(pk=log.pk).update(**fields)
+    if failed:
+        raise RuntimeError(f"임베딩 생성 실패: {', '.join(failed)}")
+    if settings.LOG_CHUNKS_ENABLED:
+        failed = embed_chunks(service, [log.pk])  # 재시도 시 이미 채운 청크는 건너뜀
+        if failed and not last_attempt:
+            raise RuntimeError(f"청크 임베딩 실패 {failed}건")
+
+
+@job_handler('polish_markdown')
+def polish_markdown(payload, last_attempt):
+    """
+    로컬 포맷으로 저장된 마크다운을 Groq 재작성본으로 교체 (MARKDOWN_POLISH).
+    참고 자료는 로그에 연결된 Reference로 복원한다. 끝내 실패하면 로컬 포맷을 그대로 둔다.
+    """
+    from .learnlog_service import LearnlogService
+
+    log = LearningLog.objects.filter(pk=payload['log_pk']).only('pk', 'query', 'ai_response').first()
+    if log is None:
+        return
+    search_results = {'results': [
+        {'title': ref.title, 'url': ref.url} for ref in log.references.order_by('pk')
+    ]}
+    try:
+        markdown = LearnlogService.shared().polish_markdown(log.query, log.ai_response, search_results)
+    except Exception:
+        if last_attempt:
+            return
+        raise
+    if markdown:
+        LearningLog.objects.filter(pk=log.pk).update(markdown_content=markdown)
+
+
+@job_handler('embed_reference_chunks')
+def embed_reference_chunks(payload, last_attempt):
+    """
+    새로 저장된 레퍼런스 본문 청크 임베딩 (REFERENCE_STORE_ENABLED). payload: reference_pks.
+    일부 실패하면 재시도 — 이미 채운 청크는 건너뛰고, 끝내 비면 그 청크는 FTS로만 검색된다.
+    """
+    from .learnlog_service import LearnlogService
+    from .reference_store import embed_chunks
+
+    failed = embed_chunks(LearnlogService.shared(), payload['reference_pks'])
+    if failed and not last_attempt:
+        raise RuntimeError(f"청크 임베딩 실패 {failed}건")
+
+
+@job_handler('refresh_search')
+def refresh_search(payload, last_attempt):
+    """
+    검색 캐시 stale 적중 후 갱신 (search_cache.SearchCache._request_refresh). payload: Tavily 검색 인자.
+    끝내 실패하면 기존 결과를 두고 stale 구간이 지나면 미스로 처리된다.
+    """
+    from .learnlog_service import LearnlogService
+    from .search_cache import search_cache
+
+    try:
+        response = LearnlogService.shared().tavily_client.search(**payload['params'])
+    except Exception:
+        if last_attempt:
+            return
+        raise
+    search_cache.set(payload['params'], response)
+
+
+def enqueue_verification(log, retrieved_logs, retrieved_limit, search_results):
+    """verify_log 작업 등록 — 로그는 pk로, 웹 결과는 Judge가 보는 발췌(check_consistency 기준)만 남긴다"""
+    if search_results is not None:
+        search_results = {'results': [
+            {'url': r.get('url', ''), 'content': r.get('content', '')[:200]}
+            for r in search_results.get('results', [])[:2]
+        ]}
+    payload = {
+        'log_pk': log.pk,
+        'retrieved_pks': [l.pk for l in retrieved_logs] if retrieved_logs else None,
+        'retrieved_limit': retrieved_limit,
+        'search_results': search_results,
+    }
+    if retrieved_logs and any(vars(l).get('matched_chunks') for l in retrieved_logs):
+        payload['retrieved_chunks'] = [vars(l).get('matched_chunks') for l in retrieved_logs]
+    return enqueue('verify_log', payload)
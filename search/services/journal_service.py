@@ -1,11 +1,9 @@
-import textwrap
-
-from groq import Groq
-from django.conf import settings
 from django.db.models.functions import TruncDate
 from django.utils import timezone
 
 from ..models import DailyJournal, ExerciseAttempt, LearningLog
+from . import prompts
+from .clients import clients
 
 
 class JournalService:
@@ -17,7 +15,7 @@ class JournalService:
     LIGHT_MODEL = "llama-3.3-70b-versatile"  # 요약은 경량 작업 → Groq
 
     def __init__(self):
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
+        self.groq_client = clients.groq()
 
     # ── 조회/생성 ─────────────────────────────────────────────────────
 
@@ -108,14 +106,7 @@ class JournalService:
             return ""
 
         query_lines = "\n".join(f"- {q}" for q in queries)
-        prompt = textwrap.dedent(f"""
-            아래는 한 학습자가 {date.month}월 {date.day}일에 검색한 개발 질문 목록입니다.
-            어떤 주제를 공부했는지 1~2문장으로 친근하게 요약해주세요.
-            예시: "오늘은 Docker 네트워크와 PostgreSQL 격리 수준에 관해 공부했네요."
-            요약 문장만 출력하세요.
-
-            {query_lines}
-        """).strip()
+        prompt = prompts.render('journal_summary', month=date.month, day=date.day, query_lines=query_lines)
 
         try:
             response = self.groq_client.chat.completions.create(
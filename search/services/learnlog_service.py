@@ -1,17 +1,28 @@
+import asyncio
 import json
-import textwrap
+import threading
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from groq import Groq
-from mistralai.client import Mistral
+from asgiref.sync import sync_to_async
 from pgvector.django import CosineDistance
-from tavily import TavilyClient
 from django.conf import settings
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
-from ..models import LearningLog, Tag, Reference
-from ..domains import get_domains_for_query, is_official_doc
+from ..models import LearningLog, LearningLogChunk, Tag, Reference, ReferenceChunk
+from ..domains import classify_source, get_domains_for_query
+from .clients import clients
+from .context_packer import count_tokens, pack
+from .embedding_cache import EmbeddingContext, embedding_cache
+from .jobs import enqueue
+from .llm_cache import llm_cache
+from .search_cache import search_cache
+from .markdown_format import format_markdown, reference_list
+from . import log_chunks, prompts, reference_store
+from .semantic_cache import semantic_cache
 
 
 class LearnlogService:
@@ -26,22 +37,42 @@ class LearnlogService:
     ANSWER_MODEL = "mistral-large-latest"
     LIGHT_MODEL = "llama-3.3-70b-versatile"
     EMBED_MODEL = "mistral-embed"  # 1024차원
+    TAGS_INPUT_CHARS = 500  # 태그 추출 프롬프트가 보는 답변 앞부분 길이 (스트리밍 후처리의 선행 호출 기준)
+
+    embedding_cache = embedding_cache
+    llm_cache = llm_cache  # 프로세스 공용 — 인스턴스 속성으로 교체 가능
+    search_cache = search_cache
+
+    _shared = None
+    _shared_lock = threading.Lock()
 
     def __init__(self):
-        self.mistral_client = Mistral(
-            api_key=settings.MISTRAL_API_KEY,
-            timeout_ms=120_000,
-        )
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
-        self.tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+        # SDK 클라이언트는 레지스트리 공용 (provider별 keep-alive 풀 1개)
+        self.mistral_client = clients.mistral()
+        self.groq_client = clients.groq()
+        self.tavily_client = clients.tavily()
+
+    @classmethod
+    def shared(cls):
+        """
+        프로세스 공용 인스턴스 (첫 호출 시 생성) — 컴파일된 검색 에이전트가 감싸는 서비스.
+        서비스는 요청별 상태를 self에 두지 않으므로 스레드 간 공유해도 안전.
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
 
     def process_query(self, user_query):
         """
         메인 처리 로직 (HTMX용 - 동기 처리)
         SSE 스트리밍은 QuerySSEView에서 각 메서드를 직접 호출
         """
+        embeddings = EmbeddingContext()
+
         # 1. 과거 학습 기록 검색 (RAG retrieval)
-        retrieved_logs = self.retrieve_similar_logs(user_query)
+        retrieved_logs = self.retrieve_similar_logs(user_query, embeddings=embeddings)
 
         # 2. 웹 검색
         search_results = self.search_official_docs(user_query)
@@ -49,74 +80,139 @@ class LearnlogService:
         # 3. AI 답변 생성
         ai_answer = self.generate_answer(user_query, search_results, retrieved_logs=retrieved_logs)
 
-        # 4. 태그 추출 + 마크다운 변환 (병렬)
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            tags_future = executor.submit(self.extract_tags, user_query, ai_answer)
-            md_future = executor.submit(self.convert_to_markdown, user_query, ai_answer, search_results)
-            tag_names = tags_future.result()
-            markdown = md_future.result()
+        # 4. 태그 추출 + 마크다운 변환 (통합 1회 또는 병렬)
+        tag_names, markdown, _ = self.postprocess(user_query, ai_answer, search_results)
 
         # 5. DB 저장
-        return self.save_learning_log(user_query, ai_answer, markdown, search_results, tag_names)
+        return self.save_learning_log(
+            user_query, ai_answer, markdown, search_results, tag_names, embeddings=embeddings,
+        )
 
-    def save_learning_log(self, query, ai_answer, markdown, search_results, tag_names, parent=None, answer_source='', is_truncated=False):
+    def save_learning_log(self, query, ai_answer, markdown, search_results, tag_names, parent=None, answer_source='', is_truncated=False, embeddings=None, verdict=None):
         """
-        LearningLog 및 관련 데이터 DB 저장
+        LearningLog 및 관련 데이터 DB 저장.
+        레퍼런스·태그는 건별 get_or_create 대신 일괄 upsert + M2M 일괄 연결로 쿼리 수를
+        결과 개수와 무관하게 고정하고, 전부 한 트랜잭션 — 실패 시 반쯤 저장된 로그가 남지 않는다.
+        embeddings: 검색 단계의 EmbeddingContext — 질의 임베딩을 다시 계산하지 않는다.
+        verdict: 통합 후처리(postprocess)에서 받은 판정 — 있으면 바로 기록하고 검증 작업은 생략.
         """
-        # 컨텍스트가 있었던 답변만 비동기 검증 대상 (verify_log가 pending을 풀어준다)
-        verification = 'pending' if answer_source in ('both', 'logs', 'web') else ''
-
-        # LearningLog 생성 (임베딩 실패해도 저장은 진행 — _embed가 None 반환)
-        log = LearningLog.objects.create(
-            query=query,
-            ai_response=ai_answer,
-            markdown_content=markdown,
-            parent=parent,
-            embedding=self._embed(self._embedding_input(query, ai_answer)),
-            answer_source=answer_source,
-            is_truncated=is_truncated,
-            verification=verification,
-        )
-
-        # Reference 생성 및 연결
-        for result in search_results.get('results', []):
-            ref, _ = Reference.objects.get_or_create(
-                url=result.get('url', ''),
-                defaults={
-                    'title': result.get('title', 'Untitled'),
-                    'excerpt': result.get('content', '')[:500],
-                    'source_type': self._determine_source_type(result.get('url', '')),
-                }
-            )
-            log.references.add(ref)
-
-        # Tag 생성 및 연결
-        for tag_name in tag_names:
-            tag, _ = Tag.objects.get_or_create(
-                name=tag_name,
-                defaults={'slug': slugify(tag_name)}
+        if verdict is not None:
+            verification = 'passed' if verdict['consistent'] else 'suspect'
+            verification_note = verdict['note']
+        else:
+            # 컨텍스트가 있었던 답변만 비동기 검증 대상 (verify_log가 pending을 풀어준다)
+            verification = 'pending' if answer_source in ('both', 'logs', 'web') else ''
+            verification_note = ''
+        query_embedding = self._lookup_embedding(query, embeddings)
+
+        if settings.EMBEDDING_DEFERRED:
+            # 응답 경로에서 임베딩 API 왕복을 뺀다 — 검색 단계에서 계산한 질의 임베딩을
+            # 임시로 저장해 바로 벡터 검색에 잡히게 하고, 질의+답변 임베딩은 작업 큐가 채운다
+            embedding = query_embedding
+        else:
+            # 트랜잭션 밖에서 — API 대기 동안 트랜잭션을 열어두지 않는다 (실패하면 None)
+            embedding = self._embed(self._embedding_input(query, ai_answer), context=embeddings)
+            if query_embedding is None and settings.STORE_QUERY_EMBEDDING:
+                query_embedding = self._embed(query, context=embeddings)
+
+        with transaction.atomic():
+            log = LearningLog.objects.create(
+                query=query,
+                ai_response=ai_answer,
+                markdown_content=markdown,
+                parent=parent,
+                embedding=embedding,
+                embedding_provisional=settings.EMBEDDING_DEFERRED and embedding is not None,
+                query_embedding=query_embedding if settings.STORE_QUERY_EMBEDDING else None,
+                answer_source=answer_source,
+                is_truncated=is_truncated,
+                verification=verification,
+                verification_note=verification_note,
+                prompt_version=prompts.get('answer').tag,
             )
-            log.tags.add(tag)
 
+            references = self._upsert_references(search_results.get('results', []))
+            LearningLog.references.through.objects.bulk_create([
+                LearningLog.references.through(learninglog=log, reference=ref) for ref in references
+            ])
+            stored_pks = []
+            if settings.REFERENCE_STORE_ENABLED:
+                stored_pks = reference_store.store_contents(search_results.get('results', []), references)
+                if stored_pks and settings.EMBEDDING_DEFERRED:
+                    enqueue('embed_reference_chunks', {'reference_pks': stored_pks})
+
+            tags = self._upsert_tags(tag_names)
+            LearningLog.tags.through.objects.bulk_create([
+                LearningLog.tags.through(learninglog=log, tag=tag) for tag in tags
+            ])
+
+            if settings.LOG_CHUNKS_ENABLED:
+                LearningLogChunk.objects.bulk_create(log_chunks.build_chunks(log))  # 임베딩은 embed_log가 함께
+            if settings.EMBEDDING_DEFERRED:
+                enqueue('embed_log', {'log_pk': log.pk})  # 로그와 같은 트랜잭션 — 둘 다 남거나 둘 다 없다
+            if settings.MARKDOWN_MODE == 'local' and settings.MARKDOWN_POLISH:
+                enqueue('polish_markdown', {'log_pk': log.pk})  # 로컬 포맷 먼저 저장, LLM 재작성은 백그라운드
+
+        if not settings.EMBEDDING_DEFERRED:
+            # 트랜잭션 밖 — 실패한 청크는 FTS로만 검색 (로그 청크는 chunk_logs로 다시 채울 수 있음)
+            if settings.LOG_CHUNKS_ENABLED:
+                log_chunks.embed_chunks(self, [log.pk])
+            if stored_pks:
+                reference_store.embed_chunks(self, stored_pks)
         return log
 
-    def _determine_source_type(self, url):
+    def _upsert_references(self, results):
         """
-        URL을 분석해서 출처 유형 결정
-        - tech_domains.py의 공식 문서 도메인 목록 활용
+        URL 기준 일괄 upsert (INSERT 1회 + SELECT 1회). 이미 있는 URL은 건드리지 않는다 —
+        get_or_create와 같이 최초 수집 시점의 제목·발췌를 유지.
         """
-        url_lower = url.lower()
+        by_url = {}
+        for result in results:
+            url = result.get('url', '')
+            by_url.setdefault(url, Reference(
+                url=url,
+                title=result.get('title', 'Untitled'),
+                excerpt=result.get('content', '')[:500],
+                source_type=self._determine_source_type(url),
+            ))
+        if not by_url:
+            return []
+        Reference.objects.bulk_create(by_url.values(), ignore_conflicts=True)
+        saved = Reference.objects.in_bulk(list(by_url), field_name='url')
+        return [saved[url] for url in by_url if url in saved]
 
-        if 'stackoverflow.com' in url_lower:
-            return 'stackoverflow'
-        elif 'github.com' in url_lower:
-            return 'github'
-        elif is_official_doc(url):
-            return 'official'
-        elif any(keyword in url_lower for keyword in ['blog', 'medium.com', 'dev.to']):
-            return 'blog'
-        else:
-            return 'other'
+    @staticmethod
+    def _upsert_tags(tag_names):
+        """
+        이름 기준 일괄 upsert. slug가 기존 태그와 겹치는 새 이름(대소문자만 다른 경우 등)은
+        그 기존 태그로 연결한다 — 건별 get_or_create에서는 unique 위반으로 저장 자체가 실패하던 경우.
+        """
+        slugs = {name: slugify(name) for name in dict.fromkeys(tag_names)}
+        if not slugs:
+            return []
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slug) for name, slug in slugs.items()],
+            ignore_conflicts=True,
+        )
+        existing = Tag.objects.filter(Q(name__in=slugs) | Q(slug__in=[s for s in slugs.values() if s]))
+        by_name = {tag.name: tag for tag in existing}
+        by_slug = {tag.slug: tag for tag in existing}
+        tags = {}
+        for name, slug in slugs.items():
+            # 빈 slug(비ASCII 이름)끼리 겹친 경우는 다른 태그라 연결하지 않는다
+            tag = by_name.get(name) or (by_slug.get(slug) if slug else None)
+            if tag is None:
+                print(f"태그 저장 건너뜀 (slug 중복): {name}")
+            else:
+                tags[tag.pk] = tag  # 같은 태그로 모인 이름은 한 번만 연결
+        return list(tags.values())
+
+    @staticmethod
+    def _determine_source_type(url):
+        """
+        URL을 분석해서 출처 유형 결정 — domains.py의 호스트 색인 판별기 (공식 문서는 TECH_DOCS_MAP)
+        """
+        return classify_source(url)
 
     # ── RAG: 임베딩 + 하이브리드 검색 ──────────────────────────────────
 
@@ -125,69 +221,325 @@ class LearnlogService:
         """임베딩 대상 텍스트. markdown_content는 ai_response와 중복이라 제외"""
         return f"{query}\n{ai_response[:2000]}"
 
-    def _embed(self, text):
+    def _embed(self, text, context=None):
         """
         mistral-embed로 1024차원 임베딩 생성.
-        실패 시 None 반환 — 저장·검색 메인 흐름을 막지 않는다.
+        같은 텍스트(모델 + 정규화 해시)는 요청 컨텍스트(EmbeddingContext) → embedding_cache 순으로
+        꺼내 API를 생략하고, 얻은 임베딩은 context에도 남긴다.
+        실패 시 None 반환 — 저장·검색 메인 흐름을 막지 않는다 (실패는 캐시하지 않음).
         """
+        embedding = self._lookup_embedding(text, context)
+        if embedding is not None:
+            return embedding
         try:
             response = self.mistral_client.embeddings.create(
                 model=self.EMBED_MODEL,
                 inputs=[text],
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
         except Exception as e:
             print(f"임베딩 생성 오류: {e}")
             return None
+        self.embedding_cache.set(self.EMBED_MODEL, text, embedding)
+        if context is not None:
+            context.set(self.EMBED_MODEL, text, embedding)
+        return embedding
+
+    def _lookup_embedding(self, text, context=None):
+        """API 호출 없이 이미 계산된 임베딩만 조회 (요청 컨텍스트 → 프로세스 캐시). 없으면 None"""
+        if context is not None:
+            embedding = context.get(self.EMBED_MODEL, text)
+            if embedding is not None:
+                return embedding
+        embedding = self.embedding_cache.get(self.EMBED_MODEL, text)
+        if embedding is not None and context is not None:
+            context.set(self.EMBED_MODEL, text, embedding)
+        return embedding
+
+    EMBED_BATCH_TOKENS = 12_000  # 배치 요청당 입력 토큰 상한 (mistral-embed 요청 한도 16k에 여유)
 
-    def retrieve_similar_logs(self, query, k=3, exclude_pks=None):
+    @staticmethod
+    def _estimate_tokens(text):
+        """컨텍스트 패커와 같은 토큰 수 (tiktoken, 로드 실패 시 한글 1자=1토큰 추정)"""
+        return count_tokens(text)
+
+    @classmethod
+    def _token_batches(cls, indices, texts, budget=None):
+        """texts의 인덱스를 입력 토큰 합이 budget을 넘지 않는 묶음으로 나눈다"""
+        budget = budget or cls.EMBED_BATCH_TOKENS
+        batch, used = [], 0
+        for i in indices:
+            cost = cls._estimate_tokens(texts[i])
+            if batch and used + cost > budget:
+                yield batch
+                batch, used = [], 0
+            batch.append(i)
+            used += cost
+        if batch:
+            yield batch
+
+    def _embed_many(self, texts, rate_limiter=None, concurrency=1):
+        """
+        여러 텍스트를 토큰 예산 단위 배치로 임베딩 (요청 1회에 inputs 여러 개).
+        반환은 texts와 같은 순서의 목록 — 실패한 배치의 항목은 None.
+        캐시 hit은 요청에서 빼고, rate_limiter(TokenBucket)가 있으면 요청마다 토큰을 받는다.
+        concurrency > 1이면 배치 요청을 스레드 풀로 동시에 보낸다 — 요청 간격은 rate_limiter가 그대로
+        지키고, 응답 대기만 겹친다 (캐시 저장은 호출 스레드에서).
+        """
+        results = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self.embedding_cache.get(self.EMBED_MODEL, text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        batches = list(self._token_batches(pending, texts))
+        requests = [[texts[i] for i in batch] for batch in batches]
+        if concurrency > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(batches)), thread_name_prefix='embed-batch') as pool:
+                responses = list(pool.map(lambda inputs: self._embed_batch(inputs, rate_limiter), requests))
+        else:
+            responses = [self._embed_batch(inputs, rate_limiter) for inputs in requests]
+
+        for batch, embeddings in zip(batches, responses):
+            if embeddings is None:
+                continue
+            for i, embedding in zip(batch, embeddings):
+                results[i] = embedding
+                self.embedding_cache.set(self.EMBED_MODEL, texts[i], embedding)
+        return results
+
+    def _embed_batch(self, inputs, rate_limiter=None):
+        """배치 요청 1회 → inputs 순서의 임베딩 목록 (실패하면 None)"""
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = self.mistral_client.embeddings.create(model=self.EMBED_MODEL, inputs=inputs)
+        except Exception as e:
+            print(f"배치 임베딩 오류 ({len(inputs)}건): {e}")
+            return None
+        return [item.embedding for item in response.data]
+
+    RETRIEVE_CANDIDATES = 10  # FTS·벡터 각각의 후보 수 (RRF 입력)
+    RRF_K = 60
+    FUSE_IN_DB = True  # False면 쿼리 3회 + Python RRF (_retrieve_merged, 동등성 기준 구현)
+
+    def find_cached_answer(self, query, embeddings=None):
+        """의미 캐시: 거의 같은 질문의 저장된 로그 (없으면 None). 질의 임베딩은 검색 단계가 재사용"""
+        return semantic_cache.lookup(self._embed(query, context=embeddings))
+
+    def retrieve_similar_logs(self, query, k=3, exclude_pks=None, embeddings=None):
         """
         과거 학습 로그 하이브리드 검색 (RAG retrieval).
         - FTS(키워드 정확 매칭)와 벡터 코사인 유사도(의미 매칭)를 각각 top-10 조회
+        - FTS는 저장된 search_vector(GIN 인덱스)를 사용 — 로그가 늘어도 행마다 to_tsvector하지 않음
         - RRF로 두 순위를 결합해 top-k 반환
         - 임베딩 실패 시 FTS 결과만으로 동작
+        - embeddings(EmbeddingContext)를 주면 질의 임베딩을 남겨 저장 단계가 재사용
         """
+        query_embedding = self._embed(query, context=embeddings)
+        return self._retrieve(query, query_embedding, k, exclude_pks)
+
+    def _retrieve(self, query, query_embedding, k, exclude_pks):
+        if settings.LOG_CHUNK_RETRIEVAL:
+            return self._retrieve_chunked(query, query_embedding, k, exclude_pks)
+        if self.FUSE_IN_DB:
+            return self._retrieve_fused(query, query_embedding, k, exclude_pks)
+        return self._retrieve_merged(query, query_embedding, k, exclude_pks)
+
+    def _retrieve_merged(self, query, query_embedding, k, exclude_pks):
+        """FTS·벡터 순위를 따로 조회하고 _rrf_merge로 결합 (DB 왕복 3회)"""
         base = LearningLog.objects.all()
         if exclude_pks:
             base = base.exclude(pk__in=exclude_pks)
 
-        fts_vector = (
-            SearchVector('query', weight='A', config='simple') +
-            SearchVector('ai_response', weight='B', config='simple')
-        )
         fts_query = SearchQuery(query, config='simple')
         fts_pks = list(
-            base.annotate(rank=SearchRank(fts_vector, fts_query))
-            .filter(rank__gt=0)
+            base.filter(search_vector=fts_query)
+            .annotate(rank=SearchRank('search_vector', fts_query))
             .order_by('-rank')
-            .values_list('pk', flat=True)[:10]
+            .values_list('pk', flat=True)[:self.RETRIEVE_CANDIDATES]
         )
 
         vec_pks = []
-        query_embedding = self._embed(query)
         if query_embedding is not None:
-            vec_pks = list(
-                base.exclude(embedding=None)
-                .order_by(CosineDistance('embedding', query_embedding))
-                .values_list('pk', flat=True)[:10]
-            )
-
-        merged_pks = self._rrf_merge([fts_pks, vec_pks])[:k]
+            with self._ann_session():
+                vec_pks = list(
+                    base.exclude(embedding=None)
+                    .order_by(CosineDistance('embedding', query_embedding))
+                    .values_list('pk', flat=True)[:self.RETRIEVE_CANDIDATES]
+                )
+
+        merged_pks = self._rrf_merge([fts_pks, vec_pks], k=self.RRF_K)[:k]
         logs = LearningLog.objects.in_bulk(merged_pks)
         return [logs[pk] for pk in merged_pks if pk in logs]
 
+    _FUSED_SQL = """
+        WITH fts AS (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) AS rnk
+            FROM (
+                SELECT l.id, ts_rank(l.search_vector, q) AS score
+                FROM {table} l, plainto_tsquery('simple'::regconfig, %(query)s) q
+                WHERE l.search_vector @@ q AND NOT (l.{owner} = ANY(%(exclude)s))
+                ORDER BY score DESC
+                LIMIT %(candidates)s
+            ) t
+        ),
+        vec AS (
+            SELECT id, distance, ROW_NUMBER() OVER (ORDER BY distance) AS rnk
+            FROM (
+                SELECT l.id, l.embedding <=> %(embedding)s::vector AS distance
+                FROM {table} l
+                WHERE %(embedding)s::vector IS NOT NULL
+                  AND l.embedding IS NOT NULL AND NOT (l.{owner} = ANY(%(exclude)s))
+                ORDER BY l.embedding <=> %(embedding)s::vector
+                LIMIT %(candidates)s
+            ) t
+        ),
+        fused AS (
+            SELECT COALESCE(fts.id, vec.id) AS id,
+                   fts.rnk AS fts_rank,
+                   vec.rnk AS vec_rank,
+                   vec.distance AS vec_distance,
+                   COALESCE(1.0::float8 / (%(rrf_k)s + fts.rnk), 0)
+                     + COALESCE(1.0::float8 / (%(rrf_k)s + vec.rnk), 0) AS rrf_score
+            FROM fts FULL OUTER JOIN vec ON fts.id = vec.id
+        )
+        SELECT l.*, fused.fts_rank, fused.vec_rank, fused.vec_distance, fused.rrf_score
+        FROM fused JOIN {table} l ON l.id = fused.id
+        ORDER BY fused.rrf_score DESC, fused.fts_rank ASC NULLS LAST, fused.vec_rank ASC
+        LIMIT %(k)s
+    """
+
+    def _retrieve_fused(self, query, query_embedding, k, exclude_pks, model=LearningLog, owner='id'):
+        """
+        FTS 순위·벡터 순위·RRF 결합을 CTE 하나로 계산 (DB 왕복 1회).
+        결과 행에 fts_rank / vec_rank / vec_distance / rrf_score가 붙는다 (해당 순위 없으면 None).
+        동점 정렬은 _rrf_merge와 같게 맞춘다 — FTS 순위 우선, 그다음 벡터 순위.
+        model: search_vector·embedding 컬럼이 있는 모델 (LearningLog, LearningLogChunk, ReferenceChunk)
+        owner: exclude_pks와 비교할 컬럼 (청크 테이블이면 소속 로그 FK)
+        """
+        sql = self._FUSED_SQL.format(table=model._meta.db_table, owner=owner)
+        params = {
+            'query': query,
+            'embedding': model._meta.get_field('embedding').get_prep_value(query_embedding),
+            'exclude': list(exclude_pks or []),
+            'candidates': self.RETRIEVE_CANDIDATES,
+            'rrf_k': self.RRF_K,
+            'k': k,
+        }
+        with self._ann_session():
+            return list(model.objects.raw(sql, params))
+
     @staticmethod
-    def _rrf_merge(rankings, k=60):
+    @contextmanager
+    def _ann_session(ef_search=None):
         """
-        Reciprocal Rank Fusion: 각 순위 목록에서 1/(k+순위)를 합산해 재정렬.
-        점수 스케일이 다른 FTS rank와 코사인 거리를 순위로만 결합한다 (k=60은 관례값).
+        HNSW 검색 파라미터를 트랜잭션 범위(SET LOCAL)로 적용.
+        커넥션이 재사용돼도 다른 쿼리에 설정이 새지 않는다.
+        """
+        ef_search = ef_search or settings.PGVECTOR_HNSW_EF_SEARCH
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL hnsw.ef_search = %s", [int(ef_search)])
+            yield
+
+    CHUNK_CANDIDATES = 30  # 청크 하이브리드 검색 후보 수 (로그 여러 개에 나뉘므로 로그 후보보다 넉넉히)
+    CONTEXT_CHUNKS = 2     # RAG 컨텍스트에 넣는 로그당 청크 수 (청크 순위 순)
+
+    def _retrieve_chunked(self, query, query_embedding, k, exclude_pks):
+        """
+        LOG_CHUNK_RETRIEVAL: 로그 단위 순위(_retrieve_fused)와 청크 순위를 RRF로 결합 (DB 왕복 2~3회).
+        청크 순위는 청크 하이브리드 검색 결과를 로그별 최고 청크(MaxSim)로 모은 것 — 답변 뒷부분이나
+        여러 하위 주제 중 하나만 맞는 로그도 잡히고, 청크가 없는(백필 전) 로그는 로그 단위 순위로 남는다.
+        결과 로그에 matched_chunks(질문과 맞는 청크 텍스트, 최대 CONTEXT_CHUNKS개)와 결합 rrf_score가 붙는다.
         """
+        logs = self._retrieve_fused(query, query_embedding, self.RETRIEVE_CANDIDATES, exclude_pks)
+        chunks = self._retrieve_fused(
+            query, query_embedding, self.CHUNK_CANDIDATES, exclude_pks, model=LearningLogChunk, owner='log_id',
+        )
+        by_log = log_chunks.group_by_log(chunks)
+        scores = self._rrf_scores([[log.pk for log in logs], list(by_log)], k=self.RRF_K)
+        top_pks = sorted(scores, key=scores.get, reverse=True)[:k]
+
+        found = {log.pk: log for log in logs}
+        missing = [pk for pk in top_pks if pk not in found]
+        if missing:
+            found.update(LearningLog.objects.in_bulk(missing))
+        results = []
+        for pk in top_pks:
+            if pk not in found:
+                continue
+            log = found[pk]
+            log.rrf_score = scores[pk]
+            log.matched_chunks = [chunk.text for chunk in by_log.get(pk, [])[:self.CONTEXT_CHUNKS]]
+            results.append(log)
+        return results
+
+    @staticmethod
+    def _rrf_scores(rankings, k=60):
+        """각 순위 목록에서 1/(k+순위)를 합산한 점수 {pk: 점수}"""
         scores = {}
         for ranking in rankings:
             for rank, pk in enumerate(ranking, start=1):
                 scores[pk] = scores.get(pk, 0.0) + 1.0 / (k + rank)
+        return scores
+
+    @classmethod
+    def _rrf_merge(cls, rankings, k=60):
+        """
+        Reciprocal Rank Fusion: 각 순위 목록에서 1/(k+순위)를 합산해 재정렬.
+        점수 스케일이 다른 FTS rank와 코사인 거리를 순위로만 결합한다 (k=60은 관례값).
+        """
+        scores = cls._rrf_scores(rankings, k=k)
         return sorted(scores, key=scores.get, reverse=True)
 
+    # ── 로컬 문서 코퍼스 (저장된 레퍼런스 본문 청크, services/reference_store.py) ──
+
+    LOCAL_DOCS_CHUNKS = 8   # 하이브리드 검색 청크 수 (적중 판정 후보)
+    LOCAL_DOCS_RESULTS = 5  # Tavily max_results와 같게 — 문서(레퍼런스) 단위
+
+    def search_local_docs(self, query, embeddings=None):
+        """
+        web_search 전에 저장된 레퍼런스 청크를 retrieve_similar_logs와 같은 하이브리드 검색으로 찾는다.
+        코사인 거리 LOCAL_DOCS_MAX_DISTANCE 이내 청크가 LOCAL_DOCS_MIN_CHUNKS개 이상이면 Tavily 형식 결과,
+        아니면 None (→ Tavily). 질의 임베딩은 검색 단계(EmbeddingContext)에서 재사용한다.
+        search_agent의 web_search 노드가 LOCAL_DOCS_ENABLED일 때 호출.
+        """
+        query_embedding = self._embed(query, context=embeddings)
+        if query_embedding is None:
+            return None
+        chunks = self._retrieve_fused(query, query_embedding, self.LOCAL_DOCS_CHUNKS, None, model=ReferenceChunk)
+        return self._local_docs_results(chunks)
+
+    def _local_docs_results(self, chunks):
+        """적중 청크를 레퍼런스별로 묶어 {'results': [{url, title, content, score}]} (청크는 문서 내 순서로)"""
+        hits = [
+            c for c in chunks
+            if c.vec_distance is not None and c.vec_distance <= settings.LOCAL_DOCS_MAX_DISTANCE
+        ]
+        if len(hits) < settings.LOCAL_DOCS_MIN_CHUNKS:
+            return None
+        by_reference = {}
+        for chunk in hits:
+            by_reference.setdefault(chunk.reference_id, []).append(chunk)
+        reference_pks = list(by_reference)[:self.LOCAL_DOCS_RESULTS]
+        references = Reference.objects.in_bulk(reference_pks)
+        results = []
+        for pk in reference_pks:
+            if pk not in references:
+                continue
+            ref_chunks = sorted(by_reference[pk], key=lambda c: c.position)
+            results.append({
+                'url': references[pk].url,
+                'title': references[pk].title,
+                'content': "\n\n".join(c.text for c in ref_chunks),
+                'score': 1 - min(c.vec_distance for c in ref_chunks),
+            })
+        print(f"  로컬 문서 적중: 청크 {len(hits)}개 / 문서 {len(results)}개 (Tavily 생략)")
+        return {'results': results}
+
     # ── 에이전트: 라우팅 판단 (search_agent의 router 노드에서 호출) ──
 
     def decide_route(self, query, retrieved_logs):
@@ -196,43 +548,30 @@ class LearnlogService:
         웹 검색 보강이 필요한지(need_web)를 LLM이 판단.
         실패 시 둘 다 True — 라우팅 도입 전 파이프라인과 동일한 안전 기본값.
         """
-        log_lines = "\n".join(
-            f"- {log.query}: {log.ai_response[:200]}"
-            for log in retrieved_logs
-        ) or "(검색된 기록 없음)"
-        prompt = textwrap.dedent(f"""
-            사용자의 개발 질문과, 사용자가 과거에 학습한 기록 목록입니다.
-
-            질문: {query}
-
-            과거 학습 기록 (제목: 내용 앞부분):
-            {log_lines}
-
-            JSON으로만 응답하세요 (```없이):
-            {{
-              "use_logs": true/false,
-              "need_web": true/false,
-              "reason": "판단 근거 한 문장"
-            }}
-
-            판단 기준:
-            - use_logs: 기록이 질문과 같은 주제를 다뤄서 답변 컨텍스트로 유용한가.
-              주제가 다른 기록뿐이면 false (무관한 기록을 넣으면 답변 품질이 떨어짐)
-            - need_web: 기록만으로 부족해서 웹 검색 보강이 필요한가.
-              기록이 질문의 답을 이미 충분히 담고 있을 때만 false.
-              단, 구체적인 버전·설정/옵션 이름·API 시그니처·정확한 수치·최신 동향을 묻는
-              질문은 기록이 충분해 보여도 true (기록은 LLM 생성물이라 공식 문서 대조 필요)
-        """).strip()
         try:
-            result = self._call_groq_json(prompt, max_tokens=150)
-            return {
-                'use_logs': bool(result.get('use_logs', True)),
-                'need_web': bool(result.get('need_web', True)),
-                'reason': result.get('reason', ''),
-            }
+            result = self._call_groq_json(self._route_prompt(query, retrieved_logs), max_tokens=150)
+            return self._parse_route(result)
         except Exception as e:
             print(f"라우팅 판단 오류: {e}")
-            return {'use_logs': True, 'need_web': True, 'reason': '판단 실패 — 기본 경로'}
+            return dict(self.ROUTE_FALLBACK)
+
+    ROUTE_FALLBACK = {'use_logs': True, 'need_web': True, 'reason': '판단 실패 — 기본 경로'}
+
+    @staticmethod
+    def _parse_route(result):
+        return {
+            'use_logs': bool(result.get('use_logs', True)),
+            'need_web': bool(result.get('need_web', True)),
+            'reason': result.get('reason', ''),
+        }
+
+    @staticmethod
+    def _route_prompt(query, retrieved_logs):
+        log_lines = "\n".join(
+            f"- {log.query}: {LearnlogService._log_context(log, 200)}"
+            for log in retrieved_logs
+        ) or "(검색된 기록 없음)"
+        return prompts.render('route', query=query, log_lines=log_lines)
 
     def check_consistency(self, ai_response, retrieved_logs=None, retrieved_limit=500, search_results=None):
         """
@@ -241,52 +580,45 @@ class LearnlogService:
         반환: {'consistent': bool, 'note': str} — 컨텍스트가 없으면 None.
         판정 실패는 예외로 올린다 (호출자가 미검증 처리).
         """
-        retrieved = self._build_retrieved_context(retrieved_logs or [], limit=retrieved_limit)
-        web = "\n".join(
-            f"[{r.get('url', '')}] {r.get('content', '')[:200]}"
-            for r in (search_results or {}).get('results', [])[:2]
-        )
-        context = f"{retrieved}{web}".strip()
+        context = self._consistency_context(retrieved_logs, retrieved_limit, search_results)
         if not context:
             return None
 
-        prompt = textwrap.dedent(f"""
-            AI 답변이 생성에 사용된 참고 컨텍스트와 모순되는지 검사하세요.
-
-            참고 컨텍스트:
-            {context}
-
-            답변:
-            {ai_response[:3000]}
-
-            JSON으로만 응답하세요 (```없이):
-            {{
-              "consistent": true/false,
-              "note": "모순이 있으면 어떤 주장이 어긋나는지 한 문장 (없으면 빈 문자열)"
-            }}
-
-            판단 기준:
-            - 답변의 주장(수치, 동작 설명, API 사용법)이 컨텍스트 내용과 명백히 어긋나면 consistent=false
-            - 컨텍스트에 없는 내용을 답변이 추가로 다루는 것은 모순이 아님
-        """).strip()
-        result = self._call_groq_json(prompt, max_tokens=200)
+        result = self._call_groq_json(self._consistency_prompt(ai_response, context), max_tokens=200)
         consistent = bool(result.get('consistent', True))
         return {
             'consistent': consistent,
             'note': '' if consistent else result.get('note', ''),
         }
 
-    def verify_log(self, log, retrieved_logs=None, retrieved_limit=500, search_results=None):
+    @staticmethod
+    def _consistency_prompt(ai_response, context):
+        return prompts.render('consistency', context=context, answer=ai_response[:3000])
+
+    @classmethod
+    def _consistency_context(cls, retrieved_logs=None, retrieved_limit=500, search_results=None):
+        """Judge에게 보여줄 컨텍스트 — 생성에 쓴 과거 기록 + 웹 결과 발췌 (없으면 빈 문자열)"""
+        retrieved = cls._build_retrieved_context(retrieved_logs or [], limit=retrieved_limit)
+        web = "\n".join(
+            f"[{r.get('url', '')}] {r.get('content', '')[:200]}"
+            for r in (search_results or {}).get('results', [])[:2]
+        )
+        return f"{retrieved}{web}".strip()
+
+    def verify_log(self, log, retrieved_logs=None, retrieved_limit=500, search_results=None, raise_errors=False):
         """
         저장된 로그를 검사하고 결과를 verification 필드에 기록.
-        저장 후 백그라운드 스레드에서 호출된다 — 응답 흐름을 막지 않고, 결과는 배지로만 표시.
+        저장 후 작업 큐(jobs.verify_log)에서 호출된다 — 응답 흐름을 막지 않고, 결과는 배지로만 표시.
         컨텍스트가 없거나 검증에 실패하면 미검증('')으로 남긴다.
+        raise_errors=True면 판정 실패를 올려 보낸다 (재시도가 남은 작업 — pending 유지).
         """
         try:
             verdict = self.check_consistency(
                 log.ai_response, retrieved_logs, retrieved_limit, search_results,
             )
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"비동기 검증 오류: {e}")
             verdict = None
         if verdict is None:
@@ -297,20 +629,45 @@ class LearnlogService:
             log.verification_note = verdict['note']
         log.save(update_fields=['verification', 'verification_note'])
 
-    def _call_groq_json(self, prompt, max_tokens=300):
+    def _call_groq_json(self, prompt, max_tokens=300, cache=True):
         """
         Groq 경량 모델 호출 후 JSON 파싱.
         response_format=json_object로 모델 레벨에서 valid JSON을 강제한다
         (코드펜스·잡설 방지). 프롬프트에 'JSON' 단어가 있어야 동작.
+        cache=False: 프롬프트에 생성된 답변 전체가 들어가 다시 적중할 일이 없는 호출 — 캐시 자리만 차지한다.
         """
-        response = self.groq_client.chat.completions.create(
-            model=self.LIGHT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
+        return self._groq_chat(
+            prompt, max_tokens, response_format={"type": "json_object"}, parse=json.loads, cache=cache,
         )
-        return json.loads(response.choices[0].message.content)
+
+    def _groq_params(self, prompt, max_tokens, temperature, response_format):
+        params = {
+            'model': self.LIGHT_MODEL,
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+        }
+        if response_format is not None:
+            params['response_format'] = response_format
+        return params
+
+    def _groq_chat(self, prompt, max_tokens, temperature=0.0, response_format=None, parse=None, cache=True):
+        """
+        Groq 경량 모델 단일 호출 → 응답 텍스트 (parse를 주면 파싱 결과).
+        cache=True면 같은 (모델, 프롬프트, 디코딩 파라미터)는 llm_cache에서 꺼낸다.
+        파싱까지 성공한 응답만 캐시 — 깨진 응답이 캐시에 남아 계속 실패하지 않도록.
+        API·파싱 실패는 그대로 올린다 (호출자가 fallback 처리).
+        """
+        params = self._groq_params(prompt, max_tokens, temperature, response_format)
+        content = self.llm_cache.get(params) if cache else None
+        if content is not None:
+            return parse(content) if parse else content
+        response = self.groq_client.chat.completions.create(**params)
+        content = response.choices[0].message.content
+        result = parse(content) if parse else content
+        if cache:
+            self.llm_cache.set(params, content)
+        return result
 
     def search_official_docs(self, query, parent=None):
         """
@@ -320,35 +677,57 @@ class LearnlogService:
         - 꼬리질문(parent)이면 루트+직속 부모 질문을 변환 컨텍스트로 사용
           (체인에서 직속 부모도 모호할 수 있으므로 자기완결적인 루트 질문으로 주제 보장)
         """
-        context_queries = None
-        if parent:
-            context_queries = list(dict.fromkeys([parent.root.query, parent.query]))
+        context_queries = self._context_queries(parent)
 
         # 한국어 → 영어 검색어 변환 (영어 공식 문서 매칭률 향상)
         search_query = self._to_search_query(query, context_queries)
 
-        # 도메인 매칭은 원본(한국어 키워드 포함) + 변환 쿼리 + 부모 질문에서 추출
-        domain_source = f"{query} {search_query} {' '.join(context_queries or [])}"
-        domains = get_domains_for_query(domain_source)
-        print(f"  검색어: {search_query} / 도메인: {domains}")
-
         try:
-            search_params = {
-                'query': search_query,
-                'search_depth': 'advanced',
-                'max_results': 5,
-            }
-
-            # 도메인이 있으면 include_domains 추가
-            if domains:
-                search_params['include_domains'] = domains
-
-            results = self.tavily_client.search(**search_params)
-            return results
+            return self._tavily_search(self._search_params(query, search_query, context_queries))
         except Exception as e:
             print(f"검색 오류: {e}")
             return {'results': []}
 
+    def _tavily_search(self, params):
+        """
+        SEARCH_CACHE_ENABLED면 검색 결과 캐시를 먼저 본다 — 적중하면 Tavily 왕복 없이 바로 답변 생성으로.
+        만료 직후(stale) 결과도 그대로 쓰고 갱신은 작업 큐에서 (services/search_cache.py)
+        """
+        if not settings.SEARCH_CACHE_ENABLED:
+            return self.tavily_client.search(**params)
+        cached = self.search_cache.get(params)
+        if cached is not None:
+            return cached
+        response = self.tavily_client.search(**params)
+        self.search_cache.set(params, response)
+        return response
+
+    @staticmethod
+    def _context_queries(parent):
+        """꼬리질문 검색어 변환용 루트+직속 부모 질문 (부모 체인 조회로 DB 접근 발생)"""
+        if not parent:
+            return None
+        return list(dict.fromkeys([parent.root.query, parent.query]))
+
+    @staticmethod
+    def _search_params(query, search_query, context_queries):
+        """Tavily 검색 인자. 도메인 매칭은 원본(한국어 키워드 포함) + 변환 쿼리 + 부모 질문에서 추출"""
+        domain_source = f"{query} {search_query} {' '.join(context_queries or [])}"
+        domains = get_domains_for_query(domain_source)
+        print(f"  검색어: {search_query} / 도메인: {domains}")
+
+        search_params = {
+            'query': search_query,
+            'search_depth': 'advanced',
+            'max_results': 5,
+        }
+        if settings.REFERENCE_STORE_ENABLED:
+            search_params['include_raw_content'] = True  # 본문 저장용 (답변 프롬프트는 content만 사용)
+        # 도메인이 있으면 include_domains 추가
+        if domains:
+            search_params['include_domains'] = domains
+        return search_params
+
     def _to_search_query(self, query, context_queries=None):
         """
         한국어 개발 질문을 영어 웹 검색용 키워드로 변환.
@@ -356,28 +735,21 @@ class LearnlogService:
         context_queries(루트+직속 부모 질문)를 함께 넘긴다 (0610 벤치마크: 0% → 100%).
         실패 시 원본 질문을 그대로 반환한다.
         """
-        context_lines = "".join(
-            f"Previous question (context): {q}\n" for q in (context_queries or [])
-        )
-        prompt = (
-            "Convert this developer question into a concise English web search query.\n"
-            "Output only the search keywords (tech names, concepts), no explanation.\n\n"
-            f"{context_lines}Question: {query}\n\n"
-            "Search query:"
-        )
+        prompt = self._search_query_prompt(query, context_queries)
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.LIGHT_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.0,
-                max_tokens=40,
-            )
-            converted = response.choices[0].message.content.strip()
+            converted = self._groq_chat(prompt, max_tokens=40).strip()
             return converted or query
         except Exception as e:
             print(f"검색어 변환 오류: {e}")
             return query
 
+    @staticmethod
+    def _search_query_prompt(query, context_queries=None):
+        context_lines = "".join(
+            f"Previous question (context): {q}\n" for q in (context_queries or [])
+        )
+        return prompts.render('search_query', context_lines=context_lines, query=query)
+
     DEFAULT_INSTRUCTIONS = (
         "형식: 개념 → 동작 원리 → 코드 예시 → 주의사항. 코드에 주석 포함. "
         "코드 예시는 질문에 언어/스택 지정이 없으면 Python(백엔드 맥락은 Django) 기준으로. "
@@ -386,6 +758,16 @@ class LearnlogService:
         "근거가 없으면 불확실하다고 명시할 것."
     )
 
+    @staticmethod
+    def _log_context(log, limit=None):
+        """
+        RAG에 넣을 과거 로그 답변. 청크 검색(LOG_CHUNK_RETRIEVAL)으로 찾은 로그면 질문과 맞는 청크들,
+        아니면 답변 앞부분. limit자 절삭 (None이면 전체 — 토큰 예산 패커가 자른다)
+        """
+        chunks = vars(log).get('matched_chunks')  # _retrieve_chunked가 붙인 인스턴스 속성만
+        text = "\n…\n".join(chunks) if chunks else log.ai_response
+        return text[:limit] if limit is not None else text
+
     @staticmethod
     def _build_retrieved_context(retrieved_logs, limit=500):
         """
@@ -396,7 +778,7 @@ class LearnlogService:
         if not retrieved_logs:
             return ""
         blocks = "\n".join(
-            f"[기록{i}] Q: {log.query}\nA: {log.ai_response[:limit]}"
+            f"[기록{i}] Q: {log.query}\nA: {LearnlogService._log_context(log, limit)}"
             for i, log in enumerate(retrieved_logs, start=1)
         )
         return f"과거에 학습한 관련 기록:\n{blocks}\n\n"
@@ -415,25 +797,71 @@ class LearnlogService:
             f"[이전 답변] {parent.ai_response[:500]}\n\n"
         )
 
-    def generate_answer(self, query, search_results, custom_instructions=None, parent=None, retrieved_logs=None, retrieved_limit=500):
+    def _packed_answer_context(self, search_results, parent=None, retrieved_logs=None):
         """
-        Mistral API로 AI 답변 생성
+        CONTEXT_PACKING: 고정 글자 절삭 대신 CONTEXT_TOKEN_BUDGET을 관련도 비례로 나눠
+        (과거 기록, 이전 대화, 웹 발췌) 블록을 만든다 — 형식은 고정 절삭 경로와 같다.
+        관련도: 과거 기록은 RRF 점수(없으면 순위)를 1위 기준으로 정규화, 웹은 Tavily score,
+        직속 부모 답변은 1.0. 출처 헤더(질문·URL)는 자르지 않고 예산에서 먼저 뺀다.
         """
-        context = "\n".join([
-            f"[{r.get('url', '')}] {r.get('content', '')[:200]}"
-            for r in search_results.get('results', [])[:2]
-        ])
+        logs = retrieved_logs or []
+        results = search_results.get('results', [])
+
+        rrf = [getattr(log, 'rrf_score', None) or 1.0 / (self.RRF_K + rank) for rank, log in enumerate(logs, start=1)]
+        sources = [(('log', i), self._log_context(log), rrf[i] / max(rrf)) for i, log in enumerate(logs)]
+        sources += [
+            (('web', i), r.get('content', ''), r.get('score') or 1.0 / (i + 1))
+            for i, r in enumerate(results)
+        ]
+        if parent:
+            sources.append((('parent', 0), parent.ai_response, 1.0))
+
+        headers = [log.query for log in logs] + [r.get('url', '') for r in results] + ([parent.query] if parent else [])
+        budget = settings.CONTEXT_TOKEN_BUDGET - sum(count_tokens(h) for h in headers)
+        packed = pack(sources, budget)
+
+        kept_logs = [(log, packed[('log', i)]) for i, log in enumerate(logs) if packed[('log', i)]]
+        blocks = "\n".join(
+            f"[기록{n}] Q: {log.query}\nA: {body}" for n, (log, body) in enumerate(kept_logs, start=1)
+        )
+        retrieved = f"과거에 학습한 관련 기록:\n{blocks}\n\n" if blocks else ""
+        conversation = (
+            f"이전 대화:\n[이전 질문] {parent.query}\n[이전 답변] {packed[('parent', 0)]}\n\n" if parent else ""
+        )
+        context = "\n".join(
+            f"[{r.get('url', '')}] {packed[('web', i)]}" for i, r in enumerate(results) if packed[('web', i)]
+        )
+        return retrieved, conversation, context
+
+    def _answer_prompt(self, query, search_results, custom_instructions=None, parent=None, retrieved_logs=None, retrieved_limit=500):
+        """
+        generate_answer / 스트리밍 / async 스트리밍 공용 답변 프롬프트.
+        CONTEXT_PACKING이면 retrieved_limit 대신 토큰 예산 패커로 컨텍스트를 만든다
+        (웹 생략 경로는 웹 출처가 없으니 예산이 자연히 과거 기록으로 간다).
+        """
+        if settings.CONTEXT_PACKING:
+            retrieved, conversation, context = self._packed_answer_context(search_results, parent, retrieved_logs)
+        else:
+            context = "\n".join([
+                f"[{r.get('url', '')}] {r.get('content', '')[:200]}"
+                for r in search_results.get('results', [])[:2]
+            ])
+            conversation = self._build_conversation_context(parent)
+            retrieved = self._build_retrieved_context(retrieved_logs, limit=retrieved_limit)
 
         instructions = custom_instructions.strip() if custom_instructions else self.DEFAULT_INSTRUCTIONS
-        conversation = self._build_conversation_context(parent)
-        retrieved = self._build_retrieved_context(retrieved_logs, limit=retrieved_limit)
-
-        # 개행 포함 블록을 f-string에 넣으면 dedent가 무효라 직접 조립
-        prompt = (
-            "개발 질문에 한국어로 답변하세요.\n\n"
-            f"{retrieved}{conversation}질문: {query}\n\n"
-            f"참고:\n{context if context else '없음'}\n\n"
-            f"{instructions}"
+
+        return prompts.render(
+            'answer', retrieved=retrieved, conversation=conversation, query=query,
+            context=context or '없음', instructions=instructions,
+        )
+
+    def generate_answer(self, query, search_results, custom_instructions=None, parent=None, retrieved_logs=None, retrieved_limit=500):
+        """
+        Mistral API로 AI 답변 생성
+        """
+        prompt = self._answer_prompt(
+            query, search_results, custom_instructions, parent, retrieved_logs, retrieved_limit,
         )
 
         try:
@@ -454,21 +882,8 @@ class LearnlogService:
         meta dict를 넘기면 마지막 이벤트의 finish_reason을 채워준다
         ('length'면 max_tokens 잘림 — 호출자가 잘림 플래그에 사용).
         """
-        context = "\n".join([
-            f"[{r.get('url', '')}] {r.get('content', '')[:200]}"
-            for r in search_results.get('results', [])[:2]
-        ])
-
-        instructions = custom_instructions.strip() if custom_instructions else self.DEFAULT_INSTRUCTIONS
-        conversation = self._build_conversation_context(parent)
-        retrieved = self._build_retrieved_context(retrieved_logs, limit=retrieved_limit)
-
-        # 개행 포함 블록을 f-string에 넣으면 dedent가 무효라 직접 조립
-        prompt = (
-            "개발 질문에 한국어로 답변하세요.\n\n"
-            f"{retrieved}{conversation}질문: {query}\n\n"
-            f"참고:\n{context if context else '없음'}\n\n"
-            f"{instructions}"
+        prompt = self._answer_prompt(
+            query, search_results, custom_instructions, parent, retrieved_logs, retrieved_limit,
         )
 
         try:
@@ -493,49 +908,30 @@ class LearnlogService:
         """
         Groq API로 태그 자동 추출
         """
-        prompt = textwrap.dedent(f"""
-            다음 개발 질문과 답변에서 핵심 기술 태그를 추출해주세요.
-
-            질문: {query}
-            답변: {ai_response[:500]}
-
-            규칙:
-            - 정확히 3~5개의 태그만 추출
-            - 모두 소문자, 영어만 사용
-            - 쉼표로 구분
-            - 기술명, 도구명, 핵심 개념만 포함
-            - 불필요한 단어 제외 (예: "how", "what", "difference")
-            - 공백은 하이픈(-)으로 대체
-
-            출력 형식 예시: docker, network, bridge-mode, container
-
-            태그:
-        """).strip()
-
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.LIGHT_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=50
+            return self._groq_chat(
+                self._tags_prompt(query, ai_response), max_tokens=50, temperature=0.2, parse=self._parse_tags,
             )
 
-            tags_text = response.choices[0].message.content.strip()
-
-            # 파싱 및 정제
-            tags = [
-                tag.strip().lower().replace(' ', '-')
-                for tag in tags_text.split(',')
-                if tag.strip() and len(tag.strip()) > 1
-            ]
-
-            return tags[:5]  # 최대 5개
-
         except Exception as e:
             print(f"태그 추출 오류: {e}")
             # 실패 시 간단히 질문에서 추출
             return self._fallback_tag_extraction(query)
 
+    @classmethod
+    def _tags_prompt(cls, query, ai_response):
+        return prompts.render('tags', query=query, answer=ai_response[:cls.TAGS_INPUT_CHARS])
+
+    @staticmethod
+    def _parse_tags(tags_text):
+        """쉼표 구분 태그 응답 정제 — 소문자, 공백은 하이픈, 최대 5개"""
+        tags = [
+            tag.strip().lower().replace(' ', '-')
+            for tag in tags_text.strip().split(',')
+            if tag.strip() and len(tag.strip()) > 1
+        ]
+        return tags[:5]
+
     def _fallback_tag_extraction(self, query):
         """
         태그 추출 실패 시 대체 방법
@@ -552,44 +948,266 @@ class LearnlogService:
 
     def convert_to_markdown(self, query, answer, search_results):
         """
-        Groq API로 노션 스타일 마크다운 변환
+        노션 스타일 마크다운 변환. MARKDOWN_MODE='local'이면 로컬 포맷터(API 호출 없음),
+        'llm'이면 Groq 재작성 (실패 시 기본 포맷)
+        """
+        if settings.MARKDOWN_MODE == 'local':
+            return format_markdown(query, answer, search_results)
+        try:
+            return self.polish_markdown(query, answer, search_results)
+        except Exception as e:
+            print(f"마크다운 변환 오류: {e}")
+            return self._fallback_markdown(query, answer, search_results)
+
+    def polish_markdown(self, query, answer, search_results):
+        """Groq 재작성 — 실패는 호출자에게 (polish_markdown 작업은 재시도)"""
+        # 답변마다 입력이 달라 적중할 일이 없고 temperature도 높아 캐시하지 않는다
+        return self._groq_chat(
+            self._markdown_prompt(query, answer, search_results), max_tokens=2000, temperature=0.5, cache=False,
+        ).strip()
+
+    @staticmethod
+    def _markdown_refs(search_results):
+        return reference_list(search_results)
+
+    @classmethod
+    def _markdown_prompt(cls, query, answer, search_results):
+        refs = cls._markdown_refs(search_results)
+        return prompts.render('markdown', query=query, answer=answer, refs=refs or '없음')
+
+    # ── 후처리: 태그 + 마크다운 + 모순 검증 ──────────────────────────
+
+    def postprocess(self, query, answer, search_results, verify_context=None):
+        """
+        답변 생성 후 처리 → (태그, 마크다운, 판정).
+        POSTPROCESS_COMBINED면 JSON 모드 1회 호출로 세 가지를 함께 받는다 — 태그·마크다운·Judge가
+        같은 답변을 각자 입력 토큰으로 다시 보내던 것을 한 번으로. 실패하면 기존 개별 호출로 돌아간다.
+        verify_context: 생성에 쓴 (retrieved_logs, retrieved_limit, search_results) — 없으면 판정 생략.
+        판정은 통합 호출에서 받은 경우만 dict, 아니면 None (저장 후 verify_log 작업이 맡는다).
         """
-        refs = "\n".join([
-            f"- [{r.get('title', 'N/A')}]({r.get('url', '')})"
-            for r in search_results.get('results', [])
-        ])
+        if settings.POSTPROCESS_COMBINED:
+            try:
+                prompt, max_tokens, judged = self._postprocess_request(query, answer, search_results, verify_context)
+                result = self._call_groq_json(prompt, max_tokens=max_tokens, cache=False)
+                return self._parse_postprocess(result, query, answer, search_results, judged)
+            except Exception as e:
+                print(f"통합 후처리 오류 (개별 호출로 전환): {e}")
 
-        prompt = textwrap.dedent(f"""
-            다음 내용을 노션 스타일 마크다운으로 정리해주세요:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            tags_future = executor.submit(self._closing_connection, self.extract_tags, query, answer)
+            md_future = executor.submit(
+                self._closing_connection, self.convert_to_markdown, query, answer, search_results,
+            )
+            return tags_future.result(), md_future.result(), None
 
-            질문: {query}
+    @staticmethod
+    def _closing_connection(func, *args):
+        """풀 스레드에서 실행 — llm_cache DB 단계 조회·저장으로 연 스레드별 DB 커넥션을 마지막에 정리한다"""
+        try:
+            return func(*args)
+        finally:
+            connection.close()
+
+    @classmethod
+    def _postprocess_request(cls, query, answer, search_results, verify_context):
+        """통합 호출의 (프롬프트, max_tokens, 판정 포함 여부). 마크다운은 MARKDOWN_MODE='llm'일 때만 요청"""
+        context = cls._consistency_context(*verify_context) if verify_context else ''
+        with_markdown = settings.MARKDOWN_MODE != 'local'
+
+        template = prompts.get('postprocess')
+        parts = ['tags'] + (['markdown'] if with_markdown else []) + (['consistency'] if context else [])
+        values = {'refs': cls._markdown_refs(search_results) or '없음', 'context': context}
+        blocks = [template.render_part(part, 'block', **values) for part in parts]
+        prompt = template.render(
+            query=query,
+            answer=answer,
+            blocks=''.join(f"\n\n{block}" for block in blocks if block is not None),
+            tasks="\n".join(
+                f"{i}. {template.render_part(part, 'task')}" for i, part in enumerate(parts, start=1)
+            ),
+            fields=",\n".join(template.render_part(part, 'fields') for part in parts),
+        )
+        return prompt, (2300 if with_markdown else 300), bool(context)
+
+    def _parse_postprocess(self, result, query, answer, search_results, judged):
+        """통합 응답 → (태그, 마크다운, 판정). 태그가 없으면 실패로 보고 개별 호출에 맡긴다"""
+        tags = result.get('tags')
+        if isinstance(tags, list):
+            tags = ', '.join(str(tag) for tag in tags)
+        tags = self._parse_tags(tags) if isinstance(tags, str) else []
+        if not tags:
+            raise ValueError(f"태그 누락: {result}")
+
+        markdown = result.get('markdown')
+        if not isinstance(markdown, str) or not markdown.strip():
+            markdown = format_markdown(query, answer, search_results)
+
+        verdict = None
+        if judged and isinstance(result.get('consistent'), bool):
+            consistent = result['consistent']
+            verdict = {'consistent': consistent, 'note': '' if consistent else str(result.get('note', ''))}
+        return tags, markdown.strip(), verdict
 
-            답변:
-            {answer}
+    @staticmethod
+    def _fallback_markdown(query, answer, search_results):
+        """변환 실패 시 기본 포맷 — 로컬 포맷터와 같은 결과"""
+        return format_markdown(query, answer, search_results)
+
+    # ── ASGI 스트리밍 경로 (async) ────────────────────────────────────
+    # 외부 API 대기 동안 이벤트 루프를 양보해 워커 하나가 여러 스트림을 동시에 들고 있게 한다.
+    # 프롬프트·파싱은 sync 메서드와 같은 헬퍼를 쓰고, ORM 접근만 sync_to_async로 넘긴다.
+
+    @property
+    def groq_async_client(self):
+        return clients.groq_async()
+
+    @property
+    def tavily_async_client(self):
+        return clients.tavily_async()
+
+    async def _aembed(self, text, context=None):
+        cached = await sync_to_async(self._lookup_embedding)(text, context)
+        if cached is not None:
+            return cached
+        try:
+            response = await self.mistral_client.embeddings.create_async(
+                model=self.EMBED_MODEL,
+                inputs=[text],
+            )
+            embedding = response.data[0].embedding
+        except Exception as e:
+            print(f"임베딩 생성 오류: {e}")
+            return None
+        await sync_to_async(self.embedding_cache.set)(self.EMBED_MODEL, text, embedding)
+        if context is not None:
+            context.set(self.EMBED_MODEL, text, embedding)
+        return embedding
+
+    async def afind_cached_answer(self, query, embeddings=None):
+        query_embedding = await self._aembed(query, context=embeddings)
+        return await sync_to_async(semantic_cache.lookup)(query_embedding)
+
+    async def aretrieve_similar_logs(self, query, k=3, exclude_pks=None, embeddings=None):
+        query_embedding = await self._aembed(query, context=embeddings)
+        return await sync_to_async(self._retrieve)(query, query_embedding, k, exclude_pks)
+
+    async def _acall_groq_json(self, prompt, max_tokens=300, cache=True):
+        return await self._agroq_chat(
+            prompt, max_tokens, response_format={"type": "json_object"}, parse=json.loads, cache=cache,
+        )
 
-            참고 자료:
-            {refs if refs else "없음"}
+    async def _agroq_chat(self, prompt, max_tokens, temperature=0.0, response_format=None, parse=None, cache=True):
+        """_groq_chat의 async 버전 — 캐시는 sync 경로와 공유 (DB 단계가 있어 sync_to_async)"""
+        params = self._groq_params(prompt, max_tokens, temperature, response_format)
+        content = await sync_to_async(self.llm_cache.get)(params) if cache else None
+        if content is not None:
+            return parse(content) if parse else content
+        response = await self.groq_async_client.chat.completions.create(**params)
+        content = response.choices[0].message.content
+        result = parse(content) if parse else content
+        if cache:
+            await sync_to_async(self.llm_cache.set)(params, content)
+        return result
+
+    async def adecide_route(self, query, retrieved_logs):
+        try:
+            result = await self._acall_groq_json(self._route_prompt(query, retrieved_logs), max_tokens=150)
+            return self._parse_route(result)
+        except Exception as e:
+            print(f"라우팅 판단 오류: {e}")
+            return dict(self.ROUTE_FALLBACK)
 
-            요구사항:
-            - 제목은 ## 질문 형식으로
-            - 핵심 내용은 명확하게 구조화
-            - 차이점이나 비교는 표(table) 사용
-            - 코드 예시는 적절한 언어로 ```언어 코드블록``` 사용
-            - 참고 자료는 맨 아래 "## 참고 자료" 섹션에
-            - 노션에 바로 복사/붙여넣기 가능하게
+    async def _ato_search_query(self, query, context_queries=None):
+        try:
+            converted = (await self._agroq_chat(self._search_query_prompt(query, context_queries), max_tokens=40)).strip()
+            return converted or query
+        except Exception as e:
+            print(f"검색어 변환 오류: {e}")
+            return query
 
-            출력:
-        """).strip()
+    async def asearch_official_docs(self, query, parent=None):
+        context_queries = await sync_to_async(self._context_queries)(parent)
+        search_query = await self._ato_search_query(query, context_queries)
+        try:
+            return await self._atavily_search(self._search_params(query, search_query, context_queries))
+        except Exception as e:
+            print(f"검색 오류: {e}")
+            return {'results': []}
 
+    async def _atavily_search(self, params):
+        """_tavily_search의 async 버전 — 캐시는 sync 경로와 공유"""
+        if not settings.SEARCH_CACHE_ENABLED:
+            return await self.tavily_async_client.search(**params)
+        cached = await sync_to_async(self.search_cache.get)(params)
+        if cached is not None:
+            return cached
+        response = await self.tavily_async_client.search(**params)
+        await sync_to_async(self.search_cache.set)(params, response)
+        return response
+
+    async def asearch_local_docs(self, query, embeddings=None):
+        query_embedding = await self._aembed(query, context=embeddings)
+        if query_embedding is None:
+            return None
+        chunks = await sync_to_async(self._retrieve_fused)(
+            query, query_embedding, self.LOCAL_DOCS_CHUNKS, None, model=ReferenceChunk,
+        )
+        return await sync_to_async(self._local_docs_results)(chunks)
+
+    async def agenerate_answer_stream(self, query, search_results, custom_instructions=None, parent=None, retrieved_logs=None, retrieved_limit=500, meta=None):
+        """generate_answer_stream의 async 버전 (meta의 finish_reason 규약 동일)"""
+        prompt = self._answer_prompt(
+            query, search_results, custom_instructions, parent, retrieved_logs, retrieved_limit,
+        )
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.LIGHT_MODEL,
+            stream = await self.mistral_client.chat.stream_async(
+                model=self.ANSWER_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
+                temperature=0.7,
                 max_tokens=2000
             )
-            return response.choices[0].message.content.strip()
+            async for event in stream:
+                choice = event.data.choices[0]
+                if meta is not None and choice.finish_reason:
+                    meta['finish_reason'] = str(choice.finish_reason)
+                chunk = choice.delta.content
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            print(f"AI 답변 스트리밍 오류: {e}")
+            yield "답변 생성 중 오류가 발생했습니다."
+
+    async def aextract_tags(self, query, ai_response):
+        try:
+            return await self._agroq_chat(
+                self._tags_prompt(query, ai_response), max_tokens=50, temperature=0.2, parse=self._parse_tags,
+            )
+        except Exception as e:
+            print(f"태그 추출 오류: {e}")
+            return self._fallback_tag_extraction(query)
+
+    async def aconvert_to_markdown(self, query, answer, search_results):
+        if settings.MARKDOWN_MODE == 'local':
+            return format_markdown(query, answer, search_results)
+        try:
+            return (await self._agroq_chat(
+                self._markdown_prompt(query, answer, search_results), max_tokens=2000, temperature=0.5, cache=False,
+            )).strip()
         except Exception as e:
             print(f"마크다운 변환 오류: {e}")
-            # 실패 시 기본 포맷
-            return f"## {query}\n\n{answer}\n\n## 참고 자료\n{refs}"
+            return self._fallback_markdown(query, answer, search_results)
+
+    async def apostprocess(self, query, answer, search_results, verify_context=None):
+        if settings.POSTPROCESS_COMBINED:
+            try:
+                prompt, max_tokens, judged = self._postprocess_request(query, answer, search_results, verify_context)
+                result = await self._acall_groq_json(prompt, max_tokens=max_tokens, cache=False)
+                return self._parse_postprocess(result, query, answer, search_results, judged)
+            except Exception as e:
+                print(f"통합 후처리 오류 (개별 호출로 전환): {e}")
+
+        tag_names, markdown = await asyncio.gather(
+            self.aextract_tags(query, answer),
+            self.aconvert_to_markdown(query, answer, search_results),
+        )
+        return tag_names, markdown, None
@@ -0,0 +1,48 @@
+"""
+Groq 경량 모델 응답 캐시 (태그 추출·라우팅·검색어 변환·검증 Judge).
+
+temperature 0.0~0.2 호출은 같은 입력이면 사실상 같은 응답이고, 꼬리질문 체인·재실행·
+verify_logs 재검사에서 입력이 자주 반복된다. (모델, 메시지, 디코딩 파라미터)의 해시를 키로
+응답 텍스트를 캐시해 지연과 무료 티어 한도를 아낀다.
+
+    1단계: 프로세스 내 LRU / 2단계: CachedCompletion 테이블 (선택, TTL + 최대 행 수) — tiered_cache.TieredCache
+
+호출부별 opt-out은 LearnlogService._groq_chat(cache=False) — 창작성 높은 호출(마크다운 변환 등).
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+
+from .tiered_cache import TieredCache
+
+
+def completion_key(params):
+    """요청 파라미터 전체(모델·메시지·temperature·max_tokens·response_format)의 sha256"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class CompletionCache(TieredCache):
+    model_name = 'CachedCompletion'
+    label = 'LLM 캐시'
+
+    def __init__(self, max_size=None, use_db=None, ttl_days=None, db_max_rows=None):
+        super().__init__(
+            max_size=max_size if max_size is not None else settings.LLM_CACHE_SIZE,
+            use_db=use_db if use_db is not None else settings.LLM_CACHE_DB,
+            db_max_rows=db_max_rows if db_max_rows is not None else settings.LLM_CACHE_DB_MAX_ROWS,
+            ttl=timedelta(days=ttl_days if ttl_days is not None else settings.LLM_CACHE_TTL_DAYS),
+        )
+
+    def get(self, params):
+        return self._get(completion_key(params))
+
+    def set(self, params, content):
+        self._set(completion_key(params), content, {'model': params['model'], 'content': content})
+
+    def _from_row(self, row):
+        return row.content
+
+
+llm_cache = CompletionCache()
@@ -0,0 +1,62 @@
+"""
+학습 로그 청크 (LearningLogChunk).
+
+로그 임베딩은 query + ai_response[:2000]이라 그 뒤의 내용은 벡터 검색에 잡히지 않고,
+한 벡터에 답변의 여러 하위 주제가 섞인다. 답변(ai_response — markdown_content는 사본이라 제외)을 섹션 단위 청크로 나눠 청크마다 임베딩·tsvector를 두고,
+검색은 로그별 최고 청크(MaxSim)로 모아 로그 단위 순위와 RRF로 합친다 (LearnlogService._retrieve_chunked).
+찾은 청크는 로그에 matched_chunks로 붙어, RAG 컨텍스트가 답변 앞부분 대신 질문과 맞는 부분을 넣는다.
+
+    build_chunks(log)                → 저장 전 청크 객체 목록 (save_learning_log 트랜잭션 안에서 bulk_create)
+    embed_chunks(service, log_pks)   → 임베딩 못 채운 청크 수 (embed_log 작업 / chunk_logs 백필)
+    group_by_log(chunks)             → {log_id: [청크]} — 청크 순위 순서 유지 (첫 등장 = 로그의 최고 청크)
+"""
+from ..models import LearningLogChunk
+from .chunking import chunk_text
+
+LOG_CHUNK_CHARS = 600  # RAG 로그 컨텍스트(500/1500자) 안에 청크 1~2개가 들어가는 크기
+
+
+def build_chunks(log):
+    """
+    ai_response만 청크로 나눈다 — 의도된 것.
+    markdown_content는 같은 답변을 학습 노트 형식으로 다시 쓴 사본이라(로그 임베딩 _embedding_input과 같은 이유)
+    함께 넣으면 같은 내용의 청크가 두 벌 생겨 MaxSim·RRF에서 한 로그가 자리를 차지하고 임베딩 비용만 는다.
+    """
+    return [
+        LearningLogChunk(log=log, position=i, text=piece)
+        for i, piece in enumerate(chunk_text(log.ai_response, max_chars=LOG_CHUNK_CHARS))
+    ]
+
+
+def chunk_embedding_input(query, text):
+    """청크 임베딩 대상 텍스트 — 질문을 앞에 붙여 청크만으로는 빠지는 주제를 보완"""
+    return f"{query}\n{text}"
+
+
+def embed_chunks(service, log_pks, rate_limiter=None):
+    """임베딩이 비어 있는 청크를 배치 임베딩 (service._embed_many). 실패한 청크 수 반환"""
+    chunks = list(
+        LearningLogChunk.objects.filter(log_id__in=log_pks, embedding__isnull=True)
+        .select_related('log')
+        .only('pk', 'text', 'log__query')
+        .order_by('pk')
+    )
+    if not chunks:
+        return 0
+    embeddings = service._embed_many(
+        [chunk_embedding_input(c.log.query, c.text) for c in chunks], rate_limiter=rate_limiter,
+    )
+    updated = []
+    for chunk, embedding in zip(chunks, embeddings):
+        if embedding is not None:
+            chunk.embedding = embedding
+            updated.append(chunk)
+    LearningLogChunk.objects.bulk_update(updated, ['embedding'])
+    return len(chunks) - len(updated)
+
+
+def group_by_log(chunks):
+    grouped = {}
+    for chunk in chunks:
+        grouped.setdefault(chunk.log_id, []).append(chunk)
+    return grouped
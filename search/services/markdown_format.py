@@ -0,0 +1,113 @@
+"""
+로컬 마크다운 포맷터 (MARKDOWN_MODE='local').
+
+Mistral 답변은 이미 마크다운(소제목·목록·표·코드블록)이라 Groq으로 전체를 다시 타이핑할 필요가 없다.
+구조만 결정적으로 정리한다 — API 호출 없이 마이크로초 단위:
+
+    - 맨 위 `## 질문` 제목
+    - 답변 속 제목은 `###` 이하로 내려 질문 제목 아래에 들어가게 (#, ## → ###, ### → #### ...)
+    - 답변이 스스로 붙인 참고 자료·출처 섹션은 떼고, search_results로 `## 참고 자료`를 다시 만든다
+    - 제목·코드블록 앞뒤 빈 줄 정리, 연속 빈 줄은 하나로. 코드블록 안쪽은 건드리지 않는다
+
+줄 단위 상태 기계라 답변을 나눠 feed()해도 결과가 같다.
+LLM 재작성(표 정리 등)은 MARKDOWN_POLISH를 켜면 저장 후 polish_markdown 작업으로 돌린다.
+"""
+import re
+
+_FENCE = re.compile(r'^\s*(`{3,}|~{3,})')
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+_REFS_TITLE = re.compile(r'^(참고\s*자료|참고\s*문헌|참고|출처|references?|sources?)$', re.IGNORECASE)
+
+
+def reference_list(search_results):
+    """검색 결과 → `- [제목](url)` 목록 (URL 중복 제거, 순서 유지)"""
+    seen = set()
+    lines = []
+    for r in (search_results or {}).get('results', []):
+        url = r.get('url', '')
+        if url in seen:
+            continue
+        seen.add(url)
+        lines.append(f"- [{r.get('title', 'N/A')}]({url})")
+    return "\n".join(lines)
+
+
+class MarkdownFormatter:
+    def __init__(self, query):
+        self.title = ' '.join(query.split())
+        self._lines = []
+        self._buffer = ''
+        self._started = False
+        self._fence = None       # 열린 코드블록의 펜스 문자열 (``` / ~~~)
+        self._skip_level = None  # 제거 중인 참고 자료 섹션의 제목 레벨
+
+    def feed(self, text):
+        """답변 조각 추가 — 완성된 줄만 처리하고 마지막 미완성 줄은 버퍼에 남긴다"""
+        self._buffer += text.replace('\r\n', '\n')
+        if not self._started:
+            # 답변 전체를 strip()한 것과 같게 — 첫 내용 앞 공백·빈 줄은 버린다
+            self._buffer = self._buffer.lstrip()
+            self._started = bool(self._buffer)
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            self._feed_line(line)
+        return self
+
+    def finish(self, search_results):
+        """남은 버퍼를 처리하고 제목 + 본문 + 참고 자료를 합친 최종 마크다운"""
+        if self._buffer:
+            self._feed_line(self._buffer)
+            self._buffer = ''
+        body = "\n".join(self._lines).strip()
+        parts = [f"## {self.title}"]
+        if body:
+            parts.append(body)
+        refs = reference_list(search_results)
+        if refs:
+            parts.append(f"## 참고 자료\n{refs}")
+        return "\n\n".join(parts)
+
+    def _feed_line(self, line):
+        if self._fence is not None:
+            if self._skip_level is None:
+                self._lines.append(line)
+            if line.strip().startswith(self._fence) and not line.strip().strip(self._fence[0]):
+                self._fence = None
+                self._blank()
+            return
+
+        line = line.rstrip()
+        fence = _FENCE.match(line)
+        heading = _HEADING.match(line)
+
+        if heading:
+            level = len(heading.group(1))
+            title = heading.group(2).strip().strip('*').rstrip(':').strip()
+            if self._skip_level is not None and level <= self._skip_level:
+                self._skip_level = None
+            if _REFS_TITLE.match(title):
+                self._skip_level = level
+            if self._skip_level is not None:
+                return
+            self._blank()
+            self._lines.append(f"{'#' * min(max(level + 1, 3), 6)} {title}")
+            self._blank()
+        elif self._skip_level is not None:
+            if fence:
+                self._fence = fence.group(1)
+        elif fence:
+            self._fence = fence.group(1)
+            self._blank()
+            self._lines.append(line)
+        elif not line.strip():
+            self._blank()
+        else:
+            self._lines.append(line)
+
+    def _blank(self):
+        if self._lines and self._lines[-1] != '':
+            self._lines.append('')
+
+
+def format_markdown(query, answer, search_results):
+    return MarkdownFormatter(query).feed(answer).finish(search_results)
@@ -0,0 +1,277 @@
+"""
+프롬프트 레지스트리.
+
+템플릿은 import 시점에 한 번 dedent·strip해서 (이름, 버전)으로 등록하고, 호출마다 str.format으로 값만 채운다.
+여러 줄 값(과거 기록 목록 등)을 넣어도 들여쓰기가 깨지지 않는다 (f-string + dedent는 값에 개행이 있으면 무효).
+
+    render('tags', query=..., answer=...)   → 활성 버전으로 렌더
+    get('answer').tag                        → 'answer@v1' — LearningLog/Exercise.prompt_version에 기록
+    render('answer', version='v2', ...)      → 벤치마크에서 버전 A/B (프롬프트 코드 복사 없이)
+
+활성 버전은 settings.PROMPT_VERSIONS[이름], 없으면 마지막으로 등록된 버전.
+새 버전은 기존 버전을 지우지 말고 같은 이름으로 register를 하나 더 추가한다 (저장된 로그의 버전 추적용).
+템플릿 안의 JSON 예시 중괄호는 {{ }}로 이스케이프한다.
+
+조건부로 붙는 조각이 있는 프롬프트(postprocess)는 parts에 조각별 템플릿을 같이 등록한다 —
+조각도 버전에 묶여 본문과 함께 바뀐다. 호출부가 고른 조각만 render_part로 채워 본문 값으로 넣는다.
+"""
+import textwrap
+
+from django.conf import settings
+
+
+class Prompt:
+    __slots__ = ('name', 'version', 'text', 'parts')
+
+    def __init__(self, name, version, text, parts=None):
+        self.name = name
+        self.version = version
+        self.text = textwrap.dedent(text).strip()
+        self.parts = parts or {}  # 조각 → {'block'|'task'|'fields': 템플릿} — 한 줄 문자열이라 dedent 없음
+
+    @property
+    def tag(self):
+        return f"{self.name}@{self.version}"
+
+    def render(self, **values):
+        return self.text.format(**values)
+
+    def render_part(self, part, key, **values):
+        """조각 템플릿 렌더 — 조각에 그 항목이 없으면 None"""
+        template = self.parts[part].get(key)
+        return template.format(**values) if template is not None else None
+
+
+_REGISTRY = {}  # 이름 → {버전: Prompt}
+_LATEST = {}    # 이름 → 마지막 등록 버전
+
+
+def register(name, version, text, parts=None):
+    _REGISTRY.setdefault(name, {})[version] = Prompt(name, version, text, parts)
+    _LATEST[name] = version
+
+
+def get(name, version=None):
+    version = version or settings.PROMPT_VERSIONS.get(name) or _LATEST[name]
+    return _REGISTRY[name][version]
+
+
+def render(name, version=None, **values):
+    return get(name, version).render(**values)
+
+
+def versions(name):
+    return list(_REGISTRY[name])
+
+
+# ── 답변 생성 (LearnlogService) ──────────────────────────────────────
+
+register('answer', 'v1', """
+    개발 질문에 한국어로 답변하세요.
+
+    {retrieved}{conversation}질문: {query}
+
+    참고:
+    {context}
+
+    {instructions}
+""")
+
+register('search_query', 'v1', """
+    Convert this developer question into a concise English web search query.
+    Output only the search keywords (tech names, concepts), no explanation.
+
+    {context_lines}Question: {query}
+
+    Search query:
+""")
+
+register('route', 'v1', """
+    사용자의 개발 질문과, 사용자가 과거에 학습한 기록 목록입니다.
+
+    질문: {query}
+
+    과거 학습 기록 (제목: 내용 앞부분):
+    {log_lines}
+
+    JSON으로만 응답하세요 (```없이):
+    {{
+      "use_logs": true/false,
+      "need_web": true/false,
+      "reason": "판단 근거 한 문장"
+    }}
+
+    판단 기준:
+    - use_logs: 기록이 질문과 같은 주제를 다뤄서 답변 컨텍스트로 유용한가.
+      주제가 다른 기록뿐이면 false (무관한 기록을 넣으면 답변 품질이 떨어짐)
+    - need_web: 기록만으로 부족해서 웹 검색 보강이 필요한가.
+      기록이 질문의 답을 이미 충분히 담고 있을 때만 false.
+      단, 구체적인 버전·설정/옵션 이름·API 시그니처·정확한 수치·최신 동향을 묻는
+      질문은 기록이 충분해 보여도 true (기록은 LLM 생성물이라 공식 문서 대조 필요)
+""")
+
+register('consistency', 'v1', """
+    AI 답변이 생성에 사용된 참고 컨텍스트와 모순되는지 검사하세요.
+
+    참고 컨텍스트:
+    {context}
+
+    답변:
+    {answer}
+
+    JSON으로만 응답하세요 (```없이):
+    {{
+      "consistent": true/false,
+      "note": "모순이 있으면 어떤 주장이 어긋나는지 한 문장 (없으면 빈 문자열)"
+    }}
+
+    판단 기준:
+    - 답변의 주장(수치, 동작 설명, API 사용법)이 컨텍스트 내용과 명백히 어긋나면 consistent=false
+    - 컨텍스트에 없는 내용을 답변이 추가로 다루는 것은 모순이 아님
+""")
+
+register('tags', 'v1', """
+    다음 개발 질문과 답변에서 핵심 기술 태그를 추출해주세요.
+
+    질문: {query}
+    답변: {answer}
+
+    규칙:
+    - 정확히 3~5개의 태그만 추출
+    - 모두 소문자, 영어만 사용
+    - 쉼표로 구분
+    - 기술명, 도구명, 핵심 개념만 포함
+    - 불필요한 단어 제외 (예: "how", "what", "difference")
+    - 공백은 하이픈(-)으로 대체
+
+    출력 형식 예시: docker, network, bridge-mode, container
+
+    태그:
+""")
+
+register('markdown', 'v1', """
+    다음 내용을 노션 스타일 마크다운으로 정리해주세요:
+
+    질문: {query}
+
+    답변:
+    {answer}
+
+    참고 자료:
+    {refs}
+
+    요구사항:
+    - 제목은 ## 질문 형식으로
+    - 핵심 내용은 명확하게 구조화
+    - 차이점이나 비교는 표(table) 사용
+    - 코드 예시는 적절한 언어로 ```언어 코드블록``` 사용
+    - 참고 자료는 맨 아래 "## 참고 자료" 섹션에
+    - 노션에 바로 복사/붙여넣기 가능하게
+
+    출력:
+""")
+
+# 태그 + (마크다운) + (모순 판정) 통합 후처리 — 요청한 조각의 block·task·fields만 들어간다
+register('postprocess', 'v1', """
+    개발 질문에 대한 AI 답변을 후처리하세요.
+
+    질문: {query}
+
+    답변:
+    {answer}{blocks}
+
+    작업:
+    {tasks}
+
+    JSON으로만 응답하세요 (```없이):
+    {{
+    {fields}
+    }}
+""", parts={
+    'tags': {
+        'task': 'tags: 핵심 기술 태그 3~5개. 모두 소문자 영어, 공백은 하이픈(-). '
+                '기술명·도구명·핵심 개념만 (how, what, difference 같은 단어 제외)',
+        'fields': '  "tags": ["docker", "network", "bridge-mode"]',
+    },
+    'markdown': {
+        'block': '참고 자료:\n{refs}',
+        'task': 'markdown: 답변을 노션 스타일 마크다운으로 정리. 제목은 ## 질문 형식, 핵심 내용은 구조화, '
+                '비교는 표, 코드는 ```언어 코드블록```, 참고 자료는 맨 아래 "## 참고 자료" 섹션',
+        'fields': '  "markdown": "정리된 마크다운 전문"',
+    },
+    'consistency': {
+        'block': '참고 컨텍스트 (답변 생성에 사용):\n{context}',
+        'task': 'consistent/note: 답변의 주장(수치, 동작 설명, API 사용법)이 참고 컨텍스트와 명백히 어긋나면 '
+                'false. 컨텍스트에 없는 내용을 답변이 추가로 다루는 것은 모순이 아님',
+        'fields': '  "consistent": true/false,\n'
+                  '  "note": "모순이 있으면 어떤 주장이 어긋나는지 한 문장 (없으면 빈 문자열)"',
+    },
+})
+
+# ── 연습문제 (ExerciseService) ───────────────────────────────────────
+
+register('exercise_generation_compare', 'v1', """
+    아래 학습 내용으로 "생성→비교" 연습문제를 만들어주세요.
+    학습자가 먼저 답변을 쓰고, 모범 답안과 핵심 포인트를 보며 스스로 비교/채점합니다.
+
+    {parent_context}질문: {query}
+    답변: {answer}
+
+    JSON으로만 응답 (```없이):
+    {{
+      "question": "핵심 개념을 설명하게 유도하는 질문",
+      "model_answer": "핵심 포인트를 포함한 모범 답안 (3~5문장)",
+      "key_points": ["채점 기준 1", "기준 2", "기준 3", "기준 4"]
+    }}
+
+    ⚠️ key_points 규칙:
+    - model_answer에서 빠지면 안 되는 핵심 명사구를 짧게 (각 30자 이내)
+    - 학습자가 본인 답에 포함됐는지 yes/no로 판단할 수 있는 단위
+    - 3~5개
+""")
+
+register('exercise_path_trace', 'v1', """
+    아래 학습 내용으로 "경로추적" 연습문제를 만들어주세요.
+    실행 흐름을 단계별로 추적하며 객관식으로 답하는 유형입니다. steps는 3~5개.
+
+    {parent_context}질문: {query}
+    답변: {answer}
+
+    JSON으로만 응답 (```없이):
+    {{"scenario": "시나리오 설명", "steps": [{{"question": "질문", "choices": ["A","B","C","D"], "correct_index": 0, "correct_answer": "A", "explanation": "설명"}}]}}
+
+    ⚠️ correct_index 규칙 (반드시 준수):
+    - choices 배열의 0-based 인덱스 (첫 요소 = 0)
+    - choices[correct_index]가 정답 값과 정확히 같아야 함
+    - 예: choices=["1","2","3","4"], 정답="2" → correct_index=1 (choices[1]="2")
+    - correct_index를 정한 뒤 choices[correct_index]로 검증하세요.
+
+    ⚠️ correct_answer 규칙:
+    - 정답의 실제 값(value). choices 배열 중 한 요소와 글자까지 정확히 같아야 함.
+    - 항상 choices[correct_index]와 동일한 문자열을 넣으세요. (코드 레벨 검증용 ground truth)
+""")
+
+register('exercise_coach', 'v1', """
+    학습자의 자가 학습을 1~2문장으로 짧게 코멘트 해주세요.
+    평가/채점이 아니라 격려·보완 한마디입니다. 한국어로.
+
+    질문: {question}
+    모범 답안: {model_answer}
+    학습자 답: {user_answer}
+    본인이 체크한 포인트: {covered}
+    빠뜨린 포인트: {missed}
+    본인 회고: {reflection}
+
+    ⚠️ 1~2문장, 부드럽고 구체적으로. JSON 아닌 평문으로만 응답.
+""")
+
+# ── 학습 일지 (JournalService) ───────────────────────────────────────
+
+register('journal_summary', 'v1', """
+    아래는 한 학습자가 {month}월 {day}일에 검색한 개발 질문 목록입니다.
+    어떤 주제를 공부했는지 1~2문장으로 친근하게 요약해주세요.
+    예시: "오늘은 Docker 네트워크와 PostgreSQL 격리 수준에 관해 공부했네요."
+    요약 문장만 출력하세요.
+
+    {query_lines}
+""")
@@ -0,0 +1,33 @@
+"""
+외부 API 무료 티어 레이트리밋 대응용 토큰 버킷.
+고정 sleep과 달리 요청 사이에 이미 흐른 시간(응답 대기 등)은 다시 기다리지 않는다.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개 적립).
+    acquire()는 토큰이 생길 때까지 블로킹한다. 스레드 안전.
+    """
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate는 0보다 커야 합니다")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                time.sleep((tokens - self._tokens) / self.rate)
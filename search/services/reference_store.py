@@ -0,0 +1,67 @@
+"""
+레퍼런스 본문 저장소 → 로컬 문서 코퍼스.
+
+Tavily 결과 본문(raw_content, 없으면 content)을 URL당 한 번 압축 저장(ReferenceContent)하고
+섹션 단위 청크(ReferenceChunk)로 나눠 둔다. 청크 임베딩은 작업 큐(embed_reference_chunks)가 채운다.
+
+    store_contents(results, references) → 새로 저장한 Reference pk 목록 (save_learning_log 트랜잭션 안)
+    embed_chunks(service, reference_pks) → 임베딩 못 채운 청크 수
+
+저장된 청크는 LearnlogService.search_local_docs가 LearningLog와 같은 하이브리드 검색(FTS + 벡터, RRF)으로
+찾고, 충분히 가까운 청크가 모이면 web_search 노드가 Tavily 대신 이 결과를 쓴다.
+"""
+from django.conf import settings
+
+from ..models import ReferenceChunk, ReferenceContent
+from .chunking import chunk_text
+
+
+def store_contents(results, references):
+    """본문이 아직 없는 레퍼런스만 본문 + 청크를 일괄 저장. 이미 저장된 URL은 건드리지 않는다"""
+    by_url = {ref.url: ref for ref in references}
+    stored = set(
+        ReferenceContent.objects.filter(reference__in=references).values_list('reference_id', flat=True)
+    )
+    contents, chunks = [], []
+    for result in results:
+        reference = by_url.get(result.get('url', ''))
+        if reference is None or reference.pk in stored:
+            continue
+        text = (result.get('raw_content') or result.get('content') or '')[:settings.REFERENCE_STORE_MAX_CHARS]
+        if not text.strip():
+            continue
+        stored.add(reference.pk)
+        contents.append(ReferenceContent.from_text(reference, text))
+        chunks.extend(
+            ReferenceChunk(reference=reference, position=i, text=piece)
+            for i, piece in enumerate(chunk_text(text))
+        )
+    # 같은 URL을 동시에 저장하는 요청이 있어도 한쪽만 남는다 (OneToOne / (reference, position) 유니크)
+    ReferenceContent.objects.bulk_create(contents, ignore_conflicts=True)
+    ReferenceChunk.objects.bulk_create(chunks, ignore_conflicts=True)
+    return [content.reference.pk for content in contents]
+
+
+def chunk_embedding_input(title, text):
+    """청크 임베딩 대상 텍스트 — 문서 제목을 앞에 붙여 짧은 청크도 주제를 잃지 않게"""
+    return f"{title}\n{text}"
+
+
+def embed_chunks(service, reference_pks):
+    """임베딩이 비어 있는 청크를 배치 임베딩 (service._embed_many). 실패한 청크 수 반환"""
+    chunks = list(
+        ReferenceChunk.objects.filter(reference_id__in=reference_pks, embedding__isnull=True)
+        .select_related('reference')
+        .only('pk', 'text', 'reference__title')
+        .order_by('pk')
+    )
+    if not chunks:
+        return 0
+    embeddings = service._embed_many([chunk_embedding_input(c.reference.title, c.text) for c in chunks])
+    updated = []
+    for chunk, embedding in zip(chunks, embeddings):
+        if embedding is not None:
+            chunk.embedding = embedding
+            updated.append(chunk)
+    ReferenceChunk.objects.bulk_update(updated, ['embedding'])
+    return len(chunks) - len(updated)
@@ -3,20 +3,46 @@ LangGraph 검색 라우팅 에이전트.
 
 기존 직선 파이프라인(검색 → 웹 → 생성)을 조건 분기 그래프로 전환:
 
-    START → retrieve_logs → router ─ need_web=True  → web_search → generate → END
-                                   └ need_web=False → generate (웹검색 생략)
+    START → semantic_cache ─ hit → END (저장된 답변 그대로)
+                           └ miss → retrieve_logs → router ─ need_web=True  → web_search → generate → END
+                                                          └ need_web=False → generate (웹검색 생략)
+
+web_search는 LOCAL_DOCS_ENABLED면 저장된 레퍼런스 청크(로컬 문서 코퍼스)를 먼저 찾고,
+충분히 가까운 청크가 있으면 Tavily 없이 그 결과로 생성한다 (services/reference_store.py).
+
+semantic_cache는 SEMANTIC_CACHE_ENABLED와 STORE_QUERY_EMBEDDING이 모두 켜졌을 때만 조회하고, 꼬리질문·맞춤 지시·regenerate 요청은
+건너뛴다 (같은 질문이어도 답이 달라야 하는 경우). 조회에 쓴 질의 임베딩은 검색 단계가 재사용.
 
 노드는 전부 LearnlogService의 기존 메서드를 감싼 것이고, 이 모듈은 연결만 담당한다.
 generate 노드는 get_stream_writer로 토큰을 흘려보내 SSE 스트리밍을 유지한다.
 
 답변 검증(모순 검사·잘림 플래그)은 동기 노드로 두면 재생성 대기가 30초라
 저장 후 비동기로 처리한다 — 그래프 밖, 별도 작업 (0611 결정).
+
+speculative_web=True면 retrieve_logs가 웹검색(검색어 변환 + Tavily)을 백그라운드로
+먼저 시작해 검색·라우터 판단과 겹쳐 돌린다. 라우터가 need_web=False면 결과를 버리고,
+web_search 노드는 이미 진행 중인 결과를 기다리기만 한다 — 라우터 hop만큼 첫 토큰이 빨라진다.
+(대가: 웹 생략 경로에서도 Groq·Tavily 호출이 발생)
+
+use_async=True면 같은 그래프를 async 노드로 컴파일한다 (ASGI 스트리밍 뷰용, agent.astream).
+노드는 LearnlogService의 a* 메서드를 await하고, 투기적 웹검색은 스레드 풀 대신 asyncio 태스크로 돌린다.
+
+요청 처리 경로는 get_search_agent()로 프로세스 공용 컴파일 그래프를 받아 쓴다.
+그래프·서비스(SDK 클라이언트)는 한 번만 만들고, 요청별 값은 전부 SearchState로만 흐른다.
 """
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, TypedDict
 
+from django.conf import settings
+from django.db import connection
 from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 
+from .embedding_cache import EmbeddingContext
+from .learnlog_service import LearnlogService
+
 
 class SearchState(TypedDict, total=False):
     query: str
@@ -29,45 +55,109 @@ class SearchState(TypedDict, total=False):
     search_results: dict        # Tavily 결과
     answer: str
     truncated: bool             # max_tokens 잘림 (finish_reason == 'length')
+    web_future: object          # 투기적 웹검색 Future / asyncio.Task (speculative_web 모드)
+    embeddings: object          # EmbeddingContext — 요청 안에서 계산한 임베딩 (저장 단계가 재사용)
+    regenerate: bool            # 의미 캐시를 건너뛰고 새로 생성
+    cached_log: object          # 의미 캐시 hit (LearningLog) — 있으면 나머지 노드 생략
+
+
+# 투기적 웹검색 전용 풀 — 요청마다 스레드를 만들지 않도록 프로세스에서 공유
+_speculation_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='web-speculation')
+
+
+def _speculative_search(service, query, parent):
+    """풀 스레드에서 실행 — 꼬리질문 루트 조회로 연 스레드별 DB 커넥션을 마지막에 정리한다"""
+    try:
+        return service.search_official_docs(query, parent=parent)
+    finally:
+        connection.close()
+
+
+def _generate_kwargs(state):
+    retrieved = state['retrieved_logs'] if state.get('use_logs', True) else None
+    return {
+        'parent': state.get('parent'),
+        'retrieved_logs': retrieved,
+        # 웹 생략 경로는 Tavily 블록이 빠진 토큰 예산을 로그 컨텍스트에 재배분 (0611 벤치마크)
+        'retrieved_limit': 500 if state.get('need_web', True) else 1500,
+    }
+
 
+def _skip_semantic_cache(state):
+    # 조회는 LearningLog.query_embedding 기준 — 저장하지 않으면 적중할 수 없으니 임베딩·쿼리 비용만 든다
+    if not (settings.SEMANTIC_CACHE_ENABLED and settings.STORE_QUERY_EMBEDDING):
+        return True
+    return bool(state.get('regenerate') or state.get('parent') or state.get('custom_instructions'))
 
-def build_search_agent(service):
-    """LearnlogService 인스턴스를 노드로 감싼 그래프 반환"""
+
+def _cache_update(log, embeddings):
+    update = {'embeddings': embeddings}
+    if log is not None:
+        # cached: 뷰가 스트리밍 후처리(태그 선행 호출)에 넘기지 않도록 — hit이면 후처리·저장 없이 끝난다
+        get_stream_writer()({'token': log.ai_response, 'cached': True})
+        update.update(cached_log=log, answer=log.ai_response)
+    return update
+
+
+def _route_update(decision, pending):
+    if pending is not None and not decision['need_web']:
+        pending.cancel()  # 아직 시작 전이면 취소, 진행 중이면 결과만 버린다
+    return {
+        'use_logs': decision['use_logs'],
+        'need_web': decision['need_web'],
+        'route_reason': decision['reason'],
+    }
+
+
+def _sync_nodes(service, speculative_web):
+    def semantic_cache(state):
+        if _skip_semantic_cache(state):
+            return {}
+        embeddings = state.get('embeddings') or EmbeddingContext()
+        return _cache_update(service.find_cached_answer(state['query'], embeddings=embeddings), embeddings)
 
     def retrieve_logs(state):
         parent = state.get('parent')
+        update = {}
+        if speculative_web:
+            update['web_future'] = _speculation_pool.submit(
+                _speculative_search, service, state['query'], parent,
+            )
         exclude = [parent.pk] if parent else None
-        logs = service.retrieve_similar_logs(state['query'], exclude_pks=exclude)
-        return {'retrieved_logs': logs}
+        update['embeddings'] = embeddings = state.get('embeddings') or EmbeddingContext()
+        update['retrieved_logs'] = service.retrieve_similar_logs(
+            state['query'], exclude_pks=exclude, embeddings=embeddings,
+        )
+        return update
 
     def router(state):
         decision = service.decide_route(state['query'], state['retrieved_logs'])
-        return {
-            'use_logs': decision['use_logs'],
-            'need_web': decision['need_web'],
-            'route_reason': decision['reason'],
-        }
+        return _route_update(decision, state.get('web_future'))
 
     def web_search(state):
+        future = state.get('web_future')
+        local = None
+        if settings.LOCAL_DOCS_ENABLED:
+            local = service.search_local_docs(state['query'], embeddings=state.get('embeddings'))
+        if local is not None:
+            if future is not None:
+                future.cancel()
+            return {'search_results': local}
+        if future is not None:
+            return {'search_results': future.result()}
         results = service.search_official_docs(state['query'], parent=state.get('parent'))
         return {'search_results': results}
 
     def generate(state):
         writer = get_stream_writer()
-
-        retrieved = state['retrieved_logs'] if state.get('use_logs', True) else None
-        # 웹 생략 경로는 Tavily 블록이 빠진 토큰 예산을 로그 컨텍스트에 재배분 (0611 벤치마크)
-        retrieved_limit = 500 if state.get('need_web', True) else 1500
         meta = {}
         chunks = []
         for chunk in service.generate_answer_stream(
             state['query'],
             state.get('search_results', {'results': []}),
             state.get('custom_instructions'),
-            parent=state.get('parent'),
-            retrieved_logs=retrieved,
-            retrieved_limit=retrieved_limit,
             meta=meta,
+            **_generate_kwargs(state),
         ):
             chunks.append(chunk)
             writer({'token': chunk})
@@ -76,19 +166,116 @@ def build_search_agent(service):
             'truncated': meta.get('finish_reason') == 'length',
         }
 
+    return semantic_cache, retrieve_logs, router, web_search, generate
+
+
+def _async_nodes(service, speculative_web):
+    async def semantic_cache(state):
+        if _skip_semantic_cache(state):
+            return {}
+        embeddings = state.get('embeddings') or EmbeddingContext()
+        log = await service.afind_cached_answer(state['query'], embeddings=embeddings)
+        return _cache_update(log, embeddings)
+
+    async def retrieve_logs(state):
+        parent = state.get('parent')
+        update = {}
+        if speculative_web:
+            # 같은 이벤트 루프에서 도는 태스크 — 이후 노드도 같은 astream 루프라 그대로 await 가능
+            update['web_future'] = asyncio.create_task(
+                service.asearch_official_docs(state['query'], parent=parent),
+            )
+        exclude = [parent.pk] if parent else None
+        update['embeddings'] = embeddings = state.get('embeddings') or EmbeddingContext()
+        update['retrieved_logs'] = await service.aretrieve_similar_logs(
+            state['query'], exclude_pks=exclude, embeddings=embeddings,
+        )
+        return update
+
+    async def router(state):
+        decision = await service.adecide_route(state['query'], state['retrieved_logs'])
+        return _route_update(decision, state.get('web_future'))
+
+    async def web_search(state):
+        task = state.get('web_future')
+        local = None
+        if settings.LOCAL_DOCS_ENABLED:
+            local = await service.asearch_local_docs(state['query'], embeddings=state.get('embeddings'))
+        if local is not None:
+            if task is not None:
+                task.cancel()
+            return {'search_results': local}
+        if task is not None:
+            return {'search_results': await task}
+        results = await service.asearch_official_docs(state['query'], parent=state.get('parent'))
+        return {'search_results': results}
+
+    async def generate(state):
+        writer = get_stream_writer()
+        meta = {}
+        chunks = []
+        async for chunk in service.agenerate_answer_stream(
+            state['query'],
+            state.get('search_results', {'results': []}),
+            state.get('custom_instructions'),
+            meta=meta,
+            **_generate_kwargs(state),
+        ):
+            chunks.append(chunk)
+            writer({'token': chunk})
+        return {
+            'answer': ''.join(chunks).strip(),
+            'truncated': meta.get('finish_reason') == 'length',
+        }
+
+    return semantic_cache, retrieve_logs, router, web_search, generate
+
+
+def build_search_agent(service, speculative_web=False, use_async=False):
+    """LearnlogService 인스턴스를 노드로 감싼 그래프 반환 (use_async=True면 astream 전용 async 노드)"""
+    make_nodes = _async_nodes if use_async else _sync_nodes
+    semantic_cache, retrieve_logs, router, web_search, generate = make_nodes(service, speculative_web)
+
+    def after_cache(state):
+        return END if state.get('cached_log') is not None else 'retrieve_logs'
+
     def after_router(state):
         return 'web_search' if state.get('need_web', True) else 'generate'
 
     graph = StateGraph(SearchState)
+    graph.add_node('semantic_cache', semantic_cache)
     graph.add_node('retrieve_logs', retrieve_logs)
     graph.add_node('router', router)
     graph.add_node('web_search', web_search)
     graph.add_node('generate', generate)
 
-    graph.add_edge(START, 'retrieve_logs')
+    graph.add_edge(START, 'semantic_cache')
+    graph.add_conditional_edges('semantic_cache', after_cache, {END: END, 'retrieve_logs': 'retrieve_logs'})
     graph.add_edge('retrieve_logs', 'router')
     graph.add_conditional_edges('router', after_router, {'web_search': 'web_search', 'generate': 'generate'})
     graph.add_edge('web_search', 'generate')
     graph.add_edge('generate', END)
 
     return graph.compile()
+
+
+_agents = {}  # (speculative_web, use_async) → 컴파일된 그래프
+_agents_lock = threading.Lock()
+
+
+def get_search_agent(speculative_web=False, use_async=False):
+    """
+    프로세스 공용 컴파일 그래프 (모드별 1개, 첫 호출 시 생성).
+    컴파일된 그래프는 불변이고 invoke/stream마다 상태를 새로 만들므로 스레드 간 공유해도 안전.
+    """
+    key = (speculative_web, use_async)
+    agent = _agents.get(key)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(key)
+            if agent is None:
+                agent = build_search_agent(
+                    LearnlogService.shared(), speculative_web=speculative_web, use_async=use_async,
+                )
+                _agents[key] = agent
+    return agent
@@ -0,0 +1,140 @@
+"""
+Tavily 검색 결과 캐시 (웹검색 경로에서 가장 느린 외부 호출 절감).
+
+꼬리질문 체인·비슷한 주제의 질문은 _to_search_query 변환 결과가 거의 같은 영어 키워드로 모인다.
+(정규화 검색어 + include_domains + 검색 옵션)의 해시를 키로 Tavily 응답을 저장해 두고 바로 답변 생성에 넘긴다.
+
+    1단계: 프로세스 내 LRU / 2단계: CachedSearch 테이블 (최대 행 수로 축출) — tiered_cache.TieredCache
+
+신선도는 결과 도메인 유형별 TTL(SEARCH_CACHE_TTL_HOURS, 유형은 domains.classify_source)로 정하고
+결과 중 가장 짧은 것을 쓴다 (공식 문서만이면 길게, 블로그가 섞이면 짧게).
+만료 후 SEARCH_CACHE_STALE_HOURS 안이면 오래된 결과를 그대로 쓰고 갱신은 작업 큐(refresh_search)에
+맡긴다 (stale-while-revalidate). 그보다 오래되면 미스.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..domains import classify_source
+from .tiered_cache import TieredCache
+
+# 검색어 토큰 앞뒤의 구두점만 제거 (c++, c#, node.js, .net 같은 기술명 내부 기호는 유지)
+_EDGE_PUNCT = re.compile(r"^[\"'`“”‘’(\[{<,;:!?]+|[\"'`“”‘’)\]}>,;:!?.]+$")
+
+
+def normalize_query(query):
+    """NFC + 소문자 + 앞뒤 구두점 제거 + 토큰 중복 제거·정렬 — 어순만 다른 검색어를 같은 키로"""
+    tokens = (_EDGE_PUNCT.sub('', token) for token in unicodedata.normalize('NFC', query).lower().split())
+    return " ".join(sorted({token for token in tokens if token}))
+
+
+def search_key(params):
+    """정규화 검색어 + include_domains(순서 무관) + 나머지 검색 옵션의 sha256"""
+    options = {k: v for k, v in params.items() if k not in ('query', 'include_domains')}
+    material = {
+        'query': normalize_query(params['query']),
+        'include_domains': sorted(params.get('include_domains') or []),
+        'options': options,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class SearchCache(TieredCache):
+    model_name = 'CachedSearch'
+    label = '검색 캐시'
+    COUNTERS = ('hits_memory', 'hits_db', 'hits_stale', 'misses')
+    REFRESH_RETRY = timedelta(minutes=10)  # 갱신 요청 후 이 시간 안에는 같은 키로 작업을 다시 넣지 않음
+
+    def __init__(self, max_size=None, use_db=True, ttl_hours=None, stale_hours=None, db_max_rows=None):
+        super().__init__(
+            max_size=max_size if max_size is not None else settings.SEARCH_CACHE_SIZE,
+            use_db=use_db,
+            db_max_rows=db_max_rows if db_max_rows is not None else settings.SEARCH_CACHE_DB_MAX_ROWS,
+        )
+        self.ttl_hours = ttl_hours if ttl_hours is not None else settings.SEARCH_CACHE_TTL_HOURS
+        self.stale = timedelta(hours=stale_hours if stale_hours is not None else settings.SEARCH_CACHE_STALE_HOURS)
+
+    def ttl_for(self, response):
+        """결과 URL들의 출처 유형별 TTL 중 최솟값"""
+        hours = [
+            self.ttl_hours.get(classify_source(r.get('url', '')), self.ttl_hours['other'])
+            for r in response.get('results', [])
+        ]
+        return timedelta(hours=min(hours, default=self.ttl_hours['other']))
+
+    def get(self, params):
+        """
+        신선한 결과 → 그대로, 만료 후 stale 구간 → 그대로 + 백그라운드 갱신 요청, 그 외 → None.
+        메모리 사본이 만료됐으면 DB를 먼저 본다 (다른 프로세스·워커가 이미 갱신했을 수 있음).
+        캐시 값은 (응답, 만료 시각).
+        """
+        key = search_key(params)
+        now = timezone.now()
+        entry = self._peek(key)
+        if entry is not None and now < entry[1]:
+            self._count('hits_memory')
+            return entry[0]
+
+        if self.use_db:
+            db_entry = self._db_get(key, now)
+            if db_entry is not None:
+                entry = db_entry
+                self._remember(key, entry)
+
+        if entry is None or now >= entry[1] + self.stale:
+            self._count('misses')
+            return None
+        if now < entry[1]:
+            self._count('hits_db')
+            return entry[0]
+        self._count('hits_stale')
+        if self.use_db:
+            self._request_refresh(key, params, now)
+        return entry[0]
+
+    def set(self, params, response):
+        """빈 결과는 저장하지 않는다 (Tavily 일시 장애·도메인 제한 과다를 오래 붙잡지 않도록)"""
+        if not response or not response.get('results'):
+            return
+        expires_at = timezone.now() + self.ttl_for(response)
+        self._set(search_key(params), (response, expires_at), {
+            'query': normalize_query(params['query'])[:300],
+            'response': response,
+            'expires_at': expires_at,
+            'refresh_requested_at': None,
+        })
+
+    # ── DB 단계: 유효 기간은 행별 만료 시각 + stale 구간 ──
+
+    def _from_row(self, row):
+        return row.response, row.expires_at
+
+    def _live_filter(self, now):
+        return {'expires_at__gt': now - self.stale}
+
+    def _expired_filter(self, now):
+        return {'expires_at__lt': now - self.stale}
+
+    def _request_refresh(self, key, params, now):
+        """
+        stale 적중 시 refresh_search 작업 등록. refresh_requested_at 조건부 UPDATE로
+        동시에 같은 키를 본 요청·프로세스 중 하나만 작업을 넣는다.
+        """
+        from .jobs import enqueue  # jobs 핸들러가 이 모듈을 import (순환 방지)
+        try:
+            claimed = self.model.objects.filter(key=key).filter(
+                Q(refresh_requested_at__isnull=True) | Q(refresh_requested_at__lt=now - self.REFRESH_RETRY)
+            ).update(refresh_requested_at=now)
+            if claimed:
+                enqueue('refresh_search', {'params': params})
+        except Exception as e:
+            print(f"검색 캐시 갱신 요청 오류: {e}")
+
+
+search_cache = SearchCache()
@@ -0,0 +1,70 @@
+"""
+의미 기반 답변 캐시 (검색 에이전트 맨 앞 단계).
+
+새 질문의 임베딩과 저장된 질문 임베딩(LearningLog.query_embedding)의 코사인 유사도가
+SEMANTIC_CACHE_THRESHOLD 이상이면 라우터·Tavily·Mistral·태그·마크다운을 모두 건너뛰고
+저장된 답변을 그대로 돌려준다. 반복 복습 질문이 수십 초 파이프라인 대신 즉시 응답된다.
+
+- 잘린 답변(is_truncated)·불일치 의심(verification='suspect') 로그는 재사용하지 않는다
+- 꼬리질문·맞춤 지시·"새로 생성" 요청은 에이전트 노드에서 캐시를 건너뛴다
+- query_embedding이 있는 로그만 후보 — STORE_QUERY_EMBEDDING이 꺼져 있으면 노드가 조회하지 않는다. 켜고 기존 로그는
+  `manage.py embed_logs --query`로 채운다
+"""
+import threading
+
+from django.conf import settings
+from pgvector.django import CosineDistance
+
+from ..models import LearningLog
+
+
+class SemanticCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def lookup(self, query_embedding):
+        """임계값 이내의 가장 가까운 로그 (없으면 None). 조회 실패는 miss로 처리"""
+        from .learnlog_service import LearnlogService  # learnlog_service가 이 모듈을 import (순환 방지)
+
+        candidate = None
+        if query_embedding is not None:
+            try:
+                with LearnlogService._ann_session():
+                    candidate = (
+                        LearningLog.objects
+                        .exclude(query_embedding=None)
+                        .filter(is_truncated=False)
+                        .exclude(verification='suspect')
+                        .annotate(distance=CosineDistance('query_embedding', query_embedding))
+                        .order_by('distance')
+                        .first()
+                    )
+            except Exception as e:
+                print(f"의미 캐시 조회 오류: {e}")
+
+        hit = None
+        if candidate is not None and candidate.distance <= 1 - settings.SEMANTIC_CACHE_THRESHOLD:
+            hit = candidate
+        with self._lock:
+            if hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return hit
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,73 @@
+"""
+스트리밍 후처리 — generate 노드가 토큰을 흘리는 동안 마크다운 변환·태그 추출을 미리 진행한다.
+
+    feed(token)          → 완성된 줄은 로컬 포맷터(MarkdownFormatter)로 바로 변환
+                           답변이 TAGS_INPUT_CHARS자를 넘는 순간 태그 추출 호출 시작
+    finish / afinish(…)  → 남은 줄 + 참고 자료만 붙이고 태그 결과를 기다림
+
+태그 프롬프트는 답변 앞 TAGS_INPUT_CHARS자만 보므로, 그 시점에 시작한 호출은 전체 답변으로
+부른 것과 입력(=캐시 키)이 같다. 답변이 그보다 짧으면 finish에서 평소대로 호출한다.
+MARKDOWN_MODE='llm'·POSTPROCESS_COMBINED는 전체 답변이 있어야 하므로 feed는 아무것도 하지 않고
+finish에서 기존 postprocess로 넘긴다.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .markdown_format import MarkdownFormatter
+
+# 태그 선행 호출용 — 요청 스레드는 토큰 중계를 계속해야 하므로 별도 풀
+_tags_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='stream-tags')
+
+
+def _extract_tags(service, query, head):
+    """풀 스레드에서 실행 — llm_cache DB 단계 조회·저장으로 연 스레드별 DB 커넥션을 마지막에 정리한다"""
+    try:
+        return service.extract_tags(query, head)
+    finally:
+        connection.close()
+
+
+class StreamingPostprocessor:
+    def __init__(self, service, query, use_async=False):
+        self.service = service
+        self.query = query
+        self.use_async = use_async
+        self.incremental = settings.MARKDOWN_MODE == 'local' and not settings.POSTPROCESS_COMBINED
+        self.formatter = MarkdownFormatter(query)
+        self._head = ''
+        self._tags = None  # Future(sync) / Task(async)
+
+    def feed(self, token):
+        if not self.incremental:
+            return
+        self.formatter.feed(token)
+        if self._tags is None:
+            # generate 노드가 답변을 strip()하므로 앞 공백은 세지 않는다
+            self._head = (self._head + token).lstrip()
+            if len(self._head) >= self.service.TAGS_INPUT_CHARS:
+                self._tags = self._start_tags(self._head)
+
+    def _start_tags(self, head):
+        if self.use_async:
+            return asyncio.ensure_future(self.service.aextract_tags(self.query, head))
+        return _tags_pool.submit(_extract_tags, self.service, self.query, head)
+
+    def finish(self, answer, search_results, verify_context=None):
+        """→ (태그, 마크다운, 판정) — LearnlogService.postprocess와 같은 형태"""
+        if not self.incremental:
+            return self.service.postprocess(self.query, answer, search_results, verify_context)
+        markdown = self.formatter.finish(search_results)
+        if self._tags is not None:
+            return self._tags.result(), markdown, None
+        return self.service.extract_tags(self.query, answer), markdown, None
+
+    async def afinish(self, answer, search_results, verify_context=None):
+        if not self.incremental:
+            return await self.service.apostprocess(self.query, answer, search_results, verify_context)
+        markdown = self.formatter.finish(search_results)
+        if self._tags is not None:
+            return await self._tags, markdown, None
+        return await self.service.aextract_tags(self.query, answer), markdown, None
@@ -0,0 +1,144 @@
+"""
+2단계 캐시 공통부 (임베딩·LLM 응답·검색 결과 캐시가 상속).
+
+    키 → 1단계: 프로세스 내 LRU (OrderedDict, 스레드 안전)
+       → 2단계: DB 테이블 (선택) — 재시작·워커 간 공유, 유효 기간 + 최대 행 수로 축출
+
+하위 클래스가 정하는 것:
+    model_name              DB 단계 모델 (key·created_at·last_used_at 컬럼 필요)
+    label                   오류 로그에 쓰는 이름
+    _from_row(row)          DB 행 → 캐시 값
+    _live_filter(now)       조회할 수 있는 행 조건 (기본: created_at이 ttl 안)
+    _expired_filter(now)    prune이 지울 행 조건 (기본: created_at이 ttl 밖)
+    COUNTERS                stats()에 나오는 카운터 — 'hits_'로 시작하는 것은 적중률에 합산
+
+DB 단계 오류는 삼키고(print) 미스로 처리한다 — 캐시 장애가 원래 호출을 막지 않도록.
+"""
+import threading
+from collections import OrderedDict
+
+from django.apps import apps
+from django.utils import timezone
+
+
+class TieredCache:
+    PRUNE_EVERY = 50  # DB 축출은 저장 N회마다 한 번 (매 저장마다 COUNT 쿼리를 내지 않도록)
+    COUNTERS = ('hits_memory', 'hits_db', 'misses')
+    model_name = None
+    label = '캐시'
+
+    def __init__(self, max_size, use_db, db_max_rows, ttl=None):
+        self.max_size = max_size
+        self.use_db = use_db
+        self.db_max_rows = db_max_rows
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._reset_counters()
+
+    @property
+    def model(self):
+        return apps.get_model('search', self.model_name)
+
+    def _get(self, key):
+        """메모리 → DB 순서로 조회 (DB 적중은 메모리에 올린다). 없으면 None"""
+        value = self._peek(key)
+        if value is not None:
+            self._count('hits_memory')
+            return value
+        value = self._db_get(key) if self.use_db else None
+        if value is None:
+            self._count('misses')
+            return None
+        self._count('hits_db')
+        self._remember(key, value)
+        return value
+
+    def _set(self, key, value, defaults):
+        """defaults: DB 행에 저장할 컬럼 (created_at은 여기서 채운다)"""
+        self._remember(key, value)
+        if self.use_db:
+            self._db_set(key, defaults)
+
+    def stats(self):
+        with self._lock:
+            counts = {name: getattr(self, name) for name in self.COUNTERS}
+            memory_size = len(self._memory)
+        hits = sum(value for name, value in counts.items() if name.startswith('hits_'))
+        total = hits + counts['misses']
+        return {**counts, 'hit_rate': hits / total if total else 0.0, 'memory_size': memory_size}
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._reset_counters()
+
+    def _reset_counters(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _peek(self, key):
+        with self._lock:
+            if key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+    def _remember(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    # ── DB 단계 ──
+
+    def _from_row(self, row):
+        raise NotImplementedError
+
+    def _live_filter(self, now):
+        return {'created_at__gte': now - self.ttl}
+
+    def _expired_filter(self, now):
+        return {'created_at__lt': now - self.ttl}
+
+    def _db_get(self, key, now=None):
+        now = now or timezone.now()
+        try:
+            row = self.model.objects.filter(key=key, **self._live_filter(now)).first()
+            if row is None:
+                return None
+            self.model.objects.filter(pk=row.pk).update(last_used_at=now)
+            return self._from_row(row)
+        except Exception as e:
+            print(f"{self.label} 조회 오류: {e}")
+            return None
+
+    def _db_set(self, key, defaults):
+        try:
+            self.model.objects.update_or_create(key=key, defaults={**defaults, 'created_at': timezone.now()})
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % self.PRUNE_EVERY == 0
+            if prune:
+                self.prune()
+        except Exception as e:
+            print(f"{self.label} 저장 오류: {e}")
+
+    def prune(self):
+        """유효 기간 지난 행 삭제 후, 최대 행 수를 넘는 만큼 최근 사용이 오래된 순으로 삭제"""
+        model = self.model
+        model.objects.filter(**self._expired_filter(timezone.now())).delete()
+        stale_pks = list(
+            model.objects.order_by('-last_used_at')
+            .values_list('pk', flat=True)[self.db_max_rows:]
+        )
+        if stale_pks:
+            model.objects.filter(pk__in=stale_pks).delete()
@@ -6,4 +6,29 @@ from search.tests.factories import TagFactory, LearningLogFactory
 @pytest.fixture
 def api_client():
     """DRF APIClient - JSON 요청(PATCH 등)에 사용"""
-    return APIClient()
\ No newline at end of file
+    return APIClient()
+
+@pytest.fixture(autouse=True)
+def _clear_embedding_cache():
+    """프로세스 공용 임베딩·LLM 응답·검색 결과 캐시가 테스트 간에 새지 않도록 매 테스트 전에 비운다"""
+    from search.services.embedding_cache import embedding_cache
+    from search.services.llm_cache import llm_cache
+    from search.services.search_cache import search_cache
+    embedding_cache.clear()
+    llm_cache.clear()
+    search_cache.clear()
+
+
+@pytest.fixture
+def bare_service():
+    """SDK 클라이언트 없이 만든 LearnlogService — 테스트가 필요한 클라이언트·캐시만 꽂는다"""
+    from search.services import LearnlogService
+    return LearnlogService.__new__(LearnlogService)
+
+
+@pytest.fixture
+def memory_cache():
+    """메모리 단계만 쓰는 2단계 캐시 팩토리 — memory_cache(EmbeddingCache, max_size=2)"""
+    def make(cache_class, **kwargs):
+        return cache_class(**{'max_size': 10, 'use_db': False, **kwargs})
+    return make
@@ -0,0 +1,39 @@
+"""
+검색용 청크 분할 테스트
+- 마크다운 제목 단위 섹션, 청크마다 섹션 제목 유지
+- 코드 펜스 안의 빈 줄·'#' 주석은 경계가 아님
+- 긴 문단은 문장 경계에서 max_chars 이하로
+"""
+from search.services.chunking import chunk_text, sections
+
+
+def test_제목_단위_섹션():
+    text = "도입 문단.\n\n## 설치\n\npip install x\n\n## 사용\n### 세부\n본문입니다."
+    assert [heading for heading, _ in sections(text)] == ['', '## 설치', '## 사용', '### 세부']
+    assert chunk_text(text) == ['도입 문단.', '## 설치\npip install x', '### 세부\n본문입니다.']
+
+
+def test_코드_펜스는_나누지_않음():
+    text = "## 예시\n```python\n# 주석\n\nx = 1\n```"
+    assert chunk_text(text) == ["## 예시\n```python\n# 주석\n\nx = 1\n```"]
+
+
+def test_긴_문단은_문장_경계에서():
+    text = "## 긴 섹션\n" + "이것은 한 문장입니다. " * 100
+    chunks = chunk_text(text, max_chars=300)
+    assert len(chunks) > 1
+    assert all(chunk.startswith('## 긴 섹션\n') for chunk in chunks)
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert all(chunk.endswith('니다.') for chunk in chunks)
+
+
+def test_짧은_꼬리는_앞_청크에():
+    text = "## 섹션\n" + "가" * 250 + "\n\n" + "나" * 250 + "\n\n끝."
+    chunks = chunk_text(text, max_chars=300)
+    assert len(chunks) == 2
+    assert chunks[-1].endswith("나" * 250 + "\n\n끝.")
+
+
+def test_빈_텍스트():
+    assert chunk_text('') == []
+    assert chunk_text(None) == []
@@ -0,0 +1,103 @@
+"""
+SDK 클라이언트 레지스트리 테스트
+- provider별 클라이언트를 한 번만 만들고 서비스 간 공유
+- trace 이벤트 → 커넥션 재사용 지표 (requests 세션은 CountingAdapter 훅)
+- 지표 API는 관리자만
+외부 네트워크 호출은 하지 않는다 (Tavily 세션 지표는 로컬 HTTP 서버로 확인).
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.urls import reverse
+
+from search.services import ExerciseService, JournalService, LearnlogService
+from search.services.clients import ClientRegistry, ConnectionStats, clients
+
+
+@pytest.fixture
+def api_keys(settings):
+    settings.MISTRAL_API_KEY = 'test-mistral'
+    settings.GROQ_API_KEY = 'test-groq'
+    settings.TAVILY_API_KEY = 'tvly-test'
+    clients.reset()
+    yield
+    clients.reset()
+
+
+class TestClientRegistry:
+    def test_서비스들이_같은_클라이언트_공유(self, api_keys):
+        learnlog = LearnlogService()
+        assert learnlog.mistral_client is ExerciseService().mistral_client
+        assert learnlog.groq_client is JournalService().groq_client
+        assert learnlog.tavily_client is LearnlogService().tavily_client
+
+    def test_풀_설정_적용(self, api_keys, settings):
+        settings.HTTP_CLIENT_MAX_KEEPALIVE = 3
+        registry = ClientRegistry()
+        pool = registry.groq()._client._transport._pool
+        assert pool._max_keepalive_connections == 3
+
+
+class TestConnectionStats:
+    def test_재사용률(self):
+        stats = ConnectionStats()
+        for _ in range(4):
+            stats.record_request()
+        stats.trace('connection.connect_tcp.complete', {})
+        stats.trace('connection.start_tls.complete', {})
+        stats.trace('http11.send_request_headers.started', {})
+        snapshot = stats.snapshot()
+        assert snapshot['requests'] == 4
+        assert snapshot['connections'] == 1
+        assert snapshot['tls_handshakes'] == 1
+        assert snapshot['reuse_rate'] == 0.75
+
+    def test_요청_없으면_0(self):
+        assert ConnectionStats().snapshot()['reuse_rate'] == 0.0
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)  # keep-alive 커넥션이 종료를 막지 않도록
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_tavily_세션도_커넥션_재사용_집계(api_keys, local_server):
+    session = clients.tavily().session
+    for _ in range(3):
+        session.get(local_server).raise_for_status()
+    assert clients.metrics()['tavily'] == {
+        'requests': 3, 'connections': 1, 'tls_handshakes': 0, 'reuse_rate': pytest.approx(2 / 3),
+    }
+
+
+def test_metrics_API_익명은_거부(client, api_keys):
+    assert client.get(reverse('search:metrics_api')).status_code == 403
+
+
+@pytest.mark.django_db
+def test_metrics_API(admin_client, api_keys):
+    clients.groq()
+    resp = admin_client.get(reverse('search:metrics_api'))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data['http_clients']['groq']['requests'] == 0
+    assert 'hit_rate' in data['embedding_cache']
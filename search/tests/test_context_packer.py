@@ -0,0 +1,82 @@
+"""
+토큰 예산 컨텍스트 패커 테스트
+- 예산 안이면 전문, 넘치면 관련도 비례 배분 + 남는 몫 재분배
+- 출처 간 중복 문장 제거 (관련도 높은 쪽이 유지)
+- 답변 프롬프트: CONTEXT_PACKING이면 예산 안으로, 블록 형식은 고정 절삭 경로와 같음
+토크나이저 파일을 받지 않도록 글자 수 추정 경로로 고정한다.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from search.services import LearnlogService, context_packer
+from search.services.context_packer import count_tokens, pack
+
+
+@pytest.fixture(autouse=True)
+def _estimate_tokens(monkeypatch):
+    monkeypatch.setattr(context_packer, '_get_encoding', lambda: None)
+
+
+def test_추정_토큰_수():
+    assert count_tokens('도커') == 2
+    assert count_tokens('docker') == 2
+
+
+def test_예산_안이면_전문():
+    packed = pack([('a', '짧은 문장입니다.', 1.0), ('b', '다른 문장입니다.', 0.5)], budget=100)
+    assert packed == {'a': '짧은 문장입니다.', 'b': '다른 문장입니다.'}
+
+
+def test_관련도_비례_배분과_재분배():
+    long_text = ' '.join(f'{i}번째 설명 문장입니다.' for i in range(40))
+    packed = pack([('short', '짧은 문장입니다.', 1.0), ('hi', long_text, 0.6), ('lo', long_text, 0.3)], budget=300)
+    used = {key: count_tokens(text) for key, text in packed.items()}
+    assert packed['short'] == '짧은 문장입니다.'  # 몫보다 짧으면 전문, 남는 몫은 나머지로
+    assert sum(used.values()) <= 300
+    assert used['hi'] > used['lo'] > 0
+
+
+def test_몫이_너무_작은_출처는_제외():
+    long_text = ' '.join(f'{i}번째 설명 문장입니다.' for i in range(40))
+    packed = pack([('hi', long_text, 1.0), ('tiny', long_text, 0.01)], budget=200)
+    assert packed['tiny'] == ''
+    assert count_tokens(packed['hi']) > 150
+
+
+def test_출처_간_중복_문장은_관련도_높은_쪽에만():
+    shared = '도커 브리지 네트워크는 기본 네트워크 드라이버입니다.'
+    packed = pack([('lo', f'{shared} 웹 설명.', 0.2), ('hi', f'{shared} 기록 설명.', 0.9)], budget=500)
+    assert packed['hi'] == f'{shared} 기록 설명.'
+    assert packed['lo'] == '웹 설명.'
+
+
+def test_첫_문장부터_넘치면_토큰_단위로_자름():
+    packed = pack([('a', '가' * 300, 1.0)], budget=100)
+    assert packed['a'] == '가' * 100
+
+
+class TestAnswerPrompt:
+    def _prompt(self, settings, **kwargs):
+        settings.CONTEXT_PACKING = True
+        settings.CONTEXT_TOKEN_BUDGET = 400
+        service = LearnlogService.__new__(LearnlogService)
+        return service._answer_prompt('질문', **kwargs)
+
+    def test_예산_안으로_블록_형식_유지(self, settings):
+        logs = [SimpleNamespace(query=f'기록 질문 {i}', ai_response='과거 답변 문장입니다. ' * 100) for i in range(3)]
+        results = {'results': [{'url': 'https://docs.docker.com', 'content': '공식 문서 문장입니다. ' * 100, 'score': 0.8}]}
+        parent = SimpleNamespace(query='이전 질문', ai_response='이전 답변 문장입니다. ' * 100)
+        prompt = self._prompt(settings, search_results=results, parent=parent, retrieved_logs=logs)
+        assert '과거에 학습한 관련 기록:\n[기록1] Q: 기록 질문 0\nA: 과거 답변' in prompt
+        assert '이전 대화:\n[이전 질문] 이전 질문\n[이전 답변] 이전 답변' in prompt
+        assert '참고:\n[https://docs.docker.com] 공식 문서' in prompt
+        context = prompt.split('질문: 질문')[0] + prompt.split('참고:\n')[1].split('\n\n')[0]
+        assert count_tokens(context) <= 400 + 50  # 블록 머리말 정도의 여유
+
+    def test_웹_생략_경로는_예산을_기록에(self, settings):
+        logs = [SimpleNamespace(query='기록 질문', ai_response='과거 답변 문장입니다. ' * 100)]
+        prompt = self._prompt(settings, search_results={'results': []}, retrieved_logs=logs)
+        assert '참고:\n없음' in prompt
+        body = prompt.split('A: ')[1].split('\n\n')[0]
+        assert count_tokens(body) > 300
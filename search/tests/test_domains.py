@@ -1,5 +1,12 @@
 """도메인 매핑 키워드 매칭 테스트 — substring 오매칭 방지"""
-from search.domains import get_domains_for_query
+from unittest.mock import Mock
+
+import pytest
+from django.core.management import call_command
+
+from search.domains import DomainMatcher, SourceClassifier, classify_source, get_domains_for_query, is_official_doc
+from search.models import Reference
+from search.tests.factories import ReferenceFactory
 
 
 def domains_of(query):
@@ -46,3 +53,85 @@ class TestLegitimateMatches:
 
     def test_no_match_returns_none(self):
         assert get_domains_for_query("gRPC란 무엇인가") is None
+
+
+class TestCompiledMatcher:
+    def test_prefix_key_with_separator(self):
+        # "spring boot"가 잡힌 위치에서 경계가 맞는 짧은 키 'spring'도 함께 매칭
+        matcher = DomainMatcher({'spring': ['a.io'], 'spring boot': ['b.io'], 'boot': ['c.io']})
+        assert matcher.techs_in("Spring Boot 설정") == {'spring', 'spring boot', 'boot'}
+        assert matcher.techs_in("springboot 설정") == set()
+
+    def test_domains_follow_map_order(self):
+        matcher = DomainMatcher({'redis': ['redis.io'], 'docker': ['docs.docker.com']})
+        assert matcher.domains_for("docker로 redis 띄우기") == ['redis.io', 'docs.docker.com']
+
+    def test_korean_longest_match_only(self):
+        matcher = DomainMatcher({'자바': ['java'], '자바스크립트': ['js']})
+        assert matcher.techs_in("자바스크립트와 자바 비교") == {'자바', '자바스크립트'}
+        assert matcher.techs_in("자바스크립트만") == {'자바스크립트'}
+
+
+class TestOfficialDoc:
+    def test_registered_host_and_path(self):
+        assert is_official_doc("https://docs.djangoproject.com/en/5.2/topics/db/")
+
+    def test_subdomain_of_registered_host(self):
+        classifier = SourceClassifier({'x': ['example.com']}, {})
+        assert classifier.classify("https://docs.example.com/guide") == 'official'
+        assert classifier.classify("https://notexample.com/guide") == 'other'
+
+    def test_path_prefix_required(self):
+        assert not is_official_doc("https://docs.djangoproject.com/ko/")
+
+    def test_path_prefix_matches_whole_segments(self):
+        assert is_official_doc("https://docs.python.org/3")
+        assert is_official_doc("https://docs.python.org/3/library/os.html")
+        assert not is_official_doc("https://docs.python.org/30/")
+        assert not is_official_doc("https://docs.python.org/3-foo")
+        classifier = SourceClassifier({'go': ['go.dev/doc']}, {})
+        assert classifier.classify("https://go.dev/doc/") == 'official'
+        assert classifier.classify("https://go.dev/docs-old") == 'other'
+
+    def test_domain_in_query_string_is_not_official(self):
+        assert not is_official_doc("https://blog.example.com/?ref=docs.djangoproject.com/en")
+
+
+class TestSourceType:
+    def test_fixed_hosts(self):
+        assert classify_source("https://stackoverflow.com/questions/1") == 'stackoverflow'
+        assert classify_source("https://github.com/django/django") == 'github'
+        assert classify_source("https://medium.com/@someone/post") == 'blog'
+
+    def test_more_specific_host_wins(self):
+        # docs.github.com은 TECH_DOCS_MAP 등록 도메인 — github.com 규칙보다 우선
+        assert classify_source("https://docs.github.com/en/actions") == 'official'
+
+    def test_domain_in_path_is_not_matched(self):
+        assert classify_source("https://example.com/redirect/github.com/a") == 'other'
+
+    def test_blog_hint_in_host_or_first_segment(self):
+        assert classify_source("https://techblog.example.com/post") == 'blog'
+        assert classify_source("https://example.com/blog/post") == 'blog'
+        assert classify_source("https://example.com/docs/blogging-api") == 'other'
+
+    def test_host_rules_cached(self):
+        classifier = SourceClassifier({'x': ['example.com/docs']}, {})
+        classifier.classify("https://example.com/docs/a")
+        classifier.classify("https://example.com/other")
+        assert classifier.rules_for_host.cache_info().hits == 1
+
+
+@pytest.mark.django_db
+class TestReclassifyCommand:
+    def test_reclassifies_only_changed_rows(self):
+        stale = ReferenceFactory(url="https://stackoverflow.com/questions/1", source_type='official')
+        same = ReferenceFactory(url="https://docs.djangoproject.com/en/5.2/", source_type='official')
+        call_command('reclassify_references', stdout=Mock())
+        assert Reference.objects.get(pk=stale.pk).source_type == 'stackoverflow'
+        assert Reference.objects.get(pk=same.pk).source_type == 'official'
+
+    def test_dry_run_does_not_save(self):
+        stale = ReferenceFactory(url="https://github.com/a/b", source_type='official')
+        call_command('reclassify_references', '--dry-run', stdout=Mock())
+        assert Reference.objects.get(pk=stale.pk).source_type == 'official'
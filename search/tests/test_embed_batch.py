@@ -0,0 +1,132 @@
+"""
+배치 임베딩 테스트
+- _token_batches: 토큰 예산 단위 분할 (토큰 수는 context_packer.count_tokens)
+- _embed_many: 순서 보존, 캐시 hit 제외, 실패 배치만 None, 동시 요청도 순서 보존
+- TokenBucket: 용량만큼은 즉시, 이후는 rate에 맞춰 대기
+- embed_logs 커맨드: bulk_update 저장과 --after 재개
+토크나이저 파일을 받지 않도록 글자 수 추정 경로(한글 1자=1토큰, 그 외 3자=1토큰)로 고정한다.
+"""
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import call_command
+
+from search.services import LearnlogService, context_packer
+from search.services.embedding_cache import EmbeddingCache
+from search.services.rate_limit import TokenBucket
+from search.tests.factories import LearningLogFactory
+
+
+@pytest.fixture(autouse=True)
+def _estimate_tokens(monkeypatch):
+    monkeypatch.setattr(context_packer, '_get_encoding', lambda: None)
+
+
+def _service(create):
+    service = LearnlogService.__new__(LearnlogService)
+    service.mistral_client = Mock()
+    service.mistral_client.embeddings.create.side_effect = create
+    service.embedding_cache = EmbeddingCache(max_size=100, use_db=False)
+    return service
+
+
+def _echo_embeddings(**kwargs):
+    """입력 길이를 첫 성분으로 돌려주는 가짜 응답 — 순서 검증용"""
+    return SimpleNamespace(data=[
+        SimpleNamespace(embedding=[float(len(t))] + [0.0] * 1023) for t in kwargs['inputs']
+    ])
+
+
+class TestTokenBatches:
+    def test_예산_넘기_전에_분할(self):
+        texts = ['가' * 40, '나' * 40, '다' * 40]
+        batches = list(LearnlogService._token_batches(range(3), texts, budget=100))
+        assert batches == [[0, 1], [2]]
+
+    def test_영문은_글자_수보다_적게_센다(self):
+        texts = ['a' * 120, 'b' * 120, 'c' * 120]
+        assert list(LearnlogService._token_batches(range(3), texts, budget=100)) == [[0, 1], [2]]
+
+    def test_예산보다_큰_단일_텍스트도_단독_배치(self):
+        batches = list(LearnlogService._token_batches([0], ['x' * 500], budget=100))
+        assert batches == [[0]]
+
+
+class TestEmbedMany:
+    def test_순서_보존(self):
+        service = _service(_echo_embeddings)
+        result = service._embed_many(['a', 'bbb', 'cc'])
+        assert [v[0] for v in result] == [1.0, 3.0, 2.0]
+        assert service.mistral_client.embeddings.create.call_count == 1
+
+    def test_캐시_hit은_요청에서_제외(self):
+        service = _service(_echo_embeddings)
+        service.embedding_cache.set(LearnlogService.EMBED_MODEL, 'a', [9.0] * 1024)
+        result = service._embed_many(['a', 'bb'])
+        assert result[0][0] == 9.0
+        sent = service.mistral_client.embeddings.create.call_args.kwargs['inputs']
+        assert sent == ['bb']
+
+    def test_실패한_배치만_None(self):
+        calls = iter([RuntimeError("429"), None])
+
+        def create(**kwargs):
+            error = next(calls)
+            if error:
+                raise error
+            return _echo_embeddings(**kwargs)
+
+        service = _service(create)
+        with patch.object(LearnlogService, 'EMBED_BATCH_TOKENS', 3):
+            result = service._embed_many(['가나다', '라마바'])
+        assert result[0] is None
+        assert result[1][0] == 3.0
+
+    def test_동시_요청도_순서_보존(self):
+        service = _service(_echo_embeddings)
+        texts = ['가' * n for n in range(1, 9)]
+        with patch.object(LearnlogService, 'EMBED_BATCH_TOKENS', 8):
+            result = service._embed_many(texts, rate_limiter=TokenBucket(rate=1000), concurrency=4)
+        assert [v[0] for v in result] == [float(n) for n in range(1, 9)]
+        assert service.mistral_client.embeddings.create.call_count > 1
+
+
+class TestTokenBucket:
+    def test_용량_이후는_rate만큼_대기(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.09  # 첫 요청은 즉시, 나머지 2회 × 1/20초
+
+
+@pytest.mark.django_db
+class TestEmbedLogsCommand:
+    def test_bulk_update로_저장하고_after부터_재개(self):
+        skipped = LearningLogFactory(embedding=None)
+        target = LearningLogFactory(embedding=None)
+        service = _service(_echo_embeddings)
+
+        with patch('search.management.commands.embed_logs.LearnlogService', return_value=service):
+            call_command('embed_logs', '--after', str(skipped.pk), '--rps', '100', stdout=Mock())
+
+        skipped.refresh_from_db()
+        target.refresh_from_db()
+        assert skipped.embedding is None
+        assert target.embedding is not None
+
+    def test_임시_임베딩이_남은_로그도_백필(self):
+        provisional = LearningLogFactory(embedding=[0.3] * 1024, embedding_provisional=True)
+        done = LearningLogFactory(embedding=[0.3] * 1024)
+        service = _service(_echo_embeddings)
+
+        with patch('search.management.commands.embed_logs.LearnlogService', return_value=service):
+            call_command('embed_logs', '--rps', '100', stdout=Mock())
+
+        provisional.refresh_from_db()
+        done.refresh_from_db()
+        assert not provisional.embedding_provisional
+        assert list(provisional.embedding) != pytest.approx([0.3] * 1024)
+        assert list(done.embedding) == pytest.approx([0.3] * 1024)
@@ -0,0 +1,113 @@
+"""
+임베딩 캐시 테스트
+- LRU 축출, 키 정규화, hit/miss 카운터
+- LearnlogService._embed / _aembed: 캐시 hit이면 API 생략, 실패는 캐시하지 않음
+- DB 단계: TTL 만료·최대 행 수 축출
+"""
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from django.utils import timezone
+
+from search.models import CachedEmbedding
+from search.services.embedding_cache import EmbeddingCache, EmbeddingContext, cache_key
+
+VEC = [0.1] * 1024
+
+
+class TestMemoryTier:
+    def test_공백_차이는_같은_키(self):
+        assert cache_key('m', "docker  network\n") == cache_key('m', " docker network")
+
+    def test_모델이_다르면_다른_키(self):
+        assert cache_key('a', "docker") != cache_key('b', "docker")
+
+    def test_LRU_축출(self, memory_cache):
+        cache = memory_cache(EmbeddingCache, max_size=2)
+        cache.set('m', 'a', [1.0])
+        cache.set('m', 'b', [2.0])
+        cache.get('m', 'a')          # a를 최근 사용으로
+        cache.set('m', 'c', [3.0])   # b 축출
+        assert cache.get('m', 'b') is None
+        assert cache.get('m', 'a') == [1.0]
+        assert cache.get('m', 'c') == [3.0]
+
+    def test_hit_miss_카운터(self, memory_cache):
+        cache = memory_cache(EmbeddingCache)
+        cache.get('m', 'a')
+        cache.set('m', 'a', [1.0])
+        cache.get('m', 'a')
+        stats = cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits_memory'] == 1
+        assert stats['hit_rate'] == 0.5
+
+
+@pytest.fixture
+def embed_service(bare_service, memory_cache):
+    def make(create):
+        bare_service.mistral_client = Mock()
+        bare_service.mistral_client.embeddings.create.side_effect = create
+        bare_service.embedding_cache = memory_cache(EmbeddingCache)
+        return bare_service
+    return make
+
+
+class TestEmbedUsesCache:
+    def test_같은_텍스트는_API_1회(self, embed_service):
+        service = embed_service(lambda **kw: SimpleNamespace(data=[SimpleNamespace(embedding=VEC)]))
+        assert service._embed("도커 네트워크") == VEC
+        assert service._embed("도커  네트워크") == VEC
+        assert service.mistral_client.embeddings.create.call_count == 1
+
+    def test_실패는_캐시하지_않음(self, embed_service):
+        service = embed_service(RuntimeError("rate limit"))
+        assert service._embed("도커") is None
+        assert service._embed("도커") is None
+        assert service.mistral_client.embeddings.create.call_count == 2
+
+    def test_async_경로도_같은_캐시_공유(self, embed_service):
+        service = embed_service(lambda **kw: SimpleNamespace(data=[SimpleNamespace(embedding=VEC)]))
+        service.mistral_client.embeddings.create_async = AsyncMock(
+            return_value=SimpleNamespace(data=[SimpleNamespace(embedding=VEC)]),
+        )
+        assert asyncio.run(service._aembed("도커 네트워크")) == VEC
+        assert service._embed("도커 네트워크") == VEC
+        assert asyncio.run(service._aembed("도커 네트워크")) == VEC
+        service.mistral_client.embeddings.create_async.assert_awaited_once()
+        service.mistral_client.embeddings.create.assert_not_called()
+
+    def test_요청_컨텍스트는_캐시가_꺼져도_재사용(self, embed_service, memory_cache):
+        service = embed_service(lambda **kw: SimpleNamespace(data=[SimpleNamespace(embedding=VEC)]))
+        service.embedding_cache = memory_cache(EmbeddingCache, max_size=0)
+        context = EmbeddingContext()
+        assert service._embed("도커 네트워크", context=context) == VEC
+        assert service._lookup_embedding("도커 네트워크") is None
+        assert service._lookup_embedding("도커 네트워크", context) == VEC
+        assert service._embed("도커 네트워크", context=context) == VEC
+        assert service.mistral_client.embeddings.create.call_count == 1
+
+
+@pytest.mark.django_db
+class TestDBTier:
+    def test_메모리에_없으면_DB에서_조회(self):
+        EmbeddingCache(max_size=10, use_db=True).set('m', 'docker', VEC)
+        fresh = EmbeddingCache(max_size=10, use_db=True)  # 재시작된 프로세스
+        assert fresh.get('m', 'docker') == pytest.approx(VEC)
+        assert fresh.stats()['hits_db'] == 1
+
+    def test_TTL_지나면_miss(self):
+        cache = EmbeddingCache(max_size=0, use_db=True, ttl_days=1)
+        cache.set('m', 'docker', VEC)
+        CachedEmbedding.objects.update(created_at=timezone.now() - timedelta(days=2))
+        assert cache.get('m', 'docker') is None
+
+    def test_최대_행수_초과분_축출(self):
+        cache = EmbeddingCache(max_size=0, use_db=True, db_max_rows=2)
+        for text in ['a', 'b', 'c']:
+            cache.set('m', text, VEC)
+        cache.prune()
+        assert CachedEmbedding.objects.count() == 2
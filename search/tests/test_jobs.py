@@ -0,0 +1,171 @@
+"""
+백그라운드 작업 큐 테스트
+- claim/run_job: 상태 전이 (queued → running → done / 재시도 / failed)
+- requeue_stale: 죽은 워커가 점유한 작업 회수 (시도 한도면 failed), prune_finished: 보존 기간 지난 작업 삭제
+- verify_log 작업: 재시도가 남으면 pending 유지, 마지막 시도 실패는 미검증
+- run_worker: 큐 조회가 실패해도 스레드가 죽지 않고 기록 후 재시도
+LLM 호출은 전부 모킹한다.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from search.models import Job
+from search.services import LearnlogService, jobs
+from search.tests.factories import LearningLogFactory
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    func = Mock()
+    monkeypatch.setitem(jobs.HANDLERS, 'test', func)
+    return func
+
+
+def test_워커는_큐_조회_오류_후에도_계속():
+    claim = Mock(side_effect=[RuntimeError("server closed the connection"), None])
+    out, err = StringIO(), StringIO()
+    with patch.object(jobs, 'claim', claim), \
+            patch.object(jobs, 'requeue_stale', return_value=0), \
+            patch.object(jobs, 'prune_finished', return_value=0):
+        call_command('run_worker', '--once', '--concurrency', '1', '--poll', '0', stdout=out, stderr=err)
+    assert claim.call_count == 2
+    assert 'server closed the connection' in err.getvalue()
+    assert '워커 종료' in out.getvalue()
+
+
+def test_백오프는_지수_증가_후_상한(settings):
+    settings.JOB_RETRY_BASE_SEC = 10
+    settings.JOB_RETRY_MAX_SEC = 60
+    assert [jobs.backoff(n) for n in (1, 2, 3, 4, 5)] == [10, 20, 40, 60, 60]
+
+
+def test_등록되지_않은_종류는_거부():
+    with pytest.raises(ValueError):
+        jobs.enqueue('unknown', {})
+
+
+@pytest.mark.django_db
+class TestQueue:
+    def test_성공하면_done(self, handler):
+        jobs.enqueue('test', {'x': 1})
+        job = jobs.claim()
+        assert job.status == 'running'
+        assert job.attempts == 1
+        assert jobs.run_job(job) is True
+        handler.assert_called_once_with({'x': 1}, False)
+        job.refresh_from_db()
+        assert job.status == 'done'
+        assert jobs.claim() is None
+
+    def test_실패하면_백오프_후_재예약(self, handler):
+        handler.side_effect = RuntimeError('rate limit')
+        jobs.enqueue('test', {}, max_attempts=3)
+        job = jobs.claim()
+        assert jobs.run_job(job) is False
+        job.refresh_from_db()
+        assert job.status == 'queued'
+        assert job.run_at > timezone.now()
+        assert job.last_error == 'rate limit'
+        assert jobs.claim() is None  # run_at 전에는 가져가지 않는다
+
+    def test_시도_한도_넘으면_failed(self, handler):
+        handler.side_effect = RuntimeError('down')
+        Job.objects.create(kind='test', payload={}, attempts=2, max_attempts=3)
+        job = jobs.claim()
+        jobs.run_job(job)
+        handler.assert_called_once_with({}, True)
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.finished_at is not None
+
+    def test_점유_만료_작업_회수(self, settings):
+        settings.JOB_LOCK_TIMEOUT_SEC = 60
+        stale = Job.objects.create(kind='test', status='running', locked_at=timezone.now() - timedelta(minutes=5))
+        fresh = Job.objects.create(kind='test', status='running', locked_at=timezone.now())
+        assert jobs.requeue_stale() == 1
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        assert stale.status == 'queued'
+        assert fresh.status == 'running'
+
+    def test_워커를_죽인_작업은_시도_한도면_failed(self, settings):
+        settings.JOB_LOCK_TIMEOUT_SEC = 60
+        job = Job.objects.create(
+            kind='test', status='running', attempts=3, max_attempts=3,
+            locked_at=timezone.now() - timedelta(minutes=5),
+        )
+        assert jobs.requeue_stale() == 0
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.finished_at is not None
+        assert jobs.claim() is None
+
+    def test_보존_기간_지난_작업_삭제(self, settings):
+        settings.JOB_RETENTION_DAYS = 7
+        old = timezone.now() - timedelta(days=8)
+        Job.objects.create(kind='test', status='done', finished_at=old)
+        Job.objects.create(kind='test', status='failed', finished_at=old)
+        recent = Job.objects.create(kind='test', status='done', finished_at=timezone.now())
+        queued = Job.objects.create(kind='test')
+        assert jobs.prune_finished() == 2
+        assert set(Job.objects.values_list('pk', flat=True)) == {recent.pk, queued.pk}
+
+
+@pytest.mark.django_db
+class TestVerifyLogJob:
+    def _run(self, judge, attempts=0, max_attempts=3):
+        log = LearningLogFactory(verification='pending')
+        job = jobs.enqueue_verification(log, None, 500, {'results': [{'url': 'u', 'content': '내용'}]})
+        Job.objects.filter(pk=job.pk).update(attempts=attempts, max_attempts=max_attempts)
+        service = LearnlogService.__new__(LearnlogService)
+        with patch.object(LearnlogService, 'shared', return_value=service), \
+                patch.object(LearnlogService, '_call_groq_json', **judge):
+            jobs.run_job(jobs.claim())
+        log.refresh_from_db()
+        job.refresh_from_db()
+        return log, job
+
+    def test_판정_성공(self):
+        log, job = self._run({'return_value': {'consistent': False, 'note': '어긋남'}})
+        assert job.status == 'done'
+        assert log.verification == 'suspect'
+
+    def test_재시도_남으면_pending_유지(self):
+        log, job = self._run({'side_effect': ValueError('파싱 실패')})
+        assert job.status == 'queued'
+        assert log.verification == 'pending'
+
+    def test_마지막_시도_실패는_미검증(self):
+        log, job = self._run({'side_effect': ValueError('파싱 실패')}, attempts=2, max_attempts=3)
+        assert job.status == 'done'
+        assert log.verification == ''
+
+
+@pytest.mark.django_db
+class TestPolishMarkdownJob:
+    def _run(self, polish, attempts=0, max_attempts=3):
+        log = LearningLogFactory(markdown_content='## 로컬 포맷')
+        job = jobs.enqueue('polish_markdown', {'log_pk': log.pk}, max_attempts=max_attempts)
+        Job.objects.filter(pk=job.pk).update(attempts=attempts)
+        service = LearnlogService.__new__(LearnlogService)
+        with patch.object(LearnlogService, 'shared', return_value=service), \
+                patch.object(LearnlogService, 'polish_markdown', **polish):
+            jobs.run_job(jobs.claim())
+        log.refresh_from_db()
+        job.refresh_from_db()
+        return log, job
+
+    def test_재작성본으로_교체(self):
+        log, job = self._run({'return_value': '## 다듬은 마크다운'})
+        assert job.status == 'done'
+        assert log.markdown_content == '## 다듬은 마크다운'
+
+    def test_마지막_시도_실패는_로컬_포맷_유지(self):
+        log, job = self._run({'side_effect': RuntimeError('rate limit')}, attempts=2)
+        assert job.status == 'done'
+        assert log.markdown_content == '## 로컬 포맷'
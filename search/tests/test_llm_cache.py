@@ -0,0 +1,73 @@
+"""
+Groq 응답 캐시 테스트
+- 같은 (모델, 프롬프트, 디코딩 파라미터)는 API 1회
+- 파싱 실패 응답은 캐시하지 않음, 호출부 opt-out(cache=False — 마크다운 변환·통합 후처리)
+- async 경로와 캐시 공유
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+import pytest
+
+from search.services import LearnlogService
+from search.services.llm_cache import CompletionCache, completion_key
+
+
+def _response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def service(bare_service, memory_cache):
+    bare_service.groq_client = Mock()
+    bare_service.groq_client.chat.completions.create.return_value = _response('docker, network')
+    bare_service.llm_cache = memory_cache(CompletionCache)
+    return bare_service
+
+
+def test_디코딩_파라미터가_다르면_다른_키():
+    base = {'model': 'm', 'messages': [{'role': 'user', 'content': 'p'}], 'temperature': 0.0, 'max_tokens': 50}
+    assert completion_key(base) == completion_key(dict(reversed(list(base.items()))))
+    assert completion_key(base) != completion_key({**base, 'temperature': 0.2})
+
+
+def test_같은_입력은_API_1회(service):
+    assert service.extract_tags('도커 네트워크', '답변') == ['docker', 'network']
+    assert service.extract_tags('도커 네트워크', '답변') == ['docker', 'network']
+    assert service.groq_client.chat.completions.create.call_count == 1
+    assert service.llm_cache.stats()['hits_memory'] == 1
+
+
+def test_JSON_파싱_실패는_캐시하지_않음(service):
+    service.groq_client.chat.completions.create.return_value = _response('not json')
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            service._call_groq_json('JSON으로 답하세요')
+    assert service.groq_client.chat.completions.create.call_count == 2
+
+
+def test_cache_False면_매번_호출(service, settings):
+    settings.MARKDOWN_MODE = 'llm'
+    service.convert_to_markdown('질문', '답변', {'results': []})
+    service.convert_to_markdown('질문', '답변', {'results': []})
+    assert service.groq_client.chat.completions.create.call_count == 2
+    assert service.llm_cache.stats()['memory_size'] == 0
+
+
+def test_통합_후처리는_캐시에_쓰지_않음(service, settings):
+    settings.POSTPROCESS_COMBINED = True
+    settings.MARKDOWN_MODE = 'local'
+    service.groq_client.chat.completions.create.return_value = _response('{"tags": ["docker"]}')
+    tags, _, _ = service.postprocess('질문', '답변', {'results': []})
+    assert tags == ['docker']
+    assert service.llm_cache.stats()['memory_size'] == 0
+
+
+def test_async_경로도_같은_캐시_공유(service):
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(return_value=_response('docker'))
+    with patch.object(LearnlogService, 'groq_async_client', new_callable=PropertyMock, return_value=async_client):
+        assert service.extract_tags('도커', '답변') == ['docker', 'network']
+        assert asyncio.run(service.aextract_tags('도커', '답변')) == ['docker', 'network']
+    async_client.chat.completions.create.assert_not_awaited()
@@ -0,0 +1,142 @@
+"""
+학습 로그 청크 테스트
+- 답변(ai_response만, markdown_content 사본 제외)은 섹션 단위 청크로 저장, 청크 임베딩은 embed_log 작업이 함께
+- 청크 검색: 로그별 최고 청크 순위와 로그 단위 순위를 RRF로 결합, 백필 전 로그도 결과에 남음
+- RAG 컨텍스트: 청크로 찾은 로그는 답변 앞부분 대신 질문과 맞는 청크
+"""
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management import call_command
+
+from search.models import Job, LearningLog, LearningLogChunk
+from search.services import LearnlogService
+from search.services.jobs import claim, enqueue_verification, run_job
+from search.services.log_chunks import LOG_CHUNK_CHARS, build_chunks, embed_chunks
+
+ANSWER = "## 설치\n\n" + "pip으로 설치합니다. " * 60 + "\n\n## 배포\n\ngunicorn 워커 수를 정합니다."
+
+
+def _log(pk, ai_response='앞부분'):
+    return LearningLog(pk=pk, query=f'질문 {pk}', ai_response=ai_response)
+
+
+def _chunk(log_id, text):
+    return SimpleNamespace(log_id=log_id, text=text)
+
+
+def test_답변을_섹션_청크로():
+    chunks = build_chunks(_log(1, ANSWER))
+    assert [c.position for c in chunks] == list(range(len(chunks)))
+    assert all(len(c.text) <= LOG_CHUNK_CHARS for c in chunks)
+    assert chunks[-1].text == '## 배포\ngunicorn 워커 수를 정합니다.'
+
+
+def test_마크다운_사본은_청크에서_제외():
+    log = _log(1, ANSWER)
+    log.markdown_content = '## 학습 노트\n' + ANSWER
+    assert [c.text for c in build_chunks(log)] == [c.text for c in build_chunks(_log(1, ANSWER))]
+
+
+def test_청크로_찾은_로그는_맞는_청크를_컨텍스트로():
+    log = _log(1, '관련 없는 앞부분')
+    log.matched_chunks = ['## 배포\ngunicorn', '## 설치\npip']
+    context = LearnlogService._build_retrieved_context([log, _log(2, '다른 로그 답변')])
+    assert '## 배포\ngunicorn\n…\n## 설치\npip' in context
+    assert '관련 없는 앞부분' not in context
+    assert '다른 로그 답변' in context
+
+
+@pytest.fixture
+def service():
+    return LearnlogService.__new__(LearnlogService)
+
+
+def test_청크_순위와_로그_순위를_RRF로_결합(service):
+    logs = [_log(1), _log(2)]
+    chunks = [_chunk(3, '3의 최고 청크'), _chunk(2, '2의 청크'), _chunk(3, '3의 두번째'), _chunk(3, '3의 세번째')]
+
+    def fused(query, embedding, k, exclude, model=LearningLog, owner='id'):
+        return chunks if model is LearningLogChunk else logs
+
+    with patch.object(service, '_retrieve_fused', side_effect=fused), \
+            patch.object(LearningLog.objects, 'in_bulk', return_value={3: _log(3)}) as in_bulk:
+        results = service._retrieve_chunked('질문', [0.1] * 1024, 3, [])
+
+    # 2는 두 순위 모두 2위, 3은 청크 1위만, 1은 로그 1위만 — 두 목록에 있는 2가 가장 위
+    assert [log.pk for log in results] == [2, 1, 3]
+    in_bulk.assert_called_once_with([3])
+    assert results[2].matched_chunks == ['3의 최고 청크', '3의 두번째']  # CONTEXT_CHUNKS개, 청크 순위 순
+    assert results[1].matched_chunks == []  # 청크 없는(백필 전) 로그는 답변 앞부분으로
+    assert results[0].rrf_score > results[1].rrf_score
+
+
+def test_청크_검색은_설정으로_전환(service, settings):
+    settings.LOG_CHUNK_RETRIEVAL = True
+    with patch.object(service, '_retrieve_chunked', return_value=[]) as chunked:
+        service._retrieve('질문', [0.1] * 1024, 3, [])
+    chunked.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestLogChunks:
+    def _save(self, settings, deferred=True):
+        settings.LOG_CHUNKS_ENABLED = True
+        settings.EMBEDDING_DEFERRED = deferred
+        service = LearnlogService.__new__(LearnlogService)
+        service._lookup_embedding = Mock(return_value=None)
+        return service.save_learning_log('질문', ANSWER, '## md', {'results': []}, [])
+
+    def test_저장하면_청크와_임베딩_작업(self, settings):
+        log = self._save(settings)
+        texts = list(log.chunks.order_by('position').values_list('text', flat=True))
+        assert texts == [c.text for c in build_chunks(log)]
+        assert Job.objects.filter(kind='embed_log').exists()
+
+    def test_embed_log_작업이_청크도_임베딩(self, settings):
+        self._save(settings)
+        service = Mock()
+        service._embed.return_value = [0.1] * 1024
+        service._embed_many.side_effect = lambda texts, rate_limiter=None: [[0.2] * 1024 for _ in texts]
+        with patch.object(LearnlogService, 'shared', return_value=service):
+            assert run_job(claim())
+        assert not LearningLogChunk.objects.filter(embedding__isnull=True).exists()
+        assert service._embed_many.call_args.args[0][0].startswith('질문\n## 설치')
+
+    def test_청크_임베딩은_빈_것만(self, settings):
+        log = self._save(settings)
+        service = Mock()
+        service._embed_many.side_effect = lambda texts, rate_limiter=None: [
+            [0.1] * 1024 if i else None for i, _ in enumerate(texts)
+        ]
+        assert embed_chunks(service, [log.pk]) == 1
+        service._embed_many.side_effect = lambda texts, rate_limiter=None: [[0.2] * 1024 for _ in texts]
+        assert embed_chunks(service, [log.pk]) == 0
+        assert len(service._embed_many.call_args.args[0]) == 1
+
+    def test_검증_작업에_찾은_청크_전달(self, settings):
+        log = self._save(settings)
+        retrieved = LearningLog.objects.create(query='이전 질문', ai_response='앞부분', markdown_content='')
+        retrieved.matched_chunks = ['## 배포\ngunicorn']
+        enqueue_verification(log, [retrieved], 500, None)
+        service = Mock()
+        with patch.object(LearnlogService, 'shared', return_value=service):
+            assert run_job(claim())
+        assert service.verify_log.call_args.args[1][0].matched_chunks == ['## 배포\ngunicorn']
+
+    def test_chunk_logs_백필(self, settings):
+        log = LearningLog.objects.create(query='질문', ai_response=ANSWER, markdown_content='')
+        service = Mock()
+        service._embed_many.side_effect = lambda texts, rate_limiter=None: [[0.1] * 1024 for _ in texts]
+        out = StringIO()
+        with patch('search.management.commands.chunk_logs.LearnlogService', return_value=service):
+            call_command('chunk_logs', '--rps', '1000', stdout=out)
+            count = log.chunks.count()
+            assert count == len(build_chunks(log))
+            call_command('chunk_logs', '--rps', '1000', stdout=out)  # 이미 채운 로그는 건너뜀
+            assert log.chunks.count() == count
+            call_command('chunk_logs', '--all', '--rps', '1000', stdout=out)
+        assert log.chunks.count() == count
+        assert not log.chunks.filter(embedding__isnull=True).exists()
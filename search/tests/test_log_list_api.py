@@ -79,4 +79,20 @@ class TestLogListAPI:
         resp = client.get(URL, {"q": "Django"})
         content = resp.content.decode()
         assert "django orm optimization" in content
-        assert "nginx upstream" not in content
\ No newline at end of file
+        assert "nginx upstream" not in content
+
+    def test_search_relevance_query_outranks_answer(self, client):
+        """연관순 - 저장된 search_vector 가중치(질문 A > 답변 B)대로 정렬"""
+        in_answer = LearningLogFactory(query="orm 성능", ai_response="celery 작업 큐")
+        in_query = LearningLogFactory(query="celery 재시도", ai_response="설명")
+        resp = client.get(URL, {"q": "celery", "sort": "relevance"})
+        logs = list(resp.context['logs'].object_list)
+        assert logs == [in_query, in_answer]
+
+    def test_search_vector_follows_update(self, client):
+        """답변 수정 시 search_vector가 DB에서 재계산되는지 확인"""
+        log = LearningLogFactory(query="질문", ai_response="예전 내용")
+        log.ai_response = "redis 캐시 전략"
+        log.save()
+        resp = client.get(URL, {"q": "redis"})
+        assert list(resp.context['logs'].object_list) == [log]
@@ -0,0 +1,71 @@
+"""
+로컬 마크다운 포맷터 테스트
+- 질문 제목 + 본문 제목 레벨 조정 + 참고 자료 섹션 재구성
+- 코드블록 안쪽은 그대로, 나눠서 feed해도 같은 결과
+- MARKDOWN_MODE='local'이면 Groq 호출 없음
+"""
+from unittest.mock import Mock
+
+from search.services import LearnlogService
+from search.services.markdown_format import MarkdownFormatter, format_markdown
+
+RESULTS = {'results': [
+    {'title': 'Docker docs', 'url': 'https://docs.docker.com/network/'},
+    {'title': '중복', 'url': 'https://docs.docker.com/network/'},
+    {'title': 'K8s', 'url': 'https://kubernetes.io/docs/'},
+]}
+
+ANSWER = """# 개요
+브리지 네트워크는 기본값입니다.
+
+
+
+## 예시
+```bash
+# 주석은 제목이 아님
+docker network ls
+```
+설명 계속.
+
+### 참고 자료
+- https://example.com/answer-made-up
+"""
+
+
+def test_제목_본문_참고자료_구성():
+    md = format_markdown('  도커  네트워크\n종류? ', ANSWER, RESULTS)
+    assert md == (
+        "## 도커 네트워크 종류?\n\n"
+        "### 개요\n\n"
+        "브리지 네트워크는 기본값입니다.\n\n"
+        "### 예시\n\n"
+        "```bash\n# 주석은 제목이 아님\ndocker network ls\n```\n\n"
+        "설명 계속.\n\n"
+        "## 참고 자료\n"
+        "- [Docker docs](https://docs.docker.com/network/)\n"
+        "- [K8s](https://kubernetes.io/docs/)"
+    )
+
+
+def test_참고자료_섹션_뒤의_상위_제목은_유지():
+    md = format_markdown('질문', "## 출처\n- a\n## 정리\n끝", {'results': []})
+    assert md == "## 질문\n\n### 정리\n\n끝"
+
+
+def test_검색결과_없으면_참고자료_생략():
+    assert format_markdown('질문', '답변', {'results': []}) == "## 질문\n\n답변"
+
+
+def test_나눠서_feed해도_같은_결과():
+    formatter = MarkdownFormatter('도커 네트워크 종류?')
+    for i in range(0, len(ANSWER), 7):
+        formatter.feed(ANSWER[i:i + 7])
+    assert formatter.finish(RESULTS) == format_markdown('도커 네트워크 종류?', ANSWER, RESULTS)
+
+
+def test_local_모드는_Groq_호출_없음(settings):
+    settings.MARKDOWN_MODE = 'local'
+    service = LearnlogService.__new__(LearnlogService)
+    service.groq_client = Mock()
+    assert service.convert_to_markdown('질문', '답변', RESULTS).startswith('## 질문\n\n답변')
+    service.groq_client.chat.completions.create.assert_not_called()
@@ -0,0 +1,101 @@
+"""
+통합 후처리 테스트
+- JSON 1회 호출로 태그·마크다운·판정
+- 컨텍스트가 없으면 판정 필드를 요청하지 않음, local 모드면 마크다운도 요청하지 않음
+- 통합 호출 실패 → 개별 호출(태그·마크다운)로 전환, 풀 스레드 DB 커넥션은 정리
+- 판정을 받은 로그는 검증 작업을 등록하지 않음
+LLM 호출은 전부 모킹한다.
+"""
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from search.api_views import QuerySSEView
+from search.models import Job
+from search.services import LearnlogService
+
+RESULTS = {'results': [{'title': 'Docker docs', 'url': 'https://docs.docker.com', 'content': '브리지 네트워크'}]}
+CONTEXT = (None, 500, RESULTS)
+
+
+@pytest.fixture
+def service(settings):
+    settings.POSTPROCESS_COMBINED = True
+    settings.MARKDOWN_MODE = 'llm'
+    return LearnlogService.__new__(LearnlogService)
+
+
+def test_한번의_호출로_태그_마크다운_판정(service):
+    result = {'tags': ['Docker', 'bridge mode'], 'markdown': '## 질문\n\n정리', 'consistent': False, 'note': '어긋남'}
+    with patch.object(LearnlogService, '_call_groq_json', return_value=result) as call:
+        tags, markdown, verdict = service.postprocess('질문', '답변', RESULTS, CONTEXT)
+    call.assert_called_once()
+    assert tags == ['docker', 'bridge-mode']
+    assert markdown == '## 질문\n\n정리'
+    assert verdict == {'consistent': False, 'note': '어긋남'}
+
+
+def test_컨텍스트_없으면_판정_요청_안함(service):
+    prompt, _, judged = service._postprocess_request('질문', '답변', {'results': []}, None)
+    assert judged is False
+    assert '"consistent"' not in prompt
+    with patch.object(LearnlogService, '_call_groq_json', return_value={'tags': 'docker', 'consistent': True}):
+        assert service.postprocess('질문', '답변', {'results': []})[2] is None
+
+
+def test_local_모드는_마크다운을_로컬에서(service, settings):
+    settings.MARKDOWN_MODE = 'local'
+    prompt, max_tokens, _ = service._postprocess_request('질문', '답변', RESULTS, CONTEXT)
+    assert '"markdown"' not in prompt
+    assert max_tokens == 300
+    with patch.object(LearnlogService, '_call_groq_json', return_value={'tags': ['docker'], 'consistent': True}):
+        _, markdown, verdict = service.postprocess('질문', '답변', RESULTS, CONTEXT)
+    assert markdown.startswith('## 질문\n\n답변\n\n## 참고 자료')
+    assert verdict == {'consistent': True, 'note': ''}
+
+
+@pytest.mark.parametrize('failure', [
+    {'side_effect': ValueError('파싱 실패')},
+    {'return_value': {'markdown': '태그 없음'}},
+])
+def test_통합_실패시_개별_호출로_전환(service, failure):
+    with patch.object(LearnlogService, '_call_groq_json', **failure), \
+            patch.object(LearnlogService, 'extract_tags', return_value=['docker']) as tags, \
+            patch.object(LearnlogService, 'convert_to_markdown', return_value='## md') as md:
+        assert service.postprocess('질문', '답변', RESULTS, CONTEXT) == (['docker'], '## md', None)
+    tags.assert_called_once()
+    md.assert_called_once()
+
+
+def test_옵션_꺼지면_개별_호출(service, settings):
+    settings.POSTPROCESS_COMBINED = False
+    with patch.object(LearnlogService, '_call_groq_json') as call, \
+            patch.object(LearnlogService, 'extract_tags', return_value=['docker']), \
+            patch.object(LearnlogService, 'convert_to_markdown', return_value='## md'), \
+            patch('search.services.learnlog_service.connection') as connection:
+        assert service.postprocess('질문', '답변', RESULTS, CONTEXT) == (['docker'], '## md', None)
+    call.assert_not_called()
+    assert connection.close.call_count == 2
+
+
+def test_async_경로(service):
+    result = {'tags': 'docker, network', 'markdown': '## md', 'consistent': True}
+    with patch.object(LearnlogService, '_acall_groq_json', new_callable=AsyncMock, return_value=result):
+        tags, markdown, verdict = asyncio.run(service.apostprocess('질문', '답변', RESULTS, CONTEXT))
+    assert (tags, markdown, verdict) == (['docker', 'network'], '## md', {'consistent': True, 'note': ''})
+
+
+@pytest.mark.django_db
+class TestSaveWithVerdict:
+    def test_판정을_바로_기록하고_검증_작업_생략(self, settings):
+        settings.EMBEDDING_DEFERRED = False
+        service = LearnlogService.__new__(LearnlogService)
+        service._embed = Mock(return_value=None)
+        log = service.save_learning_log(
+            '질문', '답변', '## md', RESULTS, ['docker'], answer_source='web',
+            verdict={'consistent': False, 'note': '어긋남'},
+        )
+        assert (log.verification, log.verification_note) == ('suspect', '어긋남')
+        QuerySSEView._start_verification(log, {'need_web': True}, 'web', RESULTS)
+        assert not Job.objects.filter(kind='verify_log').exists()
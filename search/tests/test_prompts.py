@@ -0,0 +1,86 @@
+"""
+프롬프트 레지스트리 테스트
+- 활성 버전: PROMPT_VERSIONS 우선, 없으면 마지막 등록 버전
+- 여러 줄 값을 넣어도 들여쓰기 없음, JSON 예시 중괄호 유지
+- 통합 후처리 프롬프트도 레지스트리(조각 포함)에서 렌더
+- 저장되는 로그·연습문제에 프롬프트 버전 기록
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from search.services import ExerciseService, LearnlogService, prompts
+from search.tests.factories import LearningLogFactory
+
+
+@pytest.fixture
+def scratch(monkeypatch):
+    """테스트 전용 템플릿 — 레지스트리 원본은 건드리지 않는다"""
+    monkeypatch.setattr(prompts, '_REGISTRY', {})
+    monkeypatch.setattr(prompts, '_LATEST', {})
+    prompts.register('demo', 'v1', """
+        첫 버전: {value}
+    """)
+    prompts.register('demo', 'v2', """
+        둘째 버전:
+        {value}
+    """)
+
+
+def test_마지막_등록_버전이_기본(scratch):
+    assert prompts.get('demo').tag == 'demo@v2'
+    assert prompts.versions('demo') == ['v1', 'v2']
+
+
+def test_설정으로_버전_선택(scratch, settings):
+    settings.PROMPT_VERSIONS = {'demo': 'v1'}
+    assert prompts.render('demo', value='x') == '첫 버전: x'
+    assert prompts.render('demo', version='v2', value='x') == '둘째 버전:\nx'
+
+
+def test_여러_줄_값도_들여쓰기_없음():
+    logs = [Mock(query='a', ai_response='x'), Mock(query='b', ai_response='y')]
+    prompt = LearnlogService._route_prompt('질문', logs)
+    assert '과거 학습 기록 (제목: 내용 앞부분):\n- a: x\n- b: y\n' in prompt
+    assert '{\n  "use_logs": true/false,' in prompt
+    assert not any(line.startswith('    ') for line in prompt.splitlines())
+
+
+def test_답변_프롬프트_형식():
+    service = LearnlogService.__new__(LearnlogService)
+    prompt = service._answer_prompt('질문', {'results': []}, custom_instructions='짧게')
+    assert prompt == "개발 질문에 한국어로 답변하세요.\n\n질문: 질문\n\n참고:\n없음\n\n짧게"
+
+
+def test_통합_후처리_프롬프트도_레지스트리에서(settings, monkeypatch):
+    settings.MARKDOWN_MODE = 'local'
+    prompt, _, judged = LearnlogService._postprocess_request('질문', '답변', {'results': []}, None)
+    assert prompt.startswith('개발 질문에 대한 AI 답변을 후처리하세요.\n\n질문: 질문\n\n답변:\n답변\n\n작업:\n1. tags:')
+    assert prompt.endswith('{\n  "tags": ["docker", "network", "bridge-mode"]\n}')
+    assert not judged
+
+    postprocess = prompts.get('postprocess')
+    monkeypatch.setitem(prompts._REGISTRY, 'postprocess', {'v1': postprocess})
+    monkeypatch.setitem(prompts._LATEST, 'postprocess', 'v1')
+    prompts.register('postprocess', 'v2', "v2 {query}{blocks}\n{tasks}\n{fields}", parts=postprocess.parts)
+    settings.PROMPT_VERSIONS = {'postprocess': 'v2'}
+    prompt, _, _ = LearnlogService._postprocess_request('질문', '답변', {'results': []}, None)
+    assert prompt.startswith('v2 질문\n1. tags:')
+
+
+@pytest.mark.django_db
+class TestRecordedVersion:
+    def test_로그에_답변_프롬프트_버전(self, settings):
+        settings.EMBEDDING_DEFERRED = False
+        service = LearnlogService.__new__(LearnlogService)
+        service._embed = Mock(return_value=None)
+        log = service.save_learning_log('질문', '답변', '## md', {'results': []}, ['docker'])
+        assert log.prompt_version == prompts.get('answer').tag
+
+    def test_연습문제에_출제_프롬프트_버전(self):
+        log = LearningLogFactory()
+        service = ExerciseService.__new__(ExerciseService)
+        content = {'question': 'q', 'model_answer': 'a', 'key_points': ['k']}
+        with patch.object(ExerciseService, '_call_mistral_json', return_value=content):
+            exercise = service.generate_exercise(log, 'generation_compare')
+        assert exercise.prompt_version == 'exercise_generation_compare@v1'
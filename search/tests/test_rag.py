@@ -8,6 +8,7 @@ RAG (pgvector 하이브리드 검색) 테스트
 from unittest.mock import patch
 
 import pytest
+from django.db import connection
 
 from search.services import LearnlogService
 from search.tests.factories import LearningLogFactory
@@ -73,6 +74,68 @@ class TestRetrieveSimilarLogs:
         assert len(results) == 3
 
 
+def _vec(*head):
+    """앞쪽 성분만 지정한 1024차원 벡터 (나머지 0)"""
+    return list(head) + [0.0] * (1024 - len(head))
+
+
+@pytest.mark.django_db
+class TestFusedRetrieval:
+    """SQL 한 번으로 결합하는 경로가 Python _rrf_merge 경로와 같은 결과를 내는지"""
+
+    def _both(self, query, query_vec, **kwargs):
+        service = _service_without_clients()
+        with patch.object(LearnlogService, '_embed', return_value=query_vec):
+            with patch.object(LearnlogService, 'FUSE_IN_DB', True):
+                fused = service.retrieve_similar_logs(query, **kwargs)
+            with patch.object(LearnlogService, 'FUSE_IN_DB', False):
+                merged = service.retrieve_similar_logs(query, **kwargs)
+        return fused, merged
+
+    def test_python_RRF와_동일한_순서(self):
+        LearningLogFactory(query="docker network bridge", ai_response="브리지", embedding=_vec(0.2, 1.0))
+        LearningLogFactory(query="docker volume", ai_response="볼륨", embedding=_vec(1.0))
+        LearningLogFactory(query="파이썬 데코레이터", ai_response="설명", embedding=_vec(0.5, 1.0))
+        LearningLogFactory(query="nginx upstream", ai_response="docker 뒤 프록시", embedding=None)
+
+        fused, merged = self._both("docker network", _vec(1.0), k=4)
+
+        assert [log.pk for log in fused] == [log.pk for log in merged]
+
+    def test_임베딩_없으면_FTS만으로_동일(self):
+        LearningLogFactory(query="docker compose 사용법", ai_response="설명", embedding=_vec(1.0))
+        LearningLogFactory(query="파이썬 데코레이터", ai_response="설명", embedding=_vec(0.0, 1.0))
+
+        fused, merged = self._both("docker compose", None)
+
+        assert [log.pk for log in fused] == [log.pk for log in merged]
+
+    def test_exclude와_순위_디버그_필드(self):
+        excluded = LearningLogFactory(query="docker compose", ai_response="설명", embedding=_vec(1.0))
+        both = LearningLogFactory(query="docker swarm", ai_response="설명", embedding=_vec(1.0))
+
+        fused, _ = self._both("docker", _vec(1.0), exclude_pks=[excluded.pk])
+
+        assert [log.pk for log in fused] == [both.pk]
+        assert fused[0].fts_rank == 1 and fused[0].vec_rank == 1
+        assert fused[0].rrf_score == pytest.approx(2 / 61)
+
+
+@pytest.mark.django_db
+class TestAnnSession:
+    def _ef_search(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW hnsw.ef_search")
+            return int(cursor.fetchone()[0])
+
+    def test_세션_안에서만_ef_search_적용(self, settings):
+        settings.PGVECTOR_HNSW_EF_SEARCH = 77
+        with LearnlogService._ann_session():
+            assert self._ef_search() == 77
+        with LearnlogService._ann_session(ef_search=120):
+            assert self._ef_search() == 120
+
+
 class TestRetrievedContext:
     def test_빈_목록이면_빈_문자열(self):
         assert LearnlogService._build_retrieved_context([]) == ""
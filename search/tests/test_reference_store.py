@@ -0,0 +1,98 @@
+"""
+레퍼런스 본문 저장소 · 로컬 문서 코퍼스 테스트
+- 본문은 URL당 1회 압축 저장 + 청크 분할, 청크 임베딩은 작업 큐
+- 로컬 적중 판정: 가까운 청크가 LOCAL_DOCS_MIN_CHUNKS개 이상이면 레퍼런스별로 묶은 결과
+- web_search 노드: 로컬 적중이면 Tavily 생략
+"""
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from search.models import Job, Reference, ReferenceChunk, ReferenceContent
+from search.services import LearnlogService
+from search.services.reference_store import embed_chunks
+from search.services.search_agent import build_search_agent
+
+BODY = "## 설치\n\n" + "pip으로 설치합니다. " * 80 + "\n\n## 사용\n\n설정 파일을 작성합니다."
+
+
+def _chunk(reference_id, position, distance, text='청크'):
+    return SimpleNamespace(reference_id=reference_id, position=position, vec_distance=distance, text=text)
+
+
+@pytest.fixture
+def local_docs(settings):
+    settings.LOCAL_DOCS_MAX_DISTANCE = 0.25
+    settings.LOCAL_DOCS_MIN_CHUNKS = 2
+    return LearnlogService.__new__(LearnlogService)
+
+
+def test_가까운_청크가_부족하면_미스(local_docs):
+    assert local_docs._local_docs_results([_chunk(1, 0, 0.1), _chunk(2, 0, 0.4), _chunk(3, 0, None)]) is None
+
+
+def test_적중_청크를_레퍼런스별로_묶음(local_docs):
+    chunks = [_chunk(2, 3, 0.1, '뒤'), _chunk(1, 0, 0.2, '다른 문서'), _chunk(2, 1, 0.15, '앞')]
+    references = {
+        1: SimpleNamespace(url='https://a.dev', title='A'),
+        2: SimpleNamespace(url='https://b.dev', title='B'),
+    }
+    with patch.object(Reference.objects, 'in_bulk', return_value=references):
+        results = local_docs._local_docs_results(chunks)['results']
+    assert [r['url'] for r in results] == ['https://b.dev', 'https://a.dev']
+    assert results[0]['content'] == '앞\n\n뒤'  # 문서 안 순서로
+    assert results[0]['score'] == pytest.approx(0.9)
+
+
+def test_로컬_적중이면_Tavily_생략(settings):
+    settings.LOCAL_DOCS_ENABLED = True
+    local = {'results': [{'url': 'https://b.dev', 'content': '저장된 본문'}]}
+    service = Mock()
+    service.retrieve_similar_logs.return_value = []
+    service.decide_route.return_value = {'use_logs': False, 'need_web': True, 'reason': ''}
+    service.search_local_docs.return_value = local
+    service.generate_answer_stream.side_effect = lambda *a, **k: iter(['답'])
+    result = build_search_agent(service).invoke({'query': '질문', 'custom_instructions': None, 'parent': None})
+    service.search_official_docs.assert_not_called()
+    assert result['search_results'] == local
+
+
+@pytest.mark.django_db
+class TestStore:
+    def _save(self, settings, results):
+        settings.REFERENCE_STORE_ENABLED = True
+        settings.EMBEDDING_DEFERRED = True
+        service = LearnlogService.__new__(LearnlogService)
+        service._lookup_embedding = Mock(return_value=None)
+        return service.save_learning_log('질문', '답변', '## md', {'results': results}, [])
+
+    def test_본문_압축_저장과_청크(self, settings):
+        self._save(settings, [{'url': 'https://docs.x.dev/a', 'title': 'A', 'content': '짧은 발췌', 'raw_content': BODY}])
+        content = ReferenceContent.objects.get()
+        assert content.text == BODY
+        assert len(bytes(content.data)) < len(BODY.encode())
+        chunks = list(ReferenceChunk.objects.order_by('position').values_list('text', flat=True))
+        assert chunks[0].startswith('## 설치\n') and chunks[-1] == '## 사용\n설정 파일을 작성합니다.'
+        assert Job.objects.get(kind='embed_reference_chunks').payload == {'reference_pks': [content.reference_id]}
+
+    def test_이미_저장된_URL은_건너뜀(self, settings):
+        result = {'url': 'https://docs.x.dev/a', 'title': 'A', 'content': BODY}
+        self._save(settings, [result])
+        count = ReferenceChunk.objects.count()
+        self._save(settings, [result])
+        assert ReferenceContent.objects.count() == 1
+        assert ReferenceChunk.objects.count() == count
+        assert Job.objects.filter(kind='embed_reference_chunks').count() == 1
+
+    def test_청크_임베딩은_빈_것만(self, settings):
+        self._save(settings, [{'url': 'https://docs.x.dev/a', 'title': 'A', 'content': BODY}])
+        reference_pk = Reference.objects.get().pk
+        service = Mock()
+        service._embed_many.side_effect = lambda texts: [[0.1] * 1024 if i else None for i, _ in enumerate(texts)]
+        assert embed_chunks(service, [reference_pk]) == 1
+        assert service._embed_many.call_args.args[0][0].startswith('A\n## 설치')
+        service._embed_many.side_effect = lambda texts: [[0.2] * 1024 for _ in texts]
+        assert embed_chunks(service, [reference_pk]) == 0
+        assert len(service._embed_many.call_args.args[0]) == 1  # 이미 채운 청크는 다시 보내지 않음
+        assert not ReferenceChunk.objects.filter(embedding__isnull=True).exists()
@@ -0,0 +1,169 @@
+"""
+save_learning_log 일괄 저장 테스트
+- 레퍼런스·태그 upsert + M2M 연결, 기존 행 유지
+- 쿼리 수가 결과 개수와 무관
+- 중간 실패 시 로그가 남지 않음 (단일 트랜잭션)
+- EMBEDDING_DEFERRED: 저장 시 임베딩 API 생략 → embed_log 작업이 채움 (성공한 컬럼은 먼저 저장)
+"""
+from unittest.mock import patch
+
+import pytest
+
+from search.models import Job, LearningLog, Reference, Tag
+from search.services import LearnlogService, jobs
+from search.services.embedding_cache import EmbeddingContext
+from search.tests.factories import TagFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _results(n):
+    return {'results': [
+        {'url': f'https://docs.example.com/{i}', 'title': f'문서 {i}', 'content': '내용'}
+        for i in range(n)
+    ]}
+
+
+VEC = [0.1] * 1024
+
+
+def _save(search_results, tag_names):
+    service = LearnlogService.__new__(LearnlogService)
+    with patch.object(LearnlogService, '_embed', return_value=None):
+        return service.save_learning_log('질문입니다', '답변', '## md', search_results, tag_names)
+
+
+def test_레퍼런스_태그_연결():
+    log = _save(_results(3), ['docker', 'network'])
+    assert log.references.count() == 3
+    assert set(log.tags.values_list('name', flat=True)) == {'docker', 'network'}
+
+
+def test_기존_레퍼런스는_덮어쓰지_않음():
+    Reference.objects.create(url='https://docs.example.com/0', title='원래 제목', excerpt='원래 발췌')
+    log = _save(_results(1), [])
+    ref = log.references.get()
+    assert ref.title == '원래 제목'
+    assert Reference.objects.count() == 1
+
+
+def test_중복_URL과_태그는_한번만():
+    results = {'results': _results(1)['results'] * 2}
+    log = _save(results, ['docker', 'docker'])
+    assert log.references.count() == 1
+    assert log.tags.count() == 1
+
+
+def test_slug가_겹치는_새_이름은_기존_태그로_연결():
+    TagFactory(name='docker', slug='docker')
+    log = _save({'results': []}, ['Docker'])
+    assert list(log.tags.values_list('name', flat=True)) == ['docker']
+    assert Tag.objects.count() == 1
+
+
+def test_쿼리_수는_결과_개수와_무관(django_assert_max_num_queries):
+    _save(_results(1), ['a'])  # streak 싱글톤 행 생성 등 첫 저장의 부수 쿼리 제외
+    with django_assert_max_num_queries(12):
+        _save(_results(10), [f'tag{i}' for i in range(5)])
+
+
+def test_중간_실패시_로그도_롤백():
+    with patch.object(Tag.objects, 'bulk_create', side_effect=RuntimeError('db down')):
+        with pytest.raises(RuntimeError):
+            _save(_results(2), ['docker'])
+    assert not LearningLog.objects.exists()
+    assert not Reference.objects.exists()
+
+
+class TestDeferredEmbedding:
+    def test_저장시_임베딩_API_생략_후_작업_등록(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        service = LearnlogService.__new__(LearnlogService)
+        with patch.object(LearnlogService, '_embed') as embed:
+            log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [])
+        embed.assert_not_called()
+        assert log.embedding is None
+        job = Job.objects.get(kind='embed_log')
+        assert job.payload == {'log_pk': log.pk}
+
+    def test_검색때_캐시된_질의_임베딩을_임시로_저장(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        service = LearnlogService.__new__(LearnlogService)
+        service.embedding_cache.set(LearnlogService.EMBED_MODEL, '질문입니다', VEC)
+        log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [])
+        log.refresh_from_db()
+        assert list(log.embedding) == pytest.approx(VEC)
+        assert log.embedding_provisional
+
+    def test_embed_log_작업이_질의_답변_임베딩으로_교체(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        service = LearnlogService.__new__(LearnlogService)
+        log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [])
+        with patch.object(LearnlogService, 'shared', return_value=service), \
+                patch.object(LearnlogService, '_embed', return_value=VEC) as embed:
+            assert jobs.run_job(jobs.claim()) is True
+        embed.assert_called_once_with(LearnlogService._embedding_input('질문입니다', '답변'))
+        log.refresh_from_db()
+        assert list(log.embedding) == pytest.approx(VEC)
+        assert not log.embedding_provisional
+
+    def test_질문_임베딩만_실패하면_본_임베딩은_저장_후_재시도(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        settings.STORE_QUERY_EMBEDDING = True
+        service = LearnlogService.__new__(LearnlogService)
+        service.embedding_cache.set(LearnlogService.EMBED_MODEL, '질문입니다', VEC)
+        log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [])
+        LearningLog.objects.filter(pk=log.pk).update(query_embedding=None)
+        answer_vec = [0.5] * len(VEC)
+        with patch.object(LearnlogService, 'shared', return_value=service), \
+                patch.object(LearnlogService, '_embed', side_effect=[answer_vec, None]):
+            assert jobs.run_job(jobs.claim()) is False
+        log.refresh_from_db()
+        assert list(log.embedding) == pytest.approx(answer_vec)
+        assert not log.embedding_provisional
+        Job.objects.update(run_at=log.created_at)  # 백오프 대기 생략
+        with patch.object(LearnlogService, 'shared', return_value=service), \
+                patch.object(LearnlogService, '_embed', return_value=VEC) as embed:
+            assert jobs.run_job(jobs.claim()) is True
+        embed.assert_called_once_with('질문입니다')  # 이미 교체한 본 임베딩은 다시 계산하지 않음
+
+    def test_임베딩_전_로그도_FTS로_검색됨(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        service = LearnlogService.__new__(LearnlogService)
+        log = service.save_learning_log('docker network bridge', '답변', '## md', {'results': []}, [])
+        with patch.object(LearnlogService, '_embed', return_value=VEC):
+            assert log in service.retrieve_similar_logs('docker network')
+
+    def test_즉시_모드는_저장_전에_임베딩(self, settings):
+        settings.EMBEDDING_DEFERRED = False
+        service = LearnlogService.__new__(LearnlogService)
+        with patch.object(LearnlogService, '_embed', return_value=VEC):
+            log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [])
+        log.refresh_from_db()
+        assert log.embedding is not None
+        assert not Job.objects.filter(kind='embed_log').exists()
+
+
+class TestQueryEmbedding:
+    def test_검색때_계산한_질의_임베딩을_질문_컬럼에_저장(self, settings):
+        settings.EMBEDDING_DEFERRED = True
+        settings.STORE_QUERY_EMBEDDING = True
+        service = LearnlogService.__new__(LearnlogService)
+        context = EmbeddingContext()
+        context.set(LearnlogService.EMBED_MODEL, '질문입니다', VEC)
+        with patch.object(LearnlogService, '_embed') as embed:
+            log = service.save_learning_log(
+                '질문입니다', '답변', '## md', {'results': []}, [], embeddings=context,
+            )
+        embed.assert_not_called()
+        log.refresh_from_db()
+        assert list(log.query_embedding) == pytest.approx(VEC)
+
+    def test_옵션_꺼지면_질문_컬럼_비움(self, settings):
+        settings.STORE_QUERY_EMBEDDING = False
+        service = LearnlogService.__new__(LearnlogService)
+        context = EmbeddingContext()
+        context.set(LearnlogService.EMBED_MODEL, '질문입니다', VEC)
+        log = service.save_learning_log('질문입니다', '답변', '## md', {'results': []}, [], embeddings=context)
+        log.refresh_from_db()
+        assert log.query_embedding is None
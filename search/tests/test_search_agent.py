@@ -2,9 +2,14 @@
 search_agent 그래프 테스트 — 노드 연결과 분기를 검증한다.
 LLM/DB 호출은 전부 모킹: 노드가 올바른 순서·인자로 서비스 메서드를 부르는지가 관심사.
 """
-from unittest.mock import Mock
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock
 
-from search.services.search_agent import build_search_agent
+import pytest
+
+from search.services import LearnlogService, search_agent
+from search.services.search_agent import build_search_agent, get_search_agent
 
 
 def make_service(route=None):
@@ -47,9 +52,186 @@ class TestRouting:
         run_agent(service)
         assert service.generate_answer_stream.call_args.kwargs['retrieved_logs'] is None
 
+    def test_검색_임베딩_컨텍스트를_상태로_전달(self):
+        service = make_service()
+        result = run_agent(service)
+        embeddings = service.retrieve_similar_logs.call_args.kwargs['embeddings']
+        assert result['embeddings'] is embeddings
+
     def test_꼬리질문_부모는_검색에서_제외(self):
         parent = Mock()
         parent.pk = 7
         service = make_service()
         run_agent(service, parent=parent)
-        service.retrieve_similar_logs.assert_called_once_with('테스트 질문입니다', exclude_pks=[7])
+        service.retrieve_similar_logs.assert_called_once()
+        assert service.retrieve_similar_logs.call_args.kwargs['exclude_pks'] == [7]
+
+
+class TestSemanticCacheNode:
+    """semantic_cache: hit이면 나머지 노드를 건너뛰고 저장된 답변을 토큰으로 흘린다"""
+
+    @pytest.fixture(autouse=True)
+    def _enabled(self, settings):
+        settings.SEMANTIC_CACHE_ENABLED = True
+        settings.STORE_QUERY_EMBEDDING = True
+
+    def _cached_service(self):
+        service = make_service()
+        service.find_cached_answer.return_value = Mock(ai_response='저장된 답변')
+        return service
+
+    def test_hit이면_검색_생성_생략(self):
+        service = self._cached_service()
+        agent = build_search_agent(service)
+        chunks = [
+            chunk for mode, chunk in agent.stream(
+                {'query': '테스트 질문입니다', 'custom_instructions': None, 'parent': None},
+                stream_mode=['custom', 'updates'],
+            ) if mode == 'custom'
+        ]
+        assert chunks == [{'token': '저장된 답변', 'cached': True}]
+        service.retrieve_similar_logs.assert_not_called()
+        service.generate_answer_stream.assert_not_called()
+
+    def test_miss면_기존_경로_그리고_임베딩_재사용(self):
+        service = make_service()
+        service.find_cached_answer.return_value = None
+        result = run_agent(service)
+        assert result['answer'] == '답변'
+        embeddings = service.find_cached_answer.call_args.kwargs['embeddings']
+        assert service.retrieve_similar_logs.call_args.kwargs['embeddings'] is embeddings
+
+    @pytest.mark.parametrize('override', [{'regenerate': True}, {'parent': Mock(pk=1)}, {'custom_instructions': '짧게'}])
+    def test_새로_생성_꼬리질문_맞춤지시는_캐시_건너뜀(self, override):
+        service = self._cached_service()
+        result = run_agent(service, **override)
+        service.find_cached_answer.assert_not_called()
+        assert result['answer'] == '답변'
+
+    def test_질의_임베딩을_저장하지_않으면_캐시_건너뜀(self, settings):
+        settings.STORE_QUERY_EMBEDDING = False
+        service = self._cached_service()
+        result = run_agent(service)
+        service.find_cached_answer.assert_not_called()
+        assert result['answer'] == '답변'
+
+
+class TestSpeculativeWeb:
+    """speculative_web: 웹검색이 라우터 판단보다 먼저 시작되고, need_web=False면 결과를 버린다"""
+
+    def _make_service(self, need_web):
+        started = threading.Event()
+
+        def search(*args, **kwargs):
+            started.set()
+            return {'results': [{'url': 'u', 'content': 'c'}]}
+
+        def route(*args, **kwargs):
+            # 라우터 실행 중에 이미 웹검색이 시작돼 있어야 한다
+            assert started.wait(timeout=2)
+            return {'use_logs': True, 'need_web': need_web, 'reason': ''}
+
+        service = make_service()
+        service.search_official_docs.side_effect = search
+        service.decide_route.side_effect = route
+        return service
+
+    def _run(self, service):
+        agent = build_search_agent(service, speculative_web=True)
+        return agent.invoke({'query': '테스트 질문입니다', 'custom_instructions': None, 'parent': None})
+
+    def test_웹_필요시_미리_받은_결과로_생성(self):
+        service = self._make_service(need_web=True)
+        result = self._run(service)
+        service.search_official_docs.assert_called_once()
+        assert result['search_results'] == {'results': [{'url': 'u', 'content': 'c'}]}
+        assert service.generate_answer_stream.call_args.args[1] == result['search_results']
+
+    def test_웹_불필요면_결과_버림(self):
+        service = self._make_service(need_web=False)
+        result = self._run(service)
+        assert 'search_results' not in result
+        assert service.generate_answer_stream.call_args.args[1] == {'results': []}
+
+
+class TestSharedAgent:
+    def test_프로세스당_모드별_한번만_컴파일(self, monkeypatch):
+        monkeypatch.setattr(search_agent, '_agents', {})
+        monkeypatch.setattr(LearnlogService, 'shared', classmethod(lambda cls: make_service()))
+        build = Mock(side_effect=lambda service, **kwargs: object())
+        monkeypatch.setattr(search_agent, 'build_search_agent', build)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_search_agent())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({id(agent) for agent in results}) == 1
+        assert get_search_agent(speculative_web=True) is not results[0]
+        assert build.call_count == 2
+
+    def test_공용_그래프로_여러_요청_처리(self, monkeypatch):
+        monkeypatch.setattr(search_agent, '_agents', {})
+        monkeypatch.setattr(LearnlogService, 'shared', classmethod(lambda cls: make_service()))
+        agent = get_search_agent()
+        first = agent.invoke({'query': '첫 번째 질문입니다', 'custom_instructions': None, 'parent': None})
+        second = agent.invoke({'query': '두 번째 질문입니다', 'custom_instructions': None, 'parent': None})
+        assert first['query'] != second['query']
+        assert first['answer'] == second['answer'] == '답변'
+
+
+def make_async_service(route=None):
+    async def stream(*args, **kwargs):
+        for chunk in ['답', '변']:
+            yield chunk
+
+    service = Mock()
+    service.aretrieve_similar_logs = AsyncMock(return_value=['로그1', '로그2'])
+    service.adecide_route = AsyncMock(return_value=route or {'use_logs': True, 'need_web': True, 'reason': ''})
+    service.asearch_official_docs = AsyncMock(return_value={'results': [{'url': 'u', 'content': 'c'}]})
+    service.agenerate_answer_stream = Mock(side_effect=stream)
+    return service
+
+
+class TestAsyncAgent:
+    """use_async=True: 같은 분기를 async 노드로 — astream으로 토큰이 흘러나와야 한다"""
+
+    def _stream(self, service, speculative_web=False):
+        agent = build_search_agent(service, speculative_web=speculative_web, use_async=True)
+
+        async def collect():
+            tokens, state = [], {}
+            async for mode, chunk in agent.astream(
+                {'query': '테스트 질문입니다', 'custom_instructions': None, 'parent': None},
+                stream_mode=['updates', 'custom'],
+            ):
+                if mode == 'custom':
+                    tokens.append(chunk['token'])
+                else:
+                    for delta in chunk.values():
+                        state.update(delta or {})
+            return tokens, state
+
+        return asyncio.run(collect())
+
+    def test_토큰_스트리밍(self):
+        service = make_async_service()
+        tokens, state = self._stream(service)
+        assert tokens == ['답', '변']
+        assert state['answer'] == '답변'
+        service.asearch_official_docs.assert_awaited_once()
+
+    def test_로그로_충분하면_웹검색_생략(self):
+        service = make_async_service(route={'use_logs': True, 'need_web': False, 'reason': ''})
+        _, state = self._stream(service)
+        service.asearch_official_docs.assert_not_awaited()
+        assert service.agenerate_answer_stream.call_args.kwargs['retrieved_limit'] == 1500
+        assert state['answer'] == '답변'
+
+    def test_투기적_웹검색은_태스크로_미리_시작(self):
+        service = make_async_service()
+        _, state = self._stream(service, speculative_web=True)
+        service.asearch_official_docs.assert_awaited_once()
+        assert state['search_results'] == {'results': [{'url': 'u', 'content': 'c'}]}
@@ -0,0 +1,130 @@
+"""
+Tavily 검색 결과 캐시 테스트
+- 어순·대소문자·구두점만 다른 검색어, 순서만 다른 include_domains는 같은 키
+- TTL은 결과 출처 유형별 최솟값, 만료 후 stale 구간은 저장 결과 + 갱신 작업 1회
+- 서비스: 적중하면 Tavily 호출 없음, 빈 결과는 저장하지 않음, async 경로와 캐시 공유
+"""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+import pytest
+from django.utils import timezone
+
+from search.models import CachedSearch, Job
+from search.services import LearnlogService, search_cache as search_cache_module
+from search.services.jobs import claim, run_job
+from search.services.search_cache import SearchCache, normalize_query, search_key
+
+TTL_HOURS = {'official': 168, 'github': 72, 'stackoverflow': 72, 'blog': 24, 'other': 24}
+OFFICIAL = {'results': [{'url': 'https://docs.djangoproject.com/en/5.2/ref/models/', 'content': 'c'}]}
+MIXED = {'results': [*OFFICIAL['results'], {'url': 'https://medium.com/@a/post', 'content': 'c'}]}
+
+
+def _params(query='django orm select_related', **extra):
+    return {'query': query, 'search_depth': 'advanced', 'max_results': 5, **extra}
+
+
+def _after(hours):
+    return patch.object(search_cache_module.timezone, 'now', return_value=timezone.now() + timedelta(hours=hours))
+
+
+def test_검색어_정규화():
+    assert normalize_query('Django ORM, "select_related"') == normalize_query('select_related django orm')
+    assert normalize_query('node.js c++ .net') == '.net c++ node.js'
+
+
+def test_도메인_순서는_무관_검색_옵션은_구분():
+    a = _params(include_domains=['docs.djangoproject.com/en', 'docs.python.org/3'])
+    b = _params(include_domains=['docs.python.org/3', 'docs.djangoproject.com/en'])
+    assert search_key(a) == search_key(b)
+    assert search_key(a) != search_key(_params())
+    assert search_key(_params()) != search_key({**_params(), 'max_results': 3})
+
+
+@pytest.fixture
+def make_cache(memory_cache):
+    return lambda **kwargs: memory_cache(SearchCache, **{'ttl_hours': TTL_HOURS, 'stale_hours': 24, **kwargs})
+
+
+def test_TTL은_출처_유형별_최솟값(make_cache):
+    cache = make_cache()
+    assert cache.ttl_for(OFFICIAL) == timedelta(hours=168)
+    assert cache.ttl_for(MIXED) == timedelta(hours=24)
+
+
+def test_만료_전_적중_stale_구간_지나면_미스(make_cache):
+    cache = make_cache()
+    cache.set(_params(), MIXED)
+    assert cache.get(_params()) == MIXED
+    with _after(30):  # TTL 24h + stale 24h 안 — 저장 결과 (DB 없으면 갱신 요청은 생략)
+        assert cache.get(_params()) == MIXED
+    with _after(50):
+        assert cache.get(_params()) is None
+    assert cache.stats()['hits_stale'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_빈_결과는_저장_안_함(make_cache):
+    cache = make_cache()
+    cache.set(_params(), {'results': []})
+    assert cache.get(_params()) is None
+
+
+@pytest.fixture
+def service(settings, bare_service, make_cache):
+    settings.SEARCH_CACHE_ENABLED = True
+    bare_service.tavily_client = Mock()
+    bare_service.tavily_client.search.return_value = OFFICIAL
+    bare_service.search_cache = make_cache()
+    return bare_service
+
+
+def test_적중하면_Tavily_호출_없음(service):
+    assert service._tavily_search(_params('django orm select_related')) == OFFICIAL
+    assert service._tavily_search(_params('select_related Django ORM')) == OFFICIAL
+    service.tavily_client.search.assert_called_once()
+
+
+def test_꺼져_있으면_매번_호출(service, settings):
+    settings.SEARCH_CACHE_ENABLED = False
+    service._tavily_search(_params())
+    service._tavily_search(_params())
+    assert service.tavily_client.search.call_count == 2
+
+
+def test_async_경로도_같은_캐시_공유(service):
+    async_client = Mock()
+    async_client.search = AsyncMock(return_value=OFFICIAL)
+    with patch.object(LearnlogService, 'tavily_async_client', new_callable=PropertyMock, return_value=async_client):
+        assert asyncio.run(service._atavily_search(_params())) == OFFICIAL
+        service._tavily_search(_params())
+    service.tavily_client.search.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestStaleWhileRevalidate:
+    def test_stale_적중은_갱신_작업_1회(self, make_cache):
+        cache = make_cache(use_db=True)
+        cache.set(_params(), MIXED)
+        cache.clear()  # 다른 프로세스처럼 DB 단계에서 읽기
+        with _after(30):
+            assert cache.get(_params()) == MIXED
+            assert cache.get(_params()) == MIXED
+        assert Job.objects.filter(kind='refresh_search').count() == 1
+        assert CachedSearch.objects.get().refresh_requested_at is not None
+
+    def test_갱신_작업이_결과를_교체(self, make_cache):
+        cache = make_cache(use_db=True)
+        fresh = {'results': [{'url': 'https://docs.djangoproject.com/en/5.2/', 'content': 'new'}]}
+        service = Mock()
+        service.tavily_client.search.return_value = fresh
+        with patch.object(search_cache_module, 'search_cache', cache), \
+                patch.object(LearnlogService, 'shared', return_value=service):
+            cache.set(_params(), MIXED)
+            with _after(30):
+                cache.get(_params())
+            assert run_job(claim())
+        entry = CachedSearch.objects.get()
+        assert entry.response == fresh
+        assert entry.refresh_requested_at is None
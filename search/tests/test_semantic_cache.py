@@ -0,0 +1,44 @@
+"""
+의미 캐시 테스트 — 질문 임베딩 거리 임계값, 재사용 제외 조건, 적중률 집계.
+임베딩은 직접 넣고 API는 호출하지 않는다.
+"""
+import pytest
+
+from search.services.semantic_cache import SemanticCache
+from search.tests.factories import LearningLogFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _vec(*head):
+    return list(head) + [0.0] * (1024 - len(head))
+
+
+@pytest.fixture
+def cache(settings):
+    settings.SEMANTIC_CACHE_THRESHOLD = 0.95
+    return SemanticCache()
+
+
+def test_임계값_이내면_hit(cache):
+    log = LearningLogFactory(query_embedding=_vec(1.0, 0.1))
+    assert cache.lookup(_vec(1.0, 0.1)) == log
+
+
+def test_임계값_밖이면_miss(cache):
+    LearningLogFactory(query_embedding=_vec(1.0, 0.0))
+    assert cache.lookup(_vec(1.0, 1.0)) is None  # 코사인 유사도 ≈ 0.71
+
+
+def test_잘렸거나_불일치_의심_답변은_재사용_안함(cache):
+    LearningLogFactory(query_embedding=_vec(1.0), is_truncated=True)
+    LearningLogFactory(query_embedding=_vec(1.0), verification='suspect')
+    assert cache.lookup(_vec(1.0)) is None
+
+
+def test_적중률_집계(cache):
+    LearningLogFactory(query_embedding=_vec(1.0))
+    cache.lookup(_vec(1.0))
+    cache.lookup(_vec(0.0, 1.0))
+    cache.lookup(None)  # 임베딩 실패도 miss
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': pytest.approx(1 / 3)}
@@ -0,0 +1,147 @@
+"""
+스트리밍 후처리 테스트
+- 토큰 단위 feed → 전체 답변으로 변환한 마크다운과 동일
+- 답변이 태그 입력 길이를 넘는 순간 태그 추출 시작 (프롬프트 입력은 전체 답변과 동일), 풀 스레드 DB 커넥션은 정리
+- 짧은 답변·llm 모드·통합 모드는 finish에서 처리
+- 의미 캐시 hit은 저장 답변을 토큰으로 흘려도 태그 호출 없음 (후처리·저장 생략 경로)
+LLM 호출은 전부 모킹한다.
+"""
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from search import api_views
+from search.api_views import QueryAsyncSSEView, QuerySSEView
+from search.services import LearnlogService, stream_postprocess
+from search.services.markdown_format import format_markdown
+from search.services.search_agent import build_search_agent
+from search.services.stream_postprocess import StreamingPostprocessor
+
+RESULTS = {'results': [{'title': 'Docker docs', 'url': 'https://docs.docker.com'}]}
+LONG_ANSWER = "## 개요\n" + "도커 브리지 네트워크 설명. " * 60 + "\n```bash\ndocker network ls\n```"
+
+
+def _tokens(text, size=5):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.fixture
+def service(settings):
+    settings.MARKDOWN_MODE = 'local'
+    settings.POSTPROCESS_COMBINED = False
+    service = LearnlogService.__new__(LearnlogService)
+    service.extract_tags = Mock(return_value=['docker'])
+    return service
+
+
+def test_토큰_feed_결과가_전체_변환과_같음(service):
+    post = StreamingPostprocessor(service, '도커 네트워크?')
+    for token in _tokens('\n  ' + LONG_ANSWER):
+        post.feed(token)
+    tags, markdown, verdict = post.finish(LONG_ANSWER, RESULTS)
+    assert markdown == format_markdown('도커 네트워크?', LONG_ANSWER, RESULTS)
+    assert (tags, verdict) == (['docker'], None)
+
+
+def test_태그_입력_길이를_넘으면_스트리밍_중에_시작(service):
+    post = StreamingPostprocessor(service, '질문')
+    tokens = _tokens(LONG_ANSWER)
+    for token in tokens[:10]:
+        post.feed(token)
+    service.extract_tags.assert_not_called()
+    for token in tokens[10:]:
+        post.feed(token)
+    post._tags.result()  # 풀 스레드에서 도는 선행 호출 완료 대기
+    service.extract_tags.assert_called_once()
+    _, head = service.extract_tags.call_args.args
+    assert head[:service.TAGS_INPUT_CHARS] == LONG_ANSWER[:service.TAGS_INPUT_CHARS]
+    post.finish(LONG_ANSWER, RESULTS)
+    service.extract_tags.assert_called_once()
+
+
+def test_선행_태그_호출은_풀_스레드_커넥션을_닫음(service):
+    post = StreamingPostprocessor(service, '질문')
+    with patch.object(stream_postprocess, 'connection') as connection:
+        for token in _tokens(LONG_ANSWER):
+            post.feed(token)
+        assert post._tags.result() == ['docker']
+    connection.close.assert_called_once()
+
+
+def test_짧은_답변은_finish에서_태그_추출(service):
+    post = StreamingPostprocessor(service, '질문')
+    post.feed('짧은 답변')
+    service.extract_tags.assert_not_called()
+    post.finish('짧은 답변', RESULTS)
+    service.extract_tags.assert_called_once_with('질문', '짧은 답변')
+
+
+@pytest.mark.parametrize('option', [{'MARKDOWN_MODE': 'llm'}, {'POSTPROCESS_COMBINED': True}])
+def test_전체_답변이_필요한_모드는_postprocess로(service, settings, option):
+    for name, value in option.items():
+        setattr(settings, name, value)
+    post = StreamingPostprocessor(service, '질문')
+    for token in _tokens(LONG_ANSWER):
+        post.feed(token)
+    with patch.object(LearnlogService, 'postprocess', return_value=(['a'], 'md', None)) as postprocess:
+        assert post.finish(LONG_ANSWER, RESULTS, (None, 500, RESULTS)) == (['a'], 'md', None)
+    postprocess.assert_called_once_with('질문', LONG_ANSWER, RESULTS, (None, 500, RESULTS))
+    service.extract_tags.assert_not_called()
+
+
+def test_async_경로(service):
+    service.aextract_tags = AsyncMock(return_value=['docker'])
+
+    async def run():
+        post = StreamingPostprocessor(service, '질문', use_async=True)
+        for token in _tokens(LONG_ANSWER):
+            post.feed(token)
+        service.aextract_tags.assert_called_once()
+        return await post.afinish(LONG_ANSWER, RESULTS)
+
+    tags, markdown, _ = asyncio.run(run())
+    assert tags == ['docker']
+    assert markdown == format_markdown('질문', LONG_ANSWER, RESULTS)
+    service.aextract_tags.assert_awaited_once()
+
+
+class TestCacheHitSkipsPostprocess:
+    """의미 캐시 hit: 저장된 답변 토큰은 후처리에 넘기지 않는다 (버려질 태그 호출 방지)"""
+
+    @pytest.fixture
+    def cached_service(self, service, settings):
+        settings.SEMANTIC_CACHE_ENABLED = True
+        settings.STORE_QUERY_EMBEDDING = True
+        agent_service = Mock()
+        agent_service.find_cached_answer.return_value = Mock(ai_response=LONG_ANSWER)
+        agent_service.afind_cached_answer = AsyncMock(return_value=Mock(ai_response=LONG_ANSWER))
+        service.aextract_tags = AsyncMock(return_value=['docker'])
+        return service, agent_service
+
+    def _patches(self, service, agent):
+        return (
+            patch.object(LearnlogService, 'shared', return_value=service),
+            patch.object(api_views, 'get_search_agent', return_value=agent),
+            patch.object(QuerySSEView, '_render_result', return_value='<html>'),
+        )
+
+    def test_hit이면_태그_호출_없음(self, cached_service):
+        service, agent_service = cached_service
+        shared, get_agent, render = self._patches(service, build_search_agent(agent_service))
+        with shared, get_agent, render:
+            events = list(QuerySSEView()._process_stream('도커 네트워크?'))
+        assert '"answer_source": "cached"' in events[-1]
+        service.extract_tags.assert_not_called()
+
+    def test_async_hit도_태그_호출_없음(self, cached_service):
+        service, agent_service = cached_service
+        shared, get_agent, render = self._patches(service, build_search_agent(agent_service, use_async=True))
+
+        async def run():
+            return [event async for event in QueryAsyncSSEView()._aprocess_stream('도커 네트워크?')]
+
+        with shared, get_agent, render:
+            events = asyncio.run(run())
+        assert '"answer_source": "cached"' in events[-1]
+        service.aextract_tags.assert_not_called()
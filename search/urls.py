@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from .views import MainPageView, LogListView, ExerciseListView, ExerciseDetailView, StatsView
 from .api_views import (
     QueryHTMXView,
     QuerySSEView,
+    QueryAsyncSSEView,
     QueryAPIView,
     LogDetailAPIView,
     ExerciseGenerateAPIView,
@@ -10,6 +12,7 @@ from .api_views import (
     ExerciseCoachAPIView,
     JournalPopupAPIView,
     JournalDismissAPIView,
+    MetricsAPIView,
 )
 
 app_name = 'search'
@@ -25,7 +28,11 @@ urlpatterns = [
     # Query API
     path('api/query/', QueryHTMXView.as_view(), name='query_api_html'),
     path('api/query/json/', QueryAPIView.as_view(), name='query_api_json'),
-    path('api/query/stream/', QuerySSEView.as_view(), name='query_api_stream'),
+    path(
+        'api/query/stream/',
+        (QueryAsyncSSEView if settings.ASYNC_STREAMING else QuerySSEView).as_view(),
+        name='query_api_stream',
+    ),
 
     # Log API
     path('api/logs/<int:pk>/', LogDetailAPIView.as_view(), name='log_detail_api'),
@@ -38,4 +45,7 @@ urlpatterns = [
     # Journal API
     path('api/journal/popup/', JournalPopupAPIView.as_view(), name='journal_popup'),
     path('api/journal/<int:pk>/dismiss/', JournalDismissAPIView.as_view(), name='journal_dismiss'),
+
+    # 운영 지표
+    path('api/metrics/', MetricsAPIView.as_view(), name='metrics_api'),
 ]
\ No newline at end of file